@@ -9,18 +9,18 @@ from emcee.runner.utils import confirm
 from emcee.app.config import YAMLAppConfiguration
 from emcee import printer
 
-from emcee.commands.transport import *
+from emcee.commands.transport import *  # noqa: F401,F403
 from emcee.commands.files import copy_file
-from emcee.commands.deploy import deploy, list_builds
+from emcee.commands.deploy import deploy, list_builds  # noqa: F401
 
-from emcee.provision.base import provision_host, patch_host
+from emcee.provision.base import provision_host, patch_host  # noqa: F401
 from emcee.provision.docker import provision_docker, authenticate_ghcr
-from emcee.provision.secrets import provision_secret, show_secret
+from emcee.provision.secrets import provision_secret, show_secret  # noqa: F401
 
-from emcee.deploy.docker import publish_images
+from emcee.deploy.docker import publish_images  # noqa: F401
 from emcee.deploy import deployer, docker, DeploymentCheckError
 
-from emcee.backends.aws.infrastructure.commands import *
+from emcee.backends.aws.infrastructure.commands import *  # noqa: F401,F403
 from emcee.backends.aws.provision.volumes import (provision_volume,
                                                   provision_swapfile)
 
@@ -80,8 +80,7 @@ def provision(createdb=False):
         remote(('tar', 'xvf', archive_path.name, '&&',
                 'rm', archive_path.name),
                cd=config.remote.path.media,
-               sudo=True
-        )
+               sudo=True)
 
     # Set the correct permissions on generated assets
     printer.header("Setting permissions on media assets...")
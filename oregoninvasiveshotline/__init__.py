@@ -1,5 +1,3 @@
 """Oregon Invasives Hotline"""
-import sys
-
 
 __version__ = '1.16.2'
@@ -14,7 +14,7 @@ def notify_users_for_comment(comment_id):
     Send an email notification about the comment to the relevant users.
     """
     comment = Comment.objects.get(pk=comment_id)
-    report = comment.report    
+    report = comment.report
     recipients = set()
 
     # Notify staff & managers who commented on the report
@@ -1,5 +1,3 @@
-from unittest.mock import Mock
-
 from django.core import mail
 from django.contrib.gis.geos import Point
 from django.test import TestCase, TransactionTestCase
@@ -56,7 +54,8 @@ class CommentFormTest(TransactionTestCase, UserMixin):
         report = make(Report, point=ORIGIN)
 
         should_be_notified = make(Comment, report=report, created_by=self.admin).created_by.email
-        should_not_be_notified = make(Comment, report=report, created_by=self.inactive_user).created_by.email
+        should_not_be_notified = make(
+            Comment, report=report, created_by=self.inactive_user).created_by.email
         form = CommentForm({'body': "foo"}, user=other_user, report=report)
         self.assertTrue(form.is_valid())
 
@@ -217,7 +216,8 @@ class CommentEditViewTest(TestCase, UserMixin):
             "form-INITIAL_FORMS": "0",
             "form-MIN_NUM_FORMS": "0",
             "form-MAX_NUM_FORMS": "1000",
-            "form-0-image_data_uri": "data:image/gif;base64,R0lGODlhAQABAIAAAAUEBAAAACwAAAAAAQABAAACAkQBADs=",
+            "form-0-image_data_uri": (
+                "data:image/gif;base64,R0lGODlhAQABAIAAAAUEBAAAACwAAAAAAQABAAACAkQBADs="),
             "form-0-name": "Hello world",
             "form-0-visibility": Image.PUBLIC,
         }
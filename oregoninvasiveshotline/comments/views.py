@@ -25,13 +25,15 @@ def edit(request, comment_id):
     if not can_edit_comment(request.user, comment):
         raise PermissionDenied()
 
-    PartialCommentForm = functools.partial(CommentForm, user=request.user, report=comment.report, instance=comment)
+    PartialCommentForm = functools.partial(
+        CommentForm, user=request.user, report=comment.report, instance=comment)
     # this is dumb, but the only way to pass an extra arg to the subform
     ImageFormSet = get_image_formset(user=request.user)
 
     if request.POST:
         form = PartialCommentForm(request.POST)
-        formset = ImageFormSet(request.POST, request.FILES, queryset=Image.objects.filter(comment=comment))
+        formset = ImageFormSet(
+            request.POST, request.FILES, queryset=Image.objects.filter(comment=comment))
         if form.is_valid() and formset.is_valid():
             form.save()
             formset.save(user=comment.created_by, fk=comment)
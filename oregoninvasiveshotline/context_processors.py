@@ -8,7 +8,7 @@ from oregoninvasiveshotline import __version__
 def defaults(request):
     # If the current Sentry span is defined, supply the attached
     # attached trace_id to the template context.
-    # 
+    #
     # This value allows a sentinel header to be set which allows
     # traces to span the frontend/backend boundary.
     trace_id = None
@@ -0,0 +1,32 @@
+import django.contrib.gis.db.models.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+SUBDIVIDE_COUNTIES = """
+INSERT INTO county_subdivision (county_id, the_geom)
+SELECT county_id, ST_Multi(ST_Subdivide(the_geom, 256))
+FROM county
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('counties', '0003_add_default_ordering_to_county_model'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CountySubdivision',
+            fields=[
+                ('county_subdivision_id', models.AutoField(primary_key=True, serialize=False)),
+                ('the_geom', django.contrib.gis.db.models.fields.MultiPolygonField(srid=4326)),
+                ('county', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subdivisions', to='counties.county')),
+            ],
+            options={
+                'db_table': 'county_subdivision',
+            },
+        ),
+        migrations.RunSQL(SUBDIVIDE_COUNTIES, migrations.RunSQL.noop),
+    ]
@@ -1,4 +1,10 @@
 from django.contrib.gis.db import models
+from django.db import connection
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from oregoninvasiveshotline.utils.cache import (
+    REFERENCE_DATA_NAMESPACE, REPORT_LIST_NAMESPACE, bump_version)
 
 
 class County(models.Model):
@@ -22,3 +28,63 @@ class County(models.Model):
 
     def __str__(self):
         return self.label
+
+
+class CountySubdivision(models.Model):
+
+    """A piece of a county's geometry.
+
+    County boundaries are detailed, so testing whether a point is in
+    one is slow. They're subdivided into pieces with a limited number
+    of vertices so that lookups only have to test small polygons whose
+    bounding boxes (in the GiST index) fit them closely. The pieces are
+    rebuilt whenever a county is saved; see :func:`county_for_point`.
+
+    """
+
+    class Meta:
+        db_table = 'county_subdivision'
+
+    county_subdivision_id = models.AutoField(primary_key=True)
+    county = models.ForeignKey(County, on_delete=models.CASCADE, related_name='subdivisions')
+    the_geom = models.MultiPolygonField(srid=4326)
+
+
+# Maximum number of vertices in each piece of a subdivided county
+COUNTY_SUBDIVISION_MAX_VERTICES = 256
+
+
+def subdivide_counties(county_ids=None):
+    """Rebuild the subdivisions of the specified counties (or of all
+    counties).
+    """
+    where = '' if county_ids is None else 'WHERE county_id = ANY(%s)'
+    params = [] if county_ids is None else [list(county_ids)]
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM county_subdivision {where}'.format(where=where), params)
+        cursor.execute(
+            """
+            INSERT INTO county_subdivision (county_id, the_geom)
+            SELECT county_id, ST_Multi(ST_Subdivide(the_geom, %s))
+            FROM county
+            {where}
+            """.format(where=where),
+            [COUNTY_SUBDIVISION_MAX_VERTICES] + params)
+
+
+def county_for_point(point):
+    """Get the county containing ``point`` or ``None``."""
+    return County.objects.filter(subdivisions__the_geom__intersects=point).first()
+
+
+@receiver([post_save, post_delete], sender=County)
+def receiver__invalidate_reference_data(sender, **kwargs):
+    bump_version(REFERENCE_DATA_NAMESPACE)
+    bump_version(REPORT_LIST_NAMESPACE)
+
+
+@receiver([post_save], sender=County)
+def receiver__subdivide_county(sender, instance, **kwargs):
+    # This is done for raw saves too so that loading the counties
+    # fixture subdivides them.
+    subdivide_counties([instance.pk])
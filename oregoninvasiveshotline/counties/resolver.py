@@ -0,0 +1,74 @@
+import math
+from collections import defaultdict
+
+from .models import County, CountySubdivision, county_for_point
+
+
+class CountyResolver:
+
+    """Resolves points to counties in memory.
+
+    The subdivided county geometries are loaded once and indexed by a
+    grid of ``cell_size`` degree cells. Each point is tested against
+    the (prepared) pieces whose cells it falls in, so resolving a batch
+    of points doesn't require a query per point. Points that fall on a
+    boundary, or in more than one county, are looked up in the database
+    with :func:`.models.county_for_point` so that the result is the
+    same as it would be for a single point.
+
+    This is meant for resolving many points at once (e.g., when
+    generating reports in the ``benchmark_report_queries`` command);
+    create a resolver for each batch so that changes to county
+    boundaries are picked up.
+
+    """
+
+    def __init__(self, cell_size=0.25):
+        self.cell_size = cell_size
+        self.counties = {county.pk: county for county in County.objects.defer('the_geom')}
+        self._grid = defaultdict(list)
+        pieces = CountySubdivision.objects.values_list('county_id', 'the_geom')
+        for (county_id, geom) in pieces:
+            piece = (county_id, geom.extent, geom.prepared)
+            (min_x, min_y, max_x, max_y) = geom.extent
+            for cell in self._cells(min_x, min_y, max_x, max_y):
+                self._grid[cell].append(piece)
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def _cells(self, min_x, min_y, max_x, max_y):
+        (first_col, first_row) = self._cell(min_x, min_y)
+        (last_col, last_row) = self._cell(max_x, max_y)
+        for col in range(first_col, last_col + 1):
+            for row in range(first_row, last_row + 1):
+                yield (col, row)
+
+    def resolve(self, points):
+        """Get the county containing each of ``points`` (or ``None``).
+
+        Points are expected to be in the same SRS as the counties
+        (WGS84).
+
+        """
+        return [self.resolve_one(point) for point in points]
+
+    def resolve_one(self, point):
+        if point is None:
+            return None
+        (x, y) = (point.x, point.y)
+        pieces = self._grid.get(self._cell(x, y), ())
+        candidates = [
+            (county_id, prepared)
+            for (county_id, (min_x, min_y, max_x, max_y), prepared) in pieces
+            if min_x <= x <= max_x and min_y <= y <= max_y
+        ]
+        county_ids = {
+            county_id for (county_id, prepared) in candidates if prepared.contains(point)}
+        if len(county_ids) == 1:
+            return self.counties[county_ids.pop()]
+        if county_ids or any(prepared.intersects(point) for (county_id, prepared) in candidates):
+            # The point is on a boundary (possibly between pieces of
+            # the same county) or in overlapping counties
+            return county_for_point(point)
+        return None
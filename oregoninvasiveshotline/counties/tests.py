@@ -0,0 +1,48 @@
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.test import TestCase
+
+from .models import County, CountySubdivision, county_for_point
+from .resolver import CountyResolver
+
+
+class CountyForPointTest(TestCase):
+
+    def setUp(self):
+        square = Polygon(((0, 0), (0, 1), (1, 1), (1, 0), (0, 0)), srid=4326)
+        self.county = County.objects.create(
+            name='Square', state='Oregon', the_geom=MultiPolygon(square, srid=4326))
+
+    def test_county_is_subdivided_when_saved(self):
+        self.assertTrue(CountySubdivision.objects.filter(county=self.county).exists())
+
+    def test_county_for_point(self):
+        self.assertEqual(county_for_point(Point(0.5, 0.5, srid=4326)), self.county)
+        self.assertIsNone(county_for_point(Point(2, 2, srid=4326)))
+
+
+class CountyResolverTest(TestCase):
+
+    def setUp(self):
+        self.west = County.objects.create(name='West', state='Oregon', the_geom=MultiPolygon(
+            Polygon(((0, 0), (0, 1), (1, 1), (1, 0), (0, 0)), srid=4326), srid=4326))
+        self.east = County.objects.create(name='East', state='Oregon', the_geom=MultiPolygon(
+            Polygon(((1, 0), (1, 1), (2, 1), (2, 0), (1, 0)), srid=4326), srid=4326))
+
+    def test_resolve(self):
+        resolver = CountyResolver()
+        points = [
+            Point(0.5, 0.5, srid=4326),
+            Point(1.5, 0.5, srid=4326),
+            Point(3, 3, srid=4326),
+            None,
+        ]
+        with self.assertNumQueries(0):
+            counties = resolver.resolve(points)
+        self.assertEqual(counties, [self.west, self.east, None, None])
+
+    def test_points_on_boundaries_are_resolved_in_the_database(self):
+        resolver = CountyResolver()
+        point = Point(1, 0.5, srid=4326)
+        with self.assertNumQueries(1):
+            county = resolver.resolve_one(point)
+        self.assertEqual(county, county_for_point(point))
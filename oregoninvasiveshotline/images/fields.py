@@ -90,7 +90,9 @@ class ClearableImageInput(ClearableFileInput):
                         return self._cached_value
                 elif has_file:
                     # we have a file, so write it to disk, just in case form validation fails
-                    with NamedTemporaryFile(prefix="".join(CHOICES[x % 64] for x in os.urandom(16)), suffix=".jpg", dir=self.tmp_dir, delete=False) as f:
+                    prefix = "".join(CHOICES[x % 64] for x in os.urandom(16))
+                    with NamedTemporaryFile(
+                            prefix=prefix, suffix=".jpg", dir=self.tmp_dir, delete=False) as f:
                         # write the uploaded file to disk, or the data from the dataURI
                         try:
                             if upload:
@@ -107,7 +109,8 @@ class ClearableImageInput(ClearableFileInput):
                     upload = UploadedFile(open(path, "rb"), name=path, size=os.path.getsize(path))
                     # tack on a URL attribute so the parent Widget thinks it
                     # has an initial value
-                    upload.url = settings.MEDIA_URL + os.path.relpath(upload.file.name, settings.MEDIA_ROOT)
+                    upload.url = settings.MEDIA_URL + os.path.relpath(
+                        upload.file.name, settings.MEDIA_ROOT)
 
             self._cached_value = upload
 
@@ -121,7 +124,9 @@ class ClearableImageInput(ClearableFileInput):
 
         output = super().render(name, value, attrs, renderer=renderer)
         if self.signed_path:
-            output += forms.HiddenInput().render(self.signed_path_field_name(name), self.signed_path, {})
+            output += forms.HiddenInput().render(
+                self.signed_path_field_name(name), self.signed_path, {})
 
-        output += forms.HiddenInput().render(self.data_uri_field_name(name), "", {"class": "datauri"})
+        output += forms.HiddenInput().render(
+            self.data_uri_field_name(name), "", {"class": "datauri"})
         return mark_safe(output)
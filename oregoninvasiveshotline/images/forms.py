@@ -58,6 +58,7 @@ def get_image_formset(*args, **kwargs):
 
     http://stackoverflow.com/a/813647/2733517
     """
-    ImageFormSet = modelformset_factory(Image, form=ImageForm, formset=BaseImageFormSet, can_delete=True)
+    ImageFormSet = modelformset_factory(
+        Image, form=ImageForm, formset=BaseImageFormSet, can_delete=True)
     ImageFormSet.form = staticmethod(functools.partial(ImageForm, *args, **kwargs))
     return ImageFormSet
@@ -0,0 +1,43 @@
+import os
+
+from django.conf import settings
+from django.db import migrations, models
+
+from oregoninvasiveshotline.utils.images import generate_thumbnail
+
+
+def generate_thumbnails(apps, schema_editor):
+    """Create any missing thumbnails and record which ones exist.
+
+    Previously, thumbnails were generated on demand while pages were
+    rendered; from here on they're created in the background when an
+    image is saved.
+
+    """
+    Image = apps.get_model('images', 'Image')
+    output_dir = os.path.join(settings.MEDIA_ROOT, 'generated_thumbnails')
+    os.makedirs(output_dir, exist_ok=True)
+
+    image_ids = []
+    for image in Image.objects.exclude(image='').iterator():
+        output_path = os.path.join(output_dir, '{image.pk}.png'.format(image=image))
+        if os.path.exists(output_path) or generate_thumbnail(image.image.path, output_path, width=64, height=64):
+            image_ids.append(image.pk)
+
+    Image.objects.filter(pk__in=image_ids).update(has_thumbnail=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0002_auto_20150727_1511'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='has_thumbnail',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(generate_thumbnails, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,12 @@
-from django.db import models
+import os
+import posixpath
 
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from oregoninvasiveshotline.utils.images import generate_thumbnail
 from oregoninvasiveshotline.visibility import Visibility
 
 
@@ -11,16 +18,66 @@ class Image(Visibility, models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     visibility = models.IntegerField(choices=Visibility.choices, default=Visibility.PROTECTED)
 
+    # Set once the thumbnail has been generated in the background so
+    # that pages never have to check for (or create) it on disk
+    has_thumbnail = models.BooleanField(default=False, editable=False)
+
     # create a nullable FK to every object that can have images
-    report = models.ForeignKey("reports.Report", null=True, default=None, on_delete=models.SET_NULL)
-    comment = models.ForeignKey("comments.Comment", null=True, default=None, on_delete=models.SET_NULL)
-    species = models.ForeignKey("species.Species", null=True, default=None, on_delete=models.SET_NULL)
+    report = models.ForeignKey(
+        "reports.Report", null=True, default=None, on_delete=models.SET_NULL)
+    comment = models.ForeignKey(
+        "comments.Comment", null=True, default=None, on_delete=models.SET_NULL)
+    species = models.ForeignKey(
+        "species.Species", null=True, default=None, on_delete=models.SET_NULL)
+
+    thumbnail_dir = 'generated_thumbnails'
+    thumbnail_size = (64, 64)
 
     class Meta:
         db_table = "image"
         ordering = ['pk']
 
+    @property
+    def thumbnail_file_name(self):
+        return '{image.pk}.png'.format(image=self)
+
+    @property
+    def thumbnail_path(self):
+        return os.path.join(settings.MEDIA_ROOT, self.thumbnail_dir, self.thumbnail_file_name)
+
+    @property
+    def thumbnail_url(self):
+        return posixpath.join(settings.MEDIA_URL, self.thumbnail_dir, self.thumbnail_file_name)
+
+    def generate_thumbnail(self, force=False):
+        """Generate thumbnail for this image; return ``True`` on success.
+
+        The thumbnail is only regenerated if it doesn't already exist
+        unless ``force`` is set.
+
+        """
+        if not force and os.path.exists(self.thumbnail_path):
+            return True
+        width, height = self.thumbnail_size
+        return generate_thumbnail(self.image.path, self.thumbnail_path, width=width, height=height)
+
     def __str__(self):
         if self.name:
             return self.name
         return self.image.path
+
+
+@receiver([post_save], sender=Image)
+def receiver__generate_thumbnail(sender, instance, raw, **kwargs):
+    """Generate the thumbnail for a saved image in the background.
+
+    The task is queued once the current transaction commits so the
+    worker is guaranteed to see the image. It's regenerated on every
+    save since the image file may have been replaced.
+
+    """
+    if raw or not instance.image:
+        return
+
+    from .tasks import generate_thumbnail as generate_thumbnail_task
+    transaction.on_commit(lambda: generate_thumbnail_task.delay(instance.pk, force=True))
@@ -0,0 +1,25 @@
+from oregoninvasiveshotline.celery import app
+from oregoninvasiveshotline.reports.models import (
+    Report, get_image_report_ids, mark_reports_updated)
+from oregoninvasiveshotline.tasks import rebuild_home_snapshot
+
+from .models import Image
+
+
+@app.task
+def generate_thumbnail(image_id, force=False):
+    """Generate the thumbnail for an image and record that it exists."""
+    image = Image.objects.filter(pk=image_id).first()
+    if image is None or not image.image:
+        return
+    if image.generate_thumbnail(force=force):
+        report_ids = get_image_report_ids(image)
+        if not image.has_thumbnail:
+            # Use update() so the post_save receiver doesn't queue this again
+            Image.objects.filter(pk=image_id).update(has_thumbnail=True)
+            mark_reports_updated(report_ids)
+        # The image may be shown on the home page now, if it and its
+        # report are public
+        if image.visibility == Image.PUBLIC:
+            if Report.objects.filter(pk__in=report_ids, is_public=True).exists():
+                rebuild_home_snapshot.delay()
@@ -25,7 +25,8 @@ class ImageFormTest(TestCase, UserMixin):
         user = self.create_user(username="foo@example.com")
         form = ImageForm()
         self.assertNotIn("visibility", form.fields)
-        with patch("oregoninvasiveshotline.images.forms.can_adjust_visibility", return_value=False):
+        can_adjust_visibility = "oregoninvasiveshotline.images.forms.can_adjust_visibility"
+        with patch(can_adjust_visibility, return_value=False):
             form = ImageForm(user=user)
             self.assertNotIn("visibility", form.fields)
 
@@ -36,13 +37,15 @@ class ImageFormTest(TestCase, UserMixin):
 
 class BaseImageFormSetTest(TestCase, UserMixin):
     def test_user_and_fk_gets_passed_to_save_new(self):
-        ImageFormSet = modelformset_factory(Image, form=ImageForm, formset=BaseImageFormSet, can_delete=True)
+        ImageFormSet = modelformset_factory(
+            Image, form=ImageForm, formset=BaseImageFormSet, can_delete=True)
         formset = ImageFormSet({
             "form-TOTAL_FORMS": "1",
             "form-INITIAL_FORMS": "0",
             "form-MIN_NUM_FORMS": "0",
             "form-MAX_NUM_FORMS": "1000",
-            "form-0-image_data_uri": "data:image/gif;base64,R0lGODlhAQABAIAAAAUEBAAAACwAAAAAAQABAAACAkQBADs=",
+            "form-0-image_data_uri": (
+                "data:image/gif;base64,R0lGODlhAQABAIAAAAUEBAAAACwAAAAAAQABAAACAkQBADs="),
             "form-0-name": "Hello world",
         })
         self.assertTrue(formset.is_valid())
@@ -61,14 +64,16 @@ class GetImageFormSetTest(TestCase, UserMixin):
             "form-INITIAL_FORMS": "0",
             "form-MIN_NUM_FORMS": "0",
             "form-MAX_NUM_FORMS": "1000",
-            "form-0-image_data_uri": "data:image/gif;base64,R0lGODlhAQABAIAAAAUEBAAAACwAAAAAAQABAAACAkQBADs=",
+            "form-0-image_data_uri": (
+                "data:image/gif;base64,R0lGODlhAQABAIAAAAUEBAAAACwAAAAAAQABAAACAkQBADs="),
             "form-0-name": "Hello world",
             "form-0-visibility": Image.PUBLIC,
         })
         self.assertTrue(formset.is_valid())
         report = make(Report, point=ORIGIN)
         formset.save(fk=report, user=user)
-        self.assertEqual(Image.objects.filter(report=report, created_by=user, visibility=Image.PUBLIC).count(), 1)
+        images = Image.objects.filter(report=report, created_by=user, visibility=Image.PUBLIC)
+        self.assertEqual(images.count(), 1)
 
 
 class ClearableImageInputTest(TestCase):
@@ -137,7 +142,9 @@ class ClearableImageInputTest(TestCase):
 
         # post a new image
         img_uri = "data:image/gif;base64," + self.other_b64
-        form = self.Form({"name": "hello", "image_signed_path": signed_path, "image_data_uri": img_uri})
+        form = self.Form({
+            "name": "hello", "image_signed_path": signed_path, "image_data_uri": img_uri})
         self.assertTrue(form.is_valid())
         self.assertNotEqual(signed_path, form.fields['image'].widget.signed_path)
-        self.assertEqual(open(form.fields['image'].widget.signed_path.split(":")[0], 'rb').read(), b64decode(self.other_b64))
+        path = form.fields['image'].widget.signed_path.split(":")[0]
+        self.assertEqual(open(path, 'rb').read(), b64decode(self.other_b64))
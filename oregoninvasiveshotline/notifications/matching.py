@@ -0,0 +1,142 @@
+"""Match reports against subscriptions without a query per subscription.
+
+Each :class:`.models.UserNotificationQuery` stores the query string of
+a :class:`ReportSearchForm` search along with the criteria parsed from
+it. Instead of running each search to see whether it includes a new
+report, the criteria are compiled into a list of predicates that are
+evaluated against the report in Python. Only predicates that can't be
+evaluated without the database (keyword searches and invites) run
+queries, and their results are shared by all of the subscriptions
+that need them.
+
+Subscriptions are also indexed by the categories and counties they're
+restricted to (see :class:`.models.SubscriptionIndexEntry`), so only
+those that could match a report need to be compiled at all.
+
+The predicates must stay in sync with :meth:`ReportSearchForm.search`.
+
+"""
+from django.contrib.postgres.search import SearchQuery
+from django.db.models import Q
+
+from oregoninvasiveshotline.counties.models import County
+from oregoninvasiveshotline.reports.models import Invite, Report
+from oregoninvasiveshotline.species.models import Category
+
+from .models import SubscriptionIndexEntry, UserNotificationQuery
+
+
+class MatchContext:
+
+    """A report being matched and the results of the queries needed to
+    match it, which are run at most once each.
+    """
+
+    def __init__(self, report):
+        self.report = report
+        self._keyword_matches = {}
+        self._invited_user_ids = None
+        self._category_ids = None
+        self._county_ids = None
+
+    def matches_keyword(self, keyword):
+        if keyword not in self._keyword_matches:
+            reports = Report.objects.filter(pk=self.report.pk, search_vector=SearchQuery(keyword))
+            self._keyword_matches[keyword] = reports.exists()
+        return self._keyword_matches[keyword]
+
+    def is_invited(self, user):
+        if self._invited_user_ids is None:
+            invites = Invite.objects.filter(report=self.report).values_list('user_id', flat=True)
+            self._invited_user_ids = set(invites)
+        return user.pk in self._invited_user_ids
+
+    def categories_exist(self, ids):
+        if self._category_ids is None:
+            self._category_ids = set(Category.objects.values_list('pk', flat=True))
+        return ids <= self._category_ids
+
+    def counties_exist(self, ids):
+        if self._county_ids is None:
+            self._county_ids = set(County.objects.values_list('pk', flat=True))
+        return ids <= self._county_ids
+
+
+def compile_subscription(subscription):
+    """Compile ``subscription`` into a predicate taking a
+    :class:`MatchContext`.
+    """
+    user = subscription.user
+    # As with the search form, which fields are checked depends on
+    # whether the user is a manager
+    if not subscription.is_valid or (user.is_active and not subscription.is_valid_for_managers):
+        return lambda context: False
+
+    predicates = []
+
+    if not user.is_active:
+        predicates.append(lambda report: report.is_public)
+
+    counties = set(subscription.county_ids)
+    if counties:
+        predicates.append(lambda report: report.county_id in counties)
+
+    categories = set(subscription.category_ids)
+    if categories:
+        predicates.append(lambda report: report.effective_category_id in categories)
+
+    # Only managers can search by these
+    if user.is_active:
+        is_archived = subscription.is_archived
+        if is_archived is not None:
+            predicates.append(lambda report: report.is_archived == is_archived)
+
+        is_public = subscription.is_public
+        if is_public is not None:
+            predicates.append(lambda report: report.is_public == is_public)
+
+        claimed_by = subscription.claimed_by
+        if claimed_by == 'me':
+            predicates.append(lambda report: report.claimed_by_id == user.pk)
+        elif claimed_by == 'nobody':
+            predicates.append(lambda report: report.claimed_by_id is None)
+
+    source = subscription.source
+    if source == 'reported' and user.is_active:
+        predicates.append(lambda report: report.created_by_id == user.pk)
+
+    # These need the database, so they're checked last
+    queries = []
+
+    # The search form doesn't accept categories or counties that don't
+    # exist (any more)
+    if categories:
+        queries.append(lambda context: context.categories_exist(categories))
+    if counties:
+        queries.append(lambda context: context.counties_exist(counties))
+
+    if source == 'invited':
+        queries.append(lambda context: context.is_invited(user))
+
+    keyword = subscription.keyword
+    if keyword:
+        queries.append(lambda context: context.matches_keyword(keyword))
+
+    def match(context):
+        return (
+            all(predicate(context.report) for predicate in predicates) and
+            all(query(context) for query in queries)
+        )
+
+    return match
+
+
+def get_candidate_subscriptions(report):
+    """Get the subscriptions whose category and county restrictions
+    allow them to match ``report``.
+    """
+    entries = SubscriptionIndexEntry.objects.filter(
+        Q(category_id=report.effective_category_id) | Q(category_id__isnull=True),
+        Q(county_id=report.county_id) | Q(county_id__isnull=True),
+    )
+    return UserNotificationQuery.objects.filter(pk__in=entries.values('subscription_id'))
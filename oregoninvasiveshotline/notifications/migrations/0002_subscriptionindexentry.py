@@ -0,0 +1,28 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubscriptionIndexEntry',
+            fields=[
+                ('subscription_index_entry_id', models.AutoField(primary_key=True, serialize=False)),
+                ('category_id', models.IntegerField(null=True)),
+                ('county_id', models.IntegerField(null=True)),
+                ('subscription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='index_entries', to='notifications.usernotificationquery')),
+            ],
+            options={
+                'db_table': 'subscription_index_entry',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='subscriptionindexentry',
+            index=models.Index(fields=['category_id', 'county_id'], name='subscription_index_idx'),
+        ),
+    ]
@@ -0,0 +1,134 @@
+import django.contrib.postgres.fields
+from django.db import migrations, models
+from django.http import QueryDict
+
+
+# The values the search form accepted for its choice fields when this
+# migration was written, and the criteria they map to
+IS_ARCHIVED = {'': None, 'archived': True, 'notarchived': False}
+IS_PUBLIC = {'': None, 'public': True, 'notpublic': False}
+CLAIMED_BY = ('', 'me', 'nobody')
+SOURCES = ('', 'invited', 'reported')
+ORDERINGS = ('', 'species', 'category', '-created_on')
+
+
+def get_ids(query, name):
+    """Get the IDs ``name`` is restricted to, or ``None`` if any of its
+    values isn't an ID.
+    """
+    ids = set()
+    for value in query.getlist(name):
+        try:
+            pk = int(value)
+        except ValueError:
+            return None
+        if str(pk) != value:
+            return None
+        ids.add(pk)
+    return sorted(ids)
+
+
+def parse_queries(apps, schema_editor):
+    UserNotificationQuery = apps.get_model('notifications', 'UserNotificationQuery')
+    SubscriptionIndexEntry = apps.get_model('notifications', 'SubscriptionIndexEntry')
+
+    subscriptions = []
+    entries = []
+    for subscription in UserNotificationQuery.objects.iterator():
+        query = QueryDict(subscription.query)
+        category_ids = get_ids(query, 'categories')
+        county_ids = get_ids(query, 'counties')
+        # Only these fields are checked for users who aren't managers
+        subscription.is_valid = (
+            category_ids is not None and
+            county_ids is not None and
+            query.get('source', '') in SOURCES and
+            query.get('order_by', '') in ORDERINGS
+        )
+        subscription.is_valid_for_managers = (
+            subscription.is_valid and
+            query.get('is_archived', '') in IS_ARCHIVED and
+            query.get('is_public', '') in IS_PUBLIC and
+            query.get('claimed_by', '') in CLAIMED_BY
+        )
+        if subscription.is_valid:
+            subscription.category_ids = category_ids
+            subscription.county_ids = county_ids
+            subscription.keyword = query.get('q', '').strip()
+            subscription.source = query.get('source', '')
+            entries.extend(
+                SubscriptionIndexEntry(
+                    subscription=subscription, category_id=category_id, county_id=county_id)
+                for category_id in (category_ids or [None])
+                for county_id in (county_ids or [None])
+            )
+        if subscription.is_valid_for_managers:
+            subscription.is_archived = IS_ARCHIVED[query.get('is_archived', '')]
+            subscription.is_public = IS_PUBLIC[query.get('is_public', '')]
+            subscription.claimed_by = query.get('claimed_by', '')
+        subscriptions.append(subscription)
+
+    UserNotificationQuery.objects.bulk_update(
+        subscriptions,
+        [
+            'is_valid', 'is_valid_for_managers', 'category_ids', 'county_ids', 'keyword',
+            'is_archived', 'is_public', 'claimed_by', 'source',
+        ],
+        batch_size=1000)
+    SubscriptionIndexEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_subscriptionindexentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usernotificationquery',
+            name='is_valid',
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='usernotificationquery',
+            name='is_valid_for_managers',
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='usernotificationquery',
+            name='category_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddField(
+            model_name='usernotificationquery',
+            name='county_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddField(
+            model_name='usernotificationquery',
+            name='keyword',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='usernotificationquery',
+            name='is_archived',
+            field=models.BooleanField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='usernotificationquery',
+            name='is_public',
+            field=models.BooleanField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='usernotificationquery',
+            name='claimed_by',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='usernotificationquery',
+            name='source',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16),
+        ),
+        migrations.RunPython(parse_queries, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,111 @@
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
 from django.http import QueryDict
 
 from oregoninvasiveshotline.species.models import Category
 from oregoninvasiveshotline.counties.models import County
+from oregoninvasiveshotline.users.models import invalidate_tab_counts
+from oregoninvasiveshotline.utils.cache import get_reference_data
+
+
+# The values of the search form's choice fields; queries with other
+# values aren't valid
+QUERY_CHOICES = {
+    'is_archived': ('', 'archived', 'notarchived'),
+    'is_public': ('', 'public', 'notpublic'),
+    'claimed_by': ('', 'me', 'nobody'),
+    'source': ('', 'invited', 'reported'),
+    'order_by': ('', 'species', 'category', '-created_on'),
+}
+
+# The criteria of invalid queries, which don't match any reports
+INVALID_CRITERIA = {
+    'is_valid': False,
+    'is_valid_for_managers': False,
+    'category_ids': [],
+    'county_ids': [],
+    'keyword': '',
+    'is_archived': None,
+    'is_public': None,
+    'claimed_by': '',
+    'source': '',
+}
+
+
+def _get_ids(query, name):
+    """Get the IDs ``name`` is restricted to, or ``None`` if any of its
+    values isn't an ID.
+    """
+    ids = set()
+    for value in query.getlist(name):
+        try:
+            pk = int(value)
+        except ValueError:
+            return None
+        # The form compares values to the IDs as strings
+        if str(pk) != value:
+            return None
+        ids.add(pk)
+    return sorted(ids)
+
+
+def parse_query(query):
+    """Parse the criteria of a :class:`ReportSearchForm` query string.
+
+    Returns a dict of values for the criteria fields of
+    :class:`UserNotificationQuery`. Queries with values that the search
+    form wouldn't accept aren't valid; their criteria are left empty.
+    Whether the categories and counties exist is checked when matching.
+
+    As in the form, the fields only managers can search by are ignored
+    for everyone else (see ``ReportSearchForm.public_fields``), so bad
+    values of those only make the query invalid for managers.
+
+    """
+    from oregoninvasiveshotline.reports.forms import ReportSearchForm  # avoid circular import
+
+    query = QueryDict(query)
+    category_ids = _get_ids(query, 'categories')
+    county_ids = _get_ids(query, 'counties')
+    invalid_fields = {
+        name for (name, choices) in QUERY_CHOICES.items() if query.get(name, '') not in choices}
+    if category_ids is None:
+        invalid_fields.add('categories')
+    if county_ids is None:
+        invalid_fields.add('counties')
+
+    if invalid_fields.intersection(ReportSearchForm.public_fields):
+        return dict(INVALID_CRITERIA)
+    criteria = {
+        'is_valid': True,
+        'is_valid_for_managers': not invalid_fields,
+        'category_ids': category_ids,
+        'county_ids': county_ids,
+        'keyword': query.get('q', '').strip(),
+        'is_archived': None,
+        'is_public': None,
+        'claimed_by': '',
+        'source': query.get('source', ''),
+    }
+    if not invalid_fields:
+        criteria.update({
+            'is_archived': {'archived': True, 'notarchived': False}.get(query.get('is_archived')),
+            'is_public': {'public': True, 'notpublic': False}.get(query.get('is_public')),
+            'claimed_by': query.get('claimed_by', ''),
+        })
+    return criteria
+
+
+def _get_category_names():
+    return get_reference_data(
+        'category-names', lambda: dict(Category.objects.values_list('pk', 'name')))
+
+
+def _get_county_names():
+    return get_reference_data(
+        'county-names', lambda: dict(County.objects.values_list('pk', 'name')))
 
 
 class UserNotificationQuery(models.Model):
@@ -29,29 +132,91 @@ class UserNotificationQuery(models.Model):
     )
     created_on = models.DateTimeField(auto_now_add=True)
 
+    # The criteria of the query, parsed from it when saved so they
+    # don't have to be parsed every time they're used; see
+    # parse_query(). A NULL flag means the query doesn't filter by it.
+    # Invalid queries don't match any reports. Some queries are only
+    # invalid for managers, who can search by more of the form's fields.
+    is_valid = models.BooleanField(default=True, editable=False)
+    is_valid_for_managers = models.BooleanField(default=True, editable=False)
+    category_ids = ArrayField(models.IntegerField(), default=list, blank=True, editable=False)
+    county_ids = ArrayField(models.IntegerField(), default=list, blank=True, editable=False)
+    keyword = models.TextField(blank=True, default='', editable=False)
+    is_archived = models.BooleanField(null=True, editable=False)
+    is_public = models.BooleanField(null=True, editable=False)
+    claimed_by = models.CharField(max_length=16, blank=True, default='', editable=False)
+    source = models.CharField(max_length=16, blank=True, default='', editable=False)
+
+    def set_criteria(self):
+        for name, value in parse_query(self.query).items():
+            setattr(self, name, value)
+
     @property
     def pretty_query(self):
         """
         Returns a dictionary of human-readable names for select query parameters
         """
-        query = QueryDict(self.query)
         query_items = {}
-        if query.get('categories'):
-            categories = Category.objects.filter(pk__in=query.getlist('categories'))
-            categories = categories.values_list('name', flat=True).order_by('name')
+        if self.category_ids:
+            names = _get_category_names()
+            categories = sorted(names[pk] for pk in self.category_ids if pk in names)
             query_items['Categories'] = ", ".join(categories)
-        if query.get('counties'):
-            counties = County.objects.filter(pk__in=query.getlist('counties'))
-            counties = counties.values_list('name', flat=True).order_by('name')
+        if self.county_ids:
+            names = _get_county_names()
+            counties = sorted(names[pk] for pk in self.county_ids if pk in names)
             query_items['Counties'] = ", ".join(counties)
-        if query.get('q'):
-            query_items['Keyword'] = query['q']
+        if self.keyword:
+            query_items['Keyword'] = self.keyword
         return query_items
 
     def __str__(self):
         return self.name
 
 
+class SubscriptionIndexEntry(models.Model):
+    """
+    Maps a category and county to a subscription whose search could
+    include reports in that category and county.
+
+    Subscriptions get an entry for each combination of the categories
+    and counties they're restricted to. A ``NULL`` category or county
+    means the subscription isn't restricted by it. This is used to find
+    the subscriptions a new report could match without checking all of
+    them; see ``notifications.matching.get_candidate_subscriptions``.
+    """
+    class Meta:
+        db_table = 'subscription_index_entry'
+        indexes = [
+            models.Index(fields=['category_id', 'county_id'], name='subscription_index_idx'),
+        ]
+
+    subscription_index_entry_id = models.AutoField(primary_key=True)
+    subscription = models.ForeignKey(
+        UserNotificationQuery, on_delete=models.CASCADE, related_name='index_entries')
+    # These aren't foreign keys since subscriptions can refer to
+    # categories and counties that no longer exist.
+    category_id = models.IntegerField(null=True)
+    county_id = models.IntegerField(null=True)
+
+
+def index_subscription(subscription):
+    """Rebuild the index entries for ``subscription``.
+
+    Invalid subscriptions can't match any reports, so they aren't
+    indexed.
+
+    """
+    SubscriptionIndexEntry.objects.filter(subscription=subscription).delete()
+    if not subscription.is_valid:
+        return
+    SubscriptionIndexEntry.objects.bulk_create(
+        SubscriptionIndexEntry(
+            subscription=subscription, category_id=category_id, county_id=county_id)
+        for category_id in (subscription.category_ids or [None])
+        for county_id in (subscription.county_ids or [None])
+    )
+
+
 class Notification(models.Model):
     """
     Keeps track of notifications to users.
@@ -69,3 +234,19 @@ class Notification(models.Model):
 
     def __str__(self):
         return 'Notification for: report "{0.report.title}"'.format(self)
+
+
+@receiver([post_save, post_delete], sender=UserNotificationQuery)
+def receiver__invalidate_tab_counts(sender, instance, **kwargs):
+    invalidate_tab_counts(instance.user_id)
+
+
+@receiver([pre_save], sender=UserNotificationQuery)
+def receiver__set_criteria(sender, instance, **kwargs):
+    instance.set_criteria()
+
+
+@receiver([post_save], sender=UserNotificationQuery)
+def receiver__index_subscription(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_subscription(instance)
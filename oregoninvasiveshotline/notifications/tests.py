@@ -1,16 +1,16 @@
-from unittest.mock import Mock
-
-from django.core import mail
 from django.contrib.gis.geos import Point
+from django.http import QueryDict
 from django.test import TestCase
 from django.urls import reverse
 
 from model_mommy.mommy import make
 
 from oregoninvasiveshotline.utils.test.user import UserMixin
-from oregoninvasiveshotline.reports.models import Report
-from oregoninvasiveshotline.species.models import Category
+from oregoninvasiveshotline.reports.forms import ReportSearchForm
+from oregoninvasiveshotline.reports.models import Invite, Report
+from oregoninvasiveshotline.species.models import Category, Species
 
+from .matching import MatchContext, compile_subscription, get_candidate_subscriptions
 from .models import UserNotificationQuery
 
 
@@ -74,3 +74,144 @@ class UserNotificationQueryPrettyQuery(TestCase, UserMixin):
             'Keyword': 'foobarius'
         }
         self.assertEqual(subscription.pretty_query, expected_output)
+
+        # The names are cached for other subscriptions
+        with self.assertNumQueries(0):
+            self.assertEqual(subscription.pretty_query, expected_output)
+
+    def test_criteria_are_parsed_from_query(self):
+        user = self.create_user(username='foo@example.com')
+        subscription = UserNotificationQuery.objects.create(
+            query='q=+foobarius+&categories=2&categories=1&is_archived=notarchived&claimed_by=me',
+            user=user,
+        )
+        subscription.refresh_from_db()
+        self.assertTrue(subscription.is_valid)
+        self.assertEqual(subscription.category_ids, [1, 2])
+        self.assertEqual(subscription.county_ids, [])
+        self.assertEqual(subscription.keyword, 'foobarius')
+        self.assertIs(subscription.is_archived, False)
+        self.assertIsNone(subscription.is_public)
+        self.assertEqual(subscription.claimed_by, 'me')
+        self.assertEqual(subscription.source, '')
+
+    def test_queries_the_search_form_wouldnt_accept_are_invalid(self):
+        user = self.create_user(username='foo@example.com')
+        for query in ('counties=x', 'categories=1&categories=01', 'order_by=x'):
+            subscription = UserNotificationQuery.objects.create(query=query, user=user)
+            self.assertFalse(subscription.is_valid, query)
+            self.assertFalse(subscription.index_entries.exists(), query)
+
+    def test_manager_fields_only_make_queries_invalid_for_managers(self):
+        user = self.create_user(username='foo@example.com')
+        subscription = UserNotificationQuery.objects.create(query='q=foo&is_public=yes', user=user)
+        self.assertTrue(subscription.is_valid)
+        self.assertFalse(subscription.is_valid_for_managers)
+        self.assertEqual(subscription.keyword, 'foo')
+        self.assertTrue(subscription.index_entries.exists())
+
+
+class CompileSubscriptionTest(TestCase, UserMixin):
+
+    def setUp(self):
+        self.manager = self.create_user(username='manager@example.com', is_active=True)
+        self.public = self.create_user(username='public@example.com', is_active=False)
+        self.category = make(Category)
+        species = make(Species, name='Foobarius', category=self.category)
+        self.reports = [
+            make(Report, point=ORIGIN, reported_species=species, reported_category=self.category),
+            make(Report, point=ORIGIN, is_public=True, claimed_by=self.manager),
+            make(Report, point=ORIGIN, is_archived=True, created_by=self.manager),
+        ]
+        make(Invite, report=self.reports[1], user=self.manager)
+
+    def assertMatchesSearch(self, user, query):
+        for report in self.reports:
+            subscription = make(UserNotificationQuery, user=user, query=query)
+            form = ReportSearchForm(QueryDict(query), user=user)
+            reports = Report.objects.filter(pk=report.pk)
+            expected = form.is_valid() and form.search(reports).exists()
+            self.assertEqual(
+                compile_subscription(subscription)(MatchContext(report)), expected,
+                '{query!r} for report {report.pk}'.format(query=query, report=report))
+
+    def test_predicates_match_search(self):
+        queries = [
+            '',
+            'categories={pk}'.format(pk=self.category.pk),
+            'categories=0',
+            'categories={pk}&categories=0'.format(pk=self.category.pk),
+            'categories=x',
+            'counties=x',
+            'source=nobody',
+            'order_by=x',
+            'is_public=yes',
+            'claimed_by=x',
+            'is_archived=archived',
+            'is_archived=notarchived',
+            'is_public=public',
+            'is_public=notpublic',
+            'claimed_by=me',
+            'claimed_by=nobody',
+            'source=reported',
+            'source=invited',
+            'q=foobarius',
+            'q=nothing',
+        ]
+        for user in (self.manager, self.public):
+            for query in queries:
+                self.assertMatchesSearch(user, query)
+
+    def test_invalid_queries_never_match(self):
+        for user in (self.manager, self.public):
+            subscription = make(UserNotificationQuery, user=user, query='counties=x')
+            for report in self.reports:
+                self.assertFalse(compile_subscription(subscription)(MatchContext(report)))
+            self.assertNotIn(subscription, get_candidate_subscriptions(self.reports[0]))
+
+    def test_only_keyword_searches_use_the_database(self):
+        subscription = make(
+            UserNotificationQuery, user=self.manager, query='claimed_by=me&is_public=public')
+        match = compile_subscription(subscription)
+        with self.assertNumQueries(0):
+            self.assertTrue(match(MatchContext(self.reports[1])))
+
+        context = MatchContext(self.reports[0])
+        subscriptions = make(
+            UserNotificationQuery, user=self.manager, query='q=foobarius', _quantity=3)
+        with self.assertNumQueries(1):
+            for subscription in subscriptions:
+                self.assertTrue(compile_subscription(subscription)(context))
+
+
+class GetCandidateSubscriptionsTest(TestCase, UserMixin):
+
+    def setUp(self):
+        self.user = self.create_user(username='foo@example.com', is_active=True)
+        self.category, self.other_category = make(Category, _quantity=2)
+        self.report = make(
+            Report, point=ORIGIN, reported_category=self.category, actual_species=None)
+
+    def test_candidates(self):
+        anything = make(UserNotificationQuery, user=self.user, query='q=foo')
+        category = make(
+            UserNotificationQuery, user=self.user,
+            query='categories={0.pk}'.format(self.category))
+        categories = make(
+            UserNotificationQuery, user=self.user,
+            query='categories={0.pk}&categories={1.pk}'.format(self.category, self.other_category))
+        other_category = make(
+            UserNotificationQuery, user=self.user,
+            query='categories={0.pk}'.format(self.other_category))
+        county = make(UserNotificationQuery, user=self.user, query='counties=1')
+        self.assertEqual(
+            set(get_candidate_subscriptions(self.report)),
+            {anything, category, categories})
+
+        # Edited subscriptions are reindexed
+        other_category.query = 'categories={0.pk}'.format(self.category)
+        other_category.save()
+        county.delete()
+        self.assertEqual(
+            set(get_candidate_subscriptions(self.report)),
+            {anything, category, categories, other_category})
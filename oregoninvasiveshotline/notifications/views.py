@@ -47,8 +47,11 @@ def edit(request, subscription_id):
             if new_owner != old_owner:
                 # If the owner has changed, send the new owner an email updating
                 # them of their newly assigned subscription
-                transaction.on_commit(lambda: notify_new_subscription_owner.delay(instance.pk, request.user.pk))
-                messages.success(request, 'Subscription updated. {0.full_name} has been notified'.format(new_owner))
+                transaction.on_commit(
+                    lambda: notify_new_subscription_owner.delay(instance.pk, request.user.pk))
+                messages.success(
+                    request,
+                    'Subscription updated. {0.full_name} has been notified'.format(new_owner))
             else:
                 messages.success(request, 'Subscription updated')
             return redirect('notifications-admin-list')
@@ -83,7 +86,7 @@ def admin_list(request):
     """List of all subscriptions that only admins can access."""
     # XXX: Not sure if this should be sorted by subscription name or
     # XXX: user. We should probably make these searchable.
-    subscriptions = UserNotificationQuery.objects.all().order_by('name')
+    subscriptions = UserNotificationQuery.objects.all().select_related('user').order_by('name')
 
     active_page = request.GET.get('page')
     paginator = Paginator(subscriptions, settings.ITEMS_PER_PAGE)
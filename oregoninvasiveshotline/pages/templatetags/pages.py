@@ -22,7 +22,8 @@ def getcontent(context, url, default=None):
         page.save()
 
     if context.get('user', None) and getattr(context['user'], "is_staff", False) and page.pk:
-        edit_url = reverse("pages-edit", args=[page.pk]) + "?next=" + getattr(context.get("request"), "get_full_path", lambda: "")()
+        next_url = getattr(context.get("request"), "get_full_path", lambda: "")()
+        edit_url = reverse("pages-edit", args=[page.pk]) + "?next=" + next_url
         page.content += "<a class='getcontent-edit' href='%s'>Edit</a>" % edit_url
 
     return mark_safe(page.content)
@@ -0,0 +1,78 @@
+"""Memoization of permission check results.
+
+Permission checks are often repeated for the same user and instance
+while handling a single request (e.g., once in the view and again for
+each form and template tag). Within a :func:`memoized` scope, the
+result of each check is remembered and reused. Outside of such a scope,
+permission functions are called every time.
+
+A scope is usually opened for each request by
+:class:`.middleware.PermissionsMemoMiddleware`. After a mutation that
+could change the outcome of a check, call :func:`invalidate`.
+
+"""
+import contextlib
+import contextvars
+
+
+_results = contextvars.ContextVar('permission_results', default=None)
+
+
+@contextlib.contextmanager
+def memoized():
+    """Memoize permission check results within a ``with`` block."""
+    token = _results.set({})
+    try:
+        yield
+    finally:
+        _results.reset(token)
+
+
+def make_key(name, user, instance=None):
+    """Make a key for a permission check.
+
+    Returns ``None`` when the check can't be memoized because the
+    instance hasn't been saved.
+
+    """
+    if instance is None:
+        instance_key = None
+    elif getattr(instance, 'pk', None) is None:
+        return None
+    else:
+        instance_key = (instance._meta.label, instance.pk)
+    # The user's flags are part of the key since they may be changed
+    # during a request.
+    user_key = (user.pk, user.is_active, getattr(user, 'is_staff', False))
+    return (name, user_key, instance_key)
+
+
+def get_result(key, default=None):
+    results = _results.get()
+    if results is None or key is None:
+        return default
+    return results.get(key, default)
+
+
+def set_result(key, value):
+    results = _results.get()
+    if results is not None and key is not None:
+        results[key] = value
+
+
+def invalidate(instance=None):
+    """Forget memoized results.
+
+    If an ``instance`` is passed, only results of checks against it
+    are forgotten.
+
+    """
+    results = _results.get()
+    if results is None:
+        return
+    if instance is None:
+        results.clear()
+    else:
+        instance_key = (instance._meta.label, instance.pk)
+        for key in [key for key in results if key[2] == instance_key]:
+            del results[key]
@@ -0,0 +1,18 @@
+from .memo import memoized
+
+
+class PermissionsMemoMiddleware:
+
+    """Memoize permission check results for the duration of a request.
+
+    Only permissions registered with ``memoize=True`` (or in a registry
+    that memoizes by default) are affected. See :mod:`.memo`.
+
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with memoized():
+            return self.get_response(request)
@@ -20,6 +20,7 @@ except ImportError:
 else:
     from rest_framework.request import Request as DRFRequest
 
+from . import memo
 from .exc import DuplicatePermissionError, NoSuchPermissionError, PermissionsError
 from .meta import PermissionsMeta
 from .templatetags.permissions import register
@@ -42,6 +43,7 @@ DEFAULT_SETTINGS = {
     'allow_superuser': False,
     'allow_anonymous': False,
     'unauthenticated_handler': None,
+    'memoize': False,
 
     # django.http.HttpRequest is always included.
     # rest_framework.request.Request is always included when DRF is
@@ -93,6 +95,11 @@ class PermissionsRegistry:
               it's not present. Likewise for DRF's request class, except
               that it will only be added if DRF is installed.
 
+        - memoize: Memoize the results of permission checks within
+          a request (or other :func:`.memo.memoized` scope). Checks
+          with the same permission, user, and instance will only call
+          the permission function once. See :mod:`.memo`. [False]
+
         If an option's value isn't passed to the constructor, it will
         be pulled from your project's settings or fall back to the
         defaults noted above in brackets.
@@ -134,7 +141,7 @@ class PermissionsRegistry:
     """
 
     def __init__(self, allow_staff=None, allow_superuser=None, allow_anonymous=None,
-                 unauthenticated_handler=None, request_types=None):
+                 unauthenticated_handler=None, request_types=None, memoize=None):
         self._registry = dict()
 
         settings = DEFAULT_SETTINGS.copy()
@@ -144,6 +151,7 @@ class PermissionsRegistry:
         self._allow_staff = _default(allow_staff, settings['allow_staff'])
         self._allow_superuser = _default(allow_superuser, settings['allow_superuser'])
         self._allow_anonymous = _default(allow_anonymous, settings['allow_anonymous'])
+        self._memoize = _default(memoize, settings['memoize'])
 
         unauthenticated_handler = _default(
             unauthenticated_handler, settings['unauthenticated_handler'])
@@ -161,7 +169,9 @@ class PermissionsRegistry:
             # A fake view that, when called with the current request,
             # triggers Django's redirect-to-login functionality.
             force_login_view = login_required(lambda _: None)
-            unauthenticated_handler = lambda r: force_login_view(r)
+
+            def unauthenticated_handler(request):
+                return force_login_view(request)
         else:
             if isinstance(unauthenticated_handler, str):
                 unauthenticated_handler = import_string(unauthenticated_handler)
@@ -184,7 +194,7 @@ class PermissionsRegistry:
 
     def register(self, perm_func=None, model=None, allow_staff=None, allow_superuser=None,
                  allow_anonymous=None, unauthenticated_handler=None, request_types=None, name=None,
-                 replace=False, _return_entry=False):
+                 replace=False, memoize=None, _return_entry=False):
         """Register permission function & return the original function.
 
         This is typically used as a decorator::
@@ -204,13 +214,15 @@ class PermissionsRegistry:
         allow_anonymous = _default(allow_anonymous, self._allow_anonymous)
         unauthenticated_handler = _default(unauthenticated_handler, self._unauthenticated_handler)
         request_types = _default(request_types, self._request_types)
+        memoize = _default(memoize, self._memoize)
 
         if perm_func is None:
             return (
                 lambda perm_func_:
                     self.register(
                         perm_func_, model, allow_staff, allow_superuser, allow_anonymous,
-                        unauthenticated_handler, request_types, name, replace, _return_entry)
+                        unauthenticated_handler, request_types, name, replace, memoize,
+                        _return_entry)
             )
 
         name = _default(name, perm_func.__name__)
@@ -221,7 +233,7 @@ class PermissionsRegistry:
 
         view_decorator = self._make_view_decorator(
             name, perm_func, model, allow_staff, allow_superuser, allow_anonymous,
-            unauthenticated_handler, request_types)
+            unauthenticated_handler, request_types, memoize)
         entry = Entry(
             name, perm_func, view_decorator, model, allow_staff, allow_superuser, allow_anonymous,
             unauthenticated_handler, request_types, set())
@@ -233,7 +245,10 @@ class PermissionsRegistry:
                 return False
             if not allow_anonymous and user.is_anonymous:
                 return False
-            test = lambda: perm_func(user) if instance is NO_VALUE else perm_func(user, instance)
+
+            def test():
+                return self._call_perm_func(name, perm_func, memoize, user, instance)
+
             return (
                 allow_staff and user.is_staff or
                 allow_superuser and user.is_superuser or
@@ -286,8 +301,59 @@ class PermissionsRegistry:
             return view.__qualname__
         return '{0.__module__}.{0.__name__}'.format(view)
 
+    def get_instance(self, request, model, **kwargs):
+        """Get the instance a view's permission was checked against.
+
+        Views protected by a model permission can use this instead of
+        fetching the instance themselves::
+
+            @permissions.can_edit_thing
+            def edit(request, thing_id):
+                thing = permissions.get_instance(request, Thing, pk=thing_id)
+
+        If the permission check was bypassed (e.g., for staff) or was
+        for some other instance, the instance is looked up using
+        ``kwargs``.
+
+        """
+        instance = getattr(request, 'permission_instance', None)
+        if isinstance(instance, model):
+            meta = model._meta
+            fields = ((meta.pk if name == 'pk' else meta.get_field(name), value)
+                      for (name, value) in kwargs.items())
+            if all(getattr(instance, f.attname) == f.to_python(v) for (f, v) in fields):
+                return instance
+        return self._get_model_instance(model, **kwargs)
+
+    def invalidate(self, instance=None):
+        """Forget memoized permission check results.
+
+        This should be called after a change that could affect the
+        outcome of permission checks during the current request. If an
+        ``instance`` is passed, only the results of checks against it
+        are forgotten.
+
+        """
+        memo.invalidate(instance)
+
+    def _call_perm_func(self, perm_name, perm_func, memoize, user, instance=NO_VALUE):
+        """Call ``perm_func``, memoizing its result if enabled."""
+        def call():
+            if instance is NO_VALUE:
+                return perm_func(user)
+            return perm_func(user, instance)
+
+        if not memoize:
+            return call()
+        key = memo.make_key(perm_name, user, None if instance is NO_VALUE else instance)
+        result = memo.get_result(key, NO_VALUE)
+        if result is NO_VALUE:
+            result = call()
+            memo.set_result(key, result)
+        return result
+
     def _make_view_decorator(self, perm_name, perm_func, model, allow_staff, allow_superuser,
-                             allow_anonymous, unauthenticated_handler, request_types):
+                             allow_anonymous, unauthenticated_handler, request_types, memoize):
 
         def view_decorator(view=None, field='pk'):
             if view is None:
@@ -354,6 +420,7 @@ class PermissionsRegistry:
                     # instance if possible.
                     perm_func_args = [user]
                     perm_func_kwargs = {}
+                    instance = NO_VALUE
 
                     args_index = request_index + 1
                     remaining_args = args[args_index:]  # Args after request
@@ -376,6 +443,10 @@ class PermissionsRegistry:
                             field_val = kwargs[remaining_arg_names[0]]
                         instance = self._get_model_instance(model, **{field: field_val})
                         perm_func_args.append(instance)
+                        # Make the instance available to the view so
+                        # it doesn't have to be fetched again; see
+                        # get_instance().
+                        request.permission_instance = instance
 
                     # Starting after the perm func's required args
                     # (either user or user & instance), map view args
@@ -384,7 +455,11 @@ class PermissionsRegistry:
                         if n in view_args:
                             perm_func_kwargs[n] = view_args[n]
 
-                    return perm_func(*perm_func_args, **perm_func_kwargs)
+                    if perm_func_kwargs:
+                        # Results depend on the view args, so they can't
+                        # be memoized
+                        return perm_func(*perm_func_args, **perm_func_kwargs)
+                    return self._call_perm_func(perm_name, perm_func, memoize, user, instance)
 
                 has_permission = (
                     allow_staff and user.is_staff or
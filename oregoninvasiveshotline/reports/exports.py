@@ -0,0 +1,253 @@
+"""Exports of reports in bulk.
+
+Exports are produced by generators that read reports in chunks from a
+single query (with the related rows joined in) so that any number of
+reports can be exported in constant memory. The chunks can be streamed
+in a response or, for very large exports, written to a file in the
+background (see :class:`ExportJob`).
+
+"""
+import csv
+import itertools
+import zipfile
+
+from django.conf import settings
+from django.utils.formats import localize
+from django.utils.html import escape
+from django.utils.timezone import template_localtime
+
+from oregoninvasiveshotline.users.models import User
+
+
+class Echo:
+
+    """A file-like object that returns what's written to it.
+
+    This allows a ``csv.writer`` to produce rows one at a time.
+
+    """
+
+    def write(self, value):
+        return value
+
+
+# Columns read from the database for each exported report
+EXPORT_VALUES = (
+    'report_id',
+    'created_on',
+    'description',
+    'edrr_status',
+    'is_archived',
+    'is_public',
+    'point',
+    'actual_species_id',
+    'actual_species__name',
+    'actual_species__scientific_name',
+    'actual_species__category__name',
+    'reported_species__name',
+    'reported_species__scientific_name',
+    'reported_category__name',
+    'created_by__email',
+    'created_by__first_name',
+    'created_by__last_name',
+    'created_by__has_completed_ofpd',
+    'claimed_by__email',
+    'claimed_by__first_name',
+    'claimed_by__last_name',
+)
+
+
+def get_export_rows(reports, progress=None):
+    """Get the reports in ``reports`` as dicts for export.
+
+    In addition to the raw values, each row has the report's effective
+    ``category``, ``species_name`` and ``species_scientific_name`` (see
+    :attr:`Report.category` and :attr:`Report.species`), and its
+    ``created_by`` and ``claimed_by`` users' names as they're displayed
+    elsewhere.
+
+    If ``progress`` is passed, it's called with the number of rows
+    produced so far after each chunk of rows and once all the rows have
+    been produced.
+
+    """
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    rows = reports.values(*EXPORT_VALUES).iterator(chunk_size=chunk_size)
+    processed = 0
+    for processed, row in enumerate(rows, 1):
+        if row['actual_species_id'] is not None:
+            species = 'actual_species'
+            row['category'] = row['actual_species__category__name']
+        else:
+            species = 'reported_species'
+            row['category'] = row['reported_category__name']
+        row['species_name'] = row['{0}__name'.format(species)]
+        row['species_scientific_name'] = row['{0}__scientific_name'.format(species)]
+        row['created_by'] = _get_user(row, 'created_by')
+        row['claimed_by'] = _get_user(row, 'claimed_by')
+        yield row
+        if progress is not None and processed % chunk_size == 0:
+            progress(processed)
+    if progress is not None:
+        progress(processed)
+
+
+def _get_user(row, prefix):
+    """Get an unsaved user from the ``prefix``ed values in ``row``.
+
+    This is used to format users' names the same way they're formatted
+    elsewhere without having to load them from the database.
+
+    """
+    email = row['{0}__email'.format(prefix)]
+    if email is None:
+        return None
+    return User(
+        email=email,
+        first_name=row['{0}__first_name'.format(prefix)],
+        last_name=row['{0}__last_name'.format(prefix)],
+    )
+
+
+# Maps CSV column names to functions that get the column's value
+# from an export row
+CSV_COLUMNS = (
+    ('Report ID', lambda row: row['report_id']),
+    ('Category', lambda row: str(row['category'])),
+    ('Common Name', lambda row: row['species_name'] or ''),
+    ('Scientific Name', lambda row: row['species_scientific_name'] or ''),
+    ('Species Confirmed', lambda row: row['actual_species_id'] is not None),
+    ('Reported By', lambda row: str(row['created_by'])),
+    ('OFPD Trained', lambda row: str(row['created_by__has_completed_ofpd'])),
+    ('Reported On', lambda row: str(row['created_on'])),
+    ('Claimed By', lambda row: str(row['claimed_by'])),
+    ('Description', lambda row: row['description']),
+    ('Latitude', lambda row: row['point'].y),
+    ('Longitude', lambda row: row['point'].x),
+    ('EDRR Status', lambda row: row['edrr_status']),
+    ('Is Public', lambda row: row['is_public']),
+    ('Is Archived', lambda row: row['is_archived']),
+)
+
+
+def generate_csv(reports, progress=None):
+    """Generate a CSV document for ``reports`` one line at a time."""
+    writer = csv.writer(Echo())
+    yield writer.writerow([name for name, _ in CSV_COLUMNS])
+    for row in get_export_rows(reports, progress):
+        yield writer.writerow([accessor(row) for _, accessor in CSV_COLUMNS])
+
+
+KML_HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<kml xmlns="http://earth.google.com/kml/2.1">
+    <Document>
+        <name>Report Export</name>
+"""
+
+KML_PLACEMARK = """            <Placemark>
+                <name>#{report_id} Report: {title}</name>
+                <description>
+Created On: {created_on}
+Created By: {created_by}
+Claimed By: {claimed_by}
+Species: {species}
+Confirmed: {confirmed}
+
+{description}
+                </description>
+                <Point>
+                    <coordinates>{lng},{lat}</coordinates>
+                </Point>
+            </Placemark>
+"""
+
+KML_FOOTER = """    </Document>
+</kml>
+"""
+
+# Number of placemarks written per chunk of KML
+KML_CHUNK_SIZE = 100
+
+
+def generate_kml(reports, progress=None):
+    """Generate a KML document for ``reports`` in chunks of placemarks."""
+    yield KML_HEADER
+    rows = get_export_rows(reports, progress)
+    while True:
+        chunk = ''.join(_kml_placemark(row) for row in itertools.islice(rows, KML_CHUNK_SIZE))
+        if not chunk:
+            break
+        yield chunk
+    yield KML_FOOTER
+
+
+def _kml_placemark(row):
+    if row['species_name'] is None:
+        species = None
+        title = row['category']
+    elif row['species_scientific_name']:
+        species = title = '{species_name} ({species_scientific_name})'.format_map(row)
+    else:
+        species = title = row['species_name']
+    return KML_PLACEMARK.format(
+        report_id=row['report_id'],
+        title=escape(title),
+        created_on=escape(localize(template_localtime(row['created_on']))),
+        created_by=escape(row['created_by']),
+        claimed_by=escape(row['claimed_by']),
+        species=escape(species),
+        confirmed='Yes' if row['actual_species_id'] is not None else 'No',
+        description=escape(row['description']),
+        lng=row['point'].x,
+        lat=row['point'].y,
+    )
+
+
+class StreamBuffer:
+
+    """A write-only file-like object that can be drained.
+
+    This is used to stream the output of ``zipfile`` as it's written.
+
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def generate_kmz(reports, progress=None):
+    """Generate a KMZ (zipped KML) document for ``reports``.
+
+    The KML is compressed as it's generated, so the archive can be
+    streamed without building the KML document first.
+
+    """
+    buffer = StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        with archive.open('doc.kml', 'w', force_zip64=True) as entry:
+            for chunk in generate_kml(reports, progress):
+                entry.write(chunk.encode('utf-8'))
+                data = buffer.drain()
+                if data:
+                    yield data
+    yield buffer.drain()
+
+
+# Maps export formats to the generators that produce them
+EXPORT_GENERATORS = {
+    'csv': generate_csv,
+    'kml': generate_kml,
+    'kmz': generate_kmz,
+}
@@ -5,9 +5,10 @@ from django.db import transaction
 from django.db.models import Q
 from django import forms
 
+from oregoninvasiveshotline.utils.cache import get_reference_data
 from oregoninvasiveshotline.utils.search import SearchForm
 from oregoninvasiveshotline.comments.models import Comment
-from oregoninvasiveshotline.counties.models import County
+from oregoninvasiveshotline.counties.models import County, county_for_point
 from oregoninvasiveshotline.species.models import Category, Severity, Species
 from oregoninvasiveshotline.users.models import User
 from oregoninvasiveshotline.reports.models import Invite, Report
@@ -19,6 +20,10 @@ from oregoninvasiveshotline.reports.tasks import (
 
 
 def get_category_choices():
+    return get_reference_data('category-choices', _get_category_choices)
+
+
+def _get_category_choices():
     categories = Category.objects.all().order_by('name')
     category_choices = []
     category_choices.extend((c.pk, c.name) for c in categories)
@@ -26,6 +31,10 @@ def get_category_choices():
 
 
 def get_county_choices():
+    return get_reference_data('county-choices', _get_county_choices)
+
+
+def _get_county_choices():
     county_choices = []
     for county in County.objects.all().order_by('state', 'name'):
         county_choices.append((county.pk, county.label))
@@ -104,17 +113,9 @@ class ReportSearchForm(SearchForm):
         widget=forms.widgets.RadioSelect
     )
 
-    def get_search_fields(self):
-        return (
-            'county__name',
-            'reported_category__name',
-            'reported_species__name',
-            'reported_species__scientific_name',
-            'actual_species__category__name',
-            'actual_species__name',
-            'actual_species__scientific_name',
-            'report_id'
-        )
+    # Kept up to date by signal receivers in reports.models; see
+    # get_search_vector() for the fields and weights that make it up.
+    search_vector_field = 'search_vector'
 
     def __init__(self, *args, user, report_ids=(), **kwargs):
         super().__init__(*args, **kwargs)
@@ -156,8 +157,7 @@ class ReportSearchForm(SearchForm):
             )
         if self.cleaned_data.get('categories'):
             reports = reports.filter(
-                Q(reported_category__in=self.cleaned_data.get('categories')) |  \
-                Q(actual_species__category__in=self.cleaned_data.get('categories'))
+                effective_category__in=self.cleaned_data.get('categories')
             )
 
         is_archived = self.cleaned_data.get('is_archived')
@@ -193,25 +193,13 @@ class ReportSearchForm(SearchForm):
         order_by = self.cleaned_data.get('order_by')
         if order_by:
             if order_by == 'species':
-                reports = reports.order_by(
-                    'actual_species__name',
-                    'reported_species__name'
-                )
+                reports = reports.order_by('effective_species_name')
             elif order_by == '-species':
-                reports = reports.order_by(
-                    '-actual_species__name',
-                    '-reported_species__name'
-                )
+                reports = reports.order_by('-effective_species_name')
             elif order_by == 'category':
-                reports = reports.order_by(
-                    'actual_species__category__name',
-                    'reported_category__name'
-                )
+                reports = reports.order_by('effective_category_name')
             elif order_by == '-category':
-                reports = reports.order_by(
-                    '-actual_species__category__name',
-                    '-reported_category__name'
-                )
+                reports = reports.order_by('-effective_category_name')
             else:
                 reports = reports.order_by(order_by)
         elif not self.cleaned_data.get('q'):
@@ -289,7 +277,7 @@ class ReportForm(forms.ModelForm):
         user, _ = User.objects.get_or_create(email__iexact=email, defaults=defaults)
 
         report.created_by = user
-        report.county = County.objects.filter(the_geom__intersects=report.point).first()
+        report.county = county_for_point(report.point)
 
         super().save(*args, **kwargs)
 
@@ -314,12 +302,14 @@ class InviteForm(forms.Form):
     body = forms.CharField(widget=forms.Textarea, required=False)
 
     def clean_emails(self):
-        emails = set([email.strip() for email in self.cleaned_data['emails'].split(",") if email.strip()])
+        emails = self.cleaned_data['emails'].split(",")
+        emails = set([email.strip() for email in emails if email.strip()])
         for email in emails:
             try:
                 validate_email(email)
             except forms.ValidationError:
-                raise forms.ValidationError('"%(email)s" is an invalid email', params={"email": email})
+                raise forms.ValidationError(
+                    '"%(email)s" is an invalid email', params={"email": email})
 
         return emails
 
@@ -347,7 +337,8 @@ class InviteForm(forms.Form):
                                                              report=report,
                                                              defaults={'created_by': inviter})
             if created:
-                transaction.on_commit(lambda: notify_invited_reviewer.delay(invite.pk, self.cleaned_data.get('body')))
+                transaction.on_commit(lambda: notify_invited_reviewer.delay(
+                    invite.pk, self.cleaned_data.get('body')))
                 invited.append(email)
             else:
                 already_invited.append(email)
@@ -357,7 +348,7 @@ class InviteForm(forms.Form):
                                visibility=Comment.PRIVATE,
                                body=self.cleaned_data.get("body"),
                                created_by=inviter)
-                               
+
         return namedtuple("InviteReport", "invited already_invited")(invited, already_invited)
 
 
@@ -367,7 +358,8 @@ class ManagementForm(forms.ModelForm):
     a new species)
     """
     SUBMIT_FLAG = "MANAGEMENT"
-    confidential_error_text = "This species is marked as confidential, so you cannot make this report public."
+    confidential_error_text = (
+        "This species is marked as confidential, so you cannot make this report public.")
 
     new_species = forms.CharField(required=False, label="")
     severity = forms.ModelChoiceField(queryset=Severity.objects.all(), label="", required=False)
@@ -416,12 +408,15 @@ class ManagementForm(forms.ModelForm):
         severity = self.cleaned_data.get("severity")
 
         if bool(new_species) & bool(actual_species):
-            raise forms.ValidationError("Either choose a species or create a new one.", code="species_contradiction")
+            raise forms.ValidationError(
+                "Either choose a species or create a new one.", code="species_contradiction")
 
         if new_species and not severity:
-            self.add_error("severity", forms.ValidationError("This field is required", code="required"))
+            self.add_error(
+                "severity", forms.ValidationError("This field is required", code="required"))
 
-        if actual_species and actual_species.is_confidential and self.cleaned_data.get("is_public"):
+        is_public = self.cleaned_data.get("is_public")
+        if actual_species and actual_species.is_confidential and is_public:
             raise forms.ValidationError(self.confidential_error_text, code="species-confidential")
 
         return self.cleaned_data
@@ -431,7 +426,8 @@ class ManagementForm(forms.ModelForm):
         severity = self.cleaned_data.get("severity")
 
         if new_species:
-            species = Species(name=new_species, severity=severity, category=self.cleaned_data['category'])
+            species = Species(
+                name=new_species, severity=severity, category=self.cleaned_data['category'])
             species.save()
             self.instance.actual_species = species
         elif not self.cleaned_data.get("actual_species"):
@@ -0,0 +1,266 @@
+import random
+import re
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.gis.geos import Point
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+from django.http import QueryDict
+
+from oregoninvasiveshotline.counties.resolver import CountyResolver
+from oregoninvasiveshotline.species.models import Category, Severity, Species
+from oregoninvasiveshotline.users.models import User
+from oregoninvasiveshotline.users.utils import _get_tab_counts
+from oregoninvasiveshotline.utils.pagination import CursorPaginator
+
+from ...forms import ReportSearchForm
+from ...models import Report, update_search_vector
+from ...serializers import ReportListSerializer
+
+
+# Searches run for managers; each is a label and the query string
+# passed to ReportSearchForm
+MANAGER_SEARCHES = (
+    ('all', ''),
+    ('not archived', 'is_archived=notarchived'),
+    ('archived', 'is_archived=archived'),
+    ('public', 'is_public=public'),
+    ('not public', 'is_public=notpublic'),
+    ('claimed by me', 'claimed_by=me'),
+    ('unclaimed', 'claimed_by=nobody&is_public=notpublic&is_archived=notarchived'),
+    ('open and claimed by me', 'claimed_by=me&is_public=notpublic&is_archived=notarchived'),
+    ('reported by me', 'source=reported'),
+    ('category', 'categories={category}'),
+    ('category, not archived', 'categories={category}&is_archived=notarchived'),
+    ('county', 'counties={county}'),
+    ('by species', 'order_by=species'),
+    ('by category', 'order_by=category'),
+    ('keyword', 'q={keyword}'),
+)
+
+# Searches run for the public
+PUBLIC_SEARCHES = (
+    ('all', ''),
+    ('category', 'categories={category}'),
+    ('county', 'counties={county}'),
+    ('by species', 'order_by=species'),
+    ('keyword', 'q={keyword}'),
+)
+
+# Oregon, more or less
+SEED_EXTENT = (-124.5, 42.0, -116.5, 46.2)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+
+    help = (
+        'Run the standard report list and filter queries with EXPLAIN ANALYZE to show which '
+        'indexes they use and how long they take'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', type=int, default=0, metavar='N',
+            help='Add N generated reports before benchmarking; they are removed afterwards')
+        parser.add_argument(
+            '--random-seed', type=int, default=0, help='Random seed used when generating reports')
+        parser.add_argument(
+            '--depth', type=int, default=100, metavar='PAGES',
+            help='Also time the page this many pages into each search (default: 100)')
+        parser.add_argument(
+            '--user',
+            help='Email address of the manager to run searches as (default: any staff user)')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('This command requires PostgreSQL')
+
+        self.verbosity = options['verbosity']
+        try:
+            with transaction.atomic():
+                if options['seed']:
+                    self.seed(options['seed'], random.Random(options['random_seed']))
+                self.benchmark(self.get_manager(options['user']), options['depth'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def get_manager(self, email):
+        managers = User.objects.filter(is_active=True, is_staff=True)
+        if email:
+            managers = managers.filter(email__iexact=email)
+        manager = managers.order_by('pk').first()
+        if manager is None:
+            raise CommandError('No manager found; pass --user or --seed')
+        return manager
+
+    def seed(self, n, rng):
+        self.print('Adding {n} reports...'.format(n=n))
+        started_at = time.monotonic()
+
+        manager = User.objects.create(
+            email='benchmark-manager@example.com', first_name='Benchmark', last_name='Manager',
+            is_active=True, is_staff=True)
+        reporters = [
+            User(
+                email='benchmark-{i}@example.com'.format(i=i),
+                first_name='Benchmark',
+                last_name=str(i),
+                is_active=False)
+            for i in range(max(1, n // 20))
+        ]
+        reporters = User.objects.bulk_create(reporters)
+        other_managers = User.objects.filter(is_active=True, is_staff=True).exclude(pk=manager.pk)
+        claimers = [manager] + list(other_managers)
+
+        categories = [Category.objects.create(name='Benchmark {i}'.format(i=i)) for i in range(5)]
+        severities = [Severity.objects.create(name='Benchmark', color='#ff0000')]
+        species = [
+            Species.objects.create(
+                name='Benchmarkius {i}'.format(i=i),
+                scientific_name='Benchmarkius benchmarkii {i}'.format(i=i),
+                category=rng.choice(categories),
+                severity=rng.choice(severities))
+            for i in range(25)
+        ]
+
+        # Counties are resolved in memory rather than with a query per
+        # report
+        resolver = CountyResolver()
+        west, south, east, north = SEED_EXTENT
+        batch_size = 1000
+        for start in range(0, n, batch_size):
+            reports = []
+            for _ in range(min(batch_size, n - start)):
+                reported_species = rng.choice(species + [None])
+                if reported_species:
+                    reported_category = reported_species.category
+                else:
+                    reported_category = rng.choice(categories)
+                report = Report(
+                    reported_species=reported_species,
+                    reported_category=reported_category,
+                    actual_species=rng.choice(species) if rng.random() < 0.5 else None,
+                    description='Benchmark report',
+                    location='Benchmark location',
+                    point=Point(rng.uniform(west, east), rng.uniform(south, north), srid=4326),
+                    created_by=rng.choice(reporters),
+                    claimed_by=rng.choice(claimers) if rng.random() < 0.6 else None,
+                    is_public=rng.random() < 0.4,
+                    is_archived=rng.random() < 0.3,
+                )
+                report.set_effective_species()
+                reports.append(report)
+            counties = resolver.resolve([report.point for report in reports])
+            for report, county in zip(reports, counties):
+                report.county = county
+            Report.objects.bulk_create(reports)
+
+        seeded = Report.objects.filter(
+            description='Benchmark report', created_by__email__startswith='benchmark-')
+        # Spread the reports out over the last several years
+        seeded.update(created_on=RawSQL("now() - random() * interval '5 years'", []))
+        update_search_vector(seeded)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE report')
+
+        self.print('Added {n} reports in {seconds:.1f}s'.format(
+            n=n, seconds=time.monotonic() - started_at))
+
+    def benchmark(self, manager, depth):
+        category = Category.objects.order_by('pk').values_list('pk', flat=True).first()
+        county = Report.objects.exclude(county=None).values_list('county', flat=True).first()
+        species_name = Species.objects.order_by('pk').values_list('name', flat=True).first()
+        context = {
+            'category': category or '',
+            'county': county or '',
+            'keyword': (species_name or 'x').split()[0],
+        }
+        self.print('{n} reports'.format(n=Report.objects.count()))
+
+        self.print('\nManager ({manager.email})'.format(manager=manager))
+        self.explain('tab counts', lambda: _get_tab_counts(manager, []))
+        for label, query in MANAGER_SEARCHES:
+            self.explain_search(label, query.format(**context), manager, depth)
+
+        self.print('\nPublic')
+        self.explain('tab counts', lambda: _get_tab_counts(AnonymousUser(), []))
+        for label, query in PUBLIC_SEARCHES:
+            self.explain_search(label, query.format(**context), AnonymousUser(), depth)
+
+    def explain_search(self, label, query, user, depth):
+        """Time the first page of a search and the page ``depth`` pages in."""
+        paginator = self.paginate(query, user)
+        self.explain(label, paginator.page)
+        if depth:
+            cursor = self.deep_cursor(paginator, depth)
+            if cursor is not None:
+                label = '{label} (page {n})'.format(label=label, n=depth + 1)
+                self.explain(label, lambda: paginator.page(cursor))
+
+    def paginate(self, query, user):
+        """Paginate the reports found by ``query`` as the report list view does."""
+        form = ReportSearchForm(QueryDict(query), user=user)
+        reports = Report.objects.all()
+        if form.is_valid():
+            reports = form.search(reports)
+        reports = reports.select_related(*ReportListSerializer.related_fields)
+        return CursorPaginator(reports, settings.ITEMS_PER_PAGE)
+
+    def deep_cursor(self, paginator, depth):
+        """Get the cursor to the page ``depth`` pages in, if there is one.
+
+        The cursor is made from the last row on the preceding page,
+        which is found with ``OFFSET``, so following a cursor that far
+        in isn't included in the timings.
+
+        """
+        offset = depth * paginator.per_page
+        rows = list(paginator.queryset.order_by(*paginator.ordering)[offset - 1:offset + 1])
+        if len(rows) < 2:
+            return None
+        return paginator.encode_cursor('next', rows[0])
+
+    def explain(self, label, run):
+        """Run ``EXPLAIN ANALYZE`` for the queries executed by ``run``."""
+        queries = []
+
+        def capture(execute, sql, params, many, context):
+            queries.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(capture):
+            run()
+
+        for sql, params in queries:
+            if 'FROM "report"' not in sql:
+                # Lookups of categories for the search form, etc
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN ANALYZE ' + sql, params)
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+
+            match = re.search(r'Execution Time: ([\d.]+) ms', plan)
+            duration = float(match.group(1)) if match else float('nan')
+            scans = re.findall(r'Index (?:Only )?Scan (?:Backward )?(?:using|on) (\w+)', plan)
+            indexes = sorted(set(scans))
+            self.print('{label:<30} {duration:>10.3f} ms  {indexes}'.format(
+                label=label,
+                duration=duration,
+                indexes=', '.join(indexes) or 'no indexes',
+            ))
+            if self.verbosity > 1:
+                self.print(plan + '\n')
+
+    def print(self, *args, **kwargs):
+        if self.verbosity:
+            self.stdout.write(*args, **kwargs)
+            self.stdout.flush()
@@ -0,0 +1,123 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max, Min
+
+from oregoninvasiveshotline.tasks import rebuild_home_snapshot
+from oregoninvasiveshotline.utils.cache import bump_version
+
+from ...models import REPORT_SEARCH_CACHE_NAMESPACES, Report, update_search_vector
+
+
+# Resolves the county of each report in a range of report IDs. When a
+# point is in more than one county, the first by state and name is
+# used, as in counties.models.county_for_point().
+RESOLVED_COUNTIES = """
+SELECT
+    report.report_id,
+    (
+        SELECT county.county_id
+        FROM county_subdivision
+        JOIN county ON county.county_id = county_subdivision.county_id
+        WHERE ST_Intersects(county_subdivision.the_geom, report.point)
+        ORDER BY county.state, county.name
+        LIMIT 1
+    ) AS county_id
+FROM report
+WHERE report.report_id BETWEEN %s AND %s {missing}
+"""
+
+UPDATE_COUNTIES = """
+UPDATE report
+SET county_id = resolved.county_id, updated_on = now()
+FROM ({resolved}) AS resolved
+WHERE report.report_id = resolved.report_id
+    AND report.county_id IS DISTINCT FROM resolved.county_id
+RETURNING report.report_id
+"""
+
+COUNT_CHANGES = """
+SELECT count(*)
+FROM report
+JOIN ({resolved}) AS resolved ON report.report_id = resolved.report_id
+WHERE report.county_id IS DISTINCT FROM resolved.county_id
+"""
+
+
+class Command(BaseCommand):
+
+    help = (
+        'Recompute the county of each report from its location (e.g., after the county table '
+        'has changed)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Number of report IDs to process in each update [10000]')
+        parser.add_argument(
+            '--missing-only', action='store_true', default=False,
+            help='Only resolve reports without a county')
+        parser.add_argument(
+            '--dry-run', action='store_true', default=False,
+            help='Count the reports whose county would change without changing them')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('This command requires PostgreSQL')
+
+        self.verbosity = options['verbosity']
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        dry_run = options['dry_run']
+        missing = 'AND report.county_id IS NULL' if options['missing_only'] else ''
+        resolved = RESOLVED_COUNTIES.format(missing=missing)
+        sql = (COUNT_CHANGES if dry_run else UPDATE_COUNTIES).format(resolved=resolved)
+
+        ids = Report.objects.aggregate(first=Min('pk'), last=Max('pk'))
+        if ids['first'] is None:
+            self.print('There are no reports')
+            return
+
+        started_at = time.monotonic()
+        total = 0
+        for start in range(ids['first'], ids['last'] + 1, batch_size):
+            end = min(start + batch_size - 1, ids['last'])
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(sql, [start, end])
+                    if dry_run:
+                        changed = cursor.fetchone()[0]
+                    else:
+                        report_ids = [row[0] for row in cursor.fetchall()]
+                        changed = len(report_ids)
+                        if report_ids:
+                            # The county's name is part of the search document
+                            update_search_vector(Report.objects.filter(pk__in=report_ids))
+            total += changed
+            self.print('Reports {start}-{end}: {changed} {verb}'.format(
+                start=start,
+                end=end,
+                changed=changed,
+                verb='would change' if dry_run else 'changed',
+            ))
+
+        if total and not dry_run:
+            for namespace in REPORT_SEARCH_CACHE_NAMESPACES:
+                bump_version(namespace)
+            # The home page's snapshot includes each report's county
+            rebuild_home_snapshot.delay()
+
+        self.print('{total} reports {verb} in {seconds:.1f}s'.format(
+            total=total,
+            verb='would change' if dry_run else 'changed',
+            seconds=time.monotonic() - started_at,
+        ))
+
+    def print(self, *args, **kwargs):
+        if self.verbosity:
+            self.stdout.write(*args, **kwargs)
+            self.stdout.flush()
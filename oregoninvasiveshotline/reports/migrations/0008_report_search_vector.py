@@ -0,0 +1,44 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def populate_search_vector(apps, schema_editor):
+    Report = apps.get_model('reports', 'Report')
+    vector = (
+        SearchVector(
+            'report_id',
+            'reported_species__name',
+            'reported_species__scientific_name',
+            'actual_species__name',
+            'actual_species__scientific_name',
+            weight='A') +
+        SearchVector('reported_category__name', 'actual_species__category__name', weight='B') +
+        SearchVector('county__name', weight='C')
+    )
+    vectors = Report.objects.filter(pk=OuterRef('pk')).order_by().annotate(vector=vector).values('vector')
+    Report.objects.update(search_vector=Subquery(vectors))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('counties', '0003_add_default_ordering_to_county_model'),
+        ('species', '0008_update_help_text'),
+        ('reports', '0007_change_default_ordering'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='report_search_vector_idx'),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
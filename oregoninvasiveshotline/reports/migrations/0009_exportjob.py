@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reports', '0008_report_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('export_job_id', models.AutoField(primary_key=True, serialize=False)),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+                ('completed_on', models.DateTimeField(default=None, null=True)),
+                ('format', models.CharField(choices=[('csv', 'CSV'), ('kml', 'KML'), ('kmz', 'KMZ')], max_length=3)),
+                ('query', models.TextField(help_text='This is a string for a QueryDict of the GET parameters to pass to the ReportSearchForm that match the reports to export.')),
+                ('signature', models.CharField(db_index=True, max_length=32)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('complete', 'Complete'), ('failed', 'Failed')], default='pending', max_length=8)),
+                ('total', models.IntegerField(default=None, null=True)),
+                ('processed', models.IntegerField(default=0)),
+                ('file', models.FileField(blank=True, upload_to='exports')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'export_job',
+                'ordering': ['-created_on'],
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def populate_effective_species(apps, schema_editor):
+    Report = apps.get_model('reports', 'Report')
+    reports = Report.objects.filter(pk=OuterRef('pk')).order_by()
+
+    def effective(actual, reported):
+        return Subquery(reports.annotate(value=Coalesce(actual, reported)).values('value'))
+
+    Report.objects.update(
+        effective_species=Coalesce('actual_species', 'reported_species'),
+        effective_category=effective('actual_species__category', 'reported_category'),
+        effective_severity=effective('actual_species__severity', 'reported_species__severity'),
+        effective_species_name=effective('actual_species__name', 'reported_species__name'),
+        effective_category_name=effective('actual_species__category__name', 'reported_category__name'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('species', '0008_update_help_text'),
+        ('reports', '0009_exportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='effective_category',
+            field=models.ForeignKey(db_index=False, default=None, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='species.Category'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='effective_category_name',
+            field=models.CharField(default=None, editable=False, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='effective_severity',
+            field=models.ForeignKey(default=None, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='species.Severity'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='effective_species',
+            field=models.ForeignKey(default=None, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='species.Species'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='effective_species_name',
+            field=models.CharField(default=None, editable=False, max_length=255, null=True),
+        ),
+        migrations.RunPython(populate_effective_species, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['effective_category', '-created_on'], name='report_category_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['effective_category_name', 'report_id'], name='report_category_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['effective_species_name', 'report_id'], name='report_species_name_idx'),
+        ),
+    ]
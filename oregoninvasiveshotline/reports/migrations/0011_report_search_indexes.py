@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0010_report_effective_species'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['-created_on', '-report_id'], name='report_created_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(condition=models.Q(is_archived=False), fields=['-created_on', '-report_id'], name='report_unarchived_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(condition=models.Q(is_public=True), fields=['-created_on', '-report_id'], name='report_public_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(condition=models.Q(('claimed_by', None), ('is_archived', False), ('is_public', False)), fields=['-created_on', '-report_id'], name='report_unclaimed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['claimed_by', '-created_on'], name='report_claimed_by_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['created_by', '-created_on'], name='report_created_by_created_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def populate_updated_on(apps, schema_editor):
+    Report = apps.get_model('reports', 'Report')
+    Report.objects.update(updated_on=F('created_on'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0011_report_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='updated_on',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_updated_on, migrations.RunPython.noop),
+    ]
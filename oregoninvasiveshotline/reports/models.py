@@ -1,19 +1,30 @@
+import datetime
 import posixpath
 import logging
 import os
 
 from django.dispatch import receiver
 from django.contrib.gis.db import models
-from django.db.models.signals import post_save
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db.models import OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Now
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.urls import reverse
+from django.utils import timezone
 from django.conf import settings
 
-from oregoninvasiveshotline.utils.settings import get_setting
-from oregoninvasiveshotline.utils.images import generate_thumbnail
+from oregoninvasiveshotline.perms import permissions
+from oregoninvasiveshotline.tasks import queue_home_snapshot_rebuild
+from oregoninvasiveshotline.utils.cache import REPORT_LIST_NAMESPACE, bump_version
 from oregoninvasiveshotline.visibility import Visibility
+from oregoninvasiveshotline.comments.models import Comment
+from oregoninvasiveshotline.counties.models import County
 from oregoninvasiveshotline.images.models import Image
-from oregoninvasiveshotline.users.models import User
+from oregoninvasiveshotline.species.models import Category, Severity, Species
+from oregoninvasiveshotline.users.models import invalidate_tab_counts
 
+from .tiles import invalidate_all_tiles, invalidate_tiles
 from .utils import generate_icon, icon_file_name
 
 log = logging.getLogger(__name__)
@@ -26,13 +37,40 @@ class Report(models.Model):
     class Meta:
         db_table = 'report'
         ordering = ['-created_on']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='report_search_vector_idx'),
+            models.Index(
+                fields=['effective_category', '-created_on'], name='report_category_created_idx'),
+            models.Index(
+                fields=['effective_category_name', 'report_id'], name='report_category_name_idx'),
+            models.Index(
+                fields=['effective_species_name', 'report_id'], name='report_species_name_idx'),
+            # The default ordering (and keyset pagination in it), alone
+            # and combined with the most common manager filters; these
+            # also serve the tab counts (see get_tab_counts())
+            models.Index(fields=['-created_on', '-report_id'], name='report_created_on_idx'),
+            models.Index(
+                fields=['-created_on', '-report_id'], name='report_unarchived_idx',
+                condition=Q(is_archived=False)),
+            models.Index(
+                fields=['-created_on', '-report_id'], name='report_public_idx',
+                condition=Q(is_public=True)),
+            models.Index(
+                fields=['-created_on', '-report_id'], name='report_unclaimed_idx',
+                condition=Q(claimed_by=None, is_public=False, is_archived=False)),
+            models.Index(
+                fields=['claimed_by', '-created_on'], name='report_claimed_by_created_idx'),
+            models.Index(
+                fields=['created_by', '-created_on'], name='report_created_by_created_idx'),
+        ]
 
     report_id = models.AutoField(primary_key=True)
     # It may seem odd to have FKs to the species AND category, but in the case
     # where the user doesn't know what species it is, we fall back to just a
     # category (with the reported_species field NULL'd out)
     reported_category = models.ForeignKey("species.Category", on_delete=models.CASCADE)
-    reported_species = models.ForeignKey("species.Species", null=True, default=None, related_name="+", on_delete=models.SET_NULL)
+    reported_species = models.ForeignKey(
+        "species.Species", null=True, default=None, related_name="+", on_delete=models.SET_NULL)
 
     description = models.TextField(verbose_name="Please provide a description of your find")
     location = models.TextField(
@@ -44,15 +82,21 @@ class Report(models.Model):
             happen to have taken GPS coordinates, enter them here.
         """
     )
-    has_specimen = models.BooleanField(default=False, verbose_name="Do you have a physical specimen?")
+    has_specimen = models.BooleanField(
+        default=False, verbose_name="Do you have a physical specimen?")
 
     point = models.PointField(srid=4326)
     county = models.ForeignKey('counties.County', null=True, on_delete=models.SET_NULL)
 
     created_by = models.ForeignKey("users.User", related_name="reports", on_delete=models.CASCADE)
     created_on = models.DateTimeField(auto_now_add=True)
+    # when the report, or anything shown with it (comments, images,
+    # invites, species), last changed; see mark_reports_updated()
+    updated_on = models.DateTimeField(auto_now=True, db_index=True)
 
-    claimed_by = models.ForeignKey("users.User", null=True, default=None, related_name="claimed_reports", on_delete=models.SET_NULL)
+    claimed_by = models.ForeignKey(
+        "users.User", null=True, default=None, related_name="claimed_reports",
+        on_delete=models.SET_NULL)
 
     # these are copied over from the original site
     edrr_status = models.IntegerField(verbose_name="EDRR Status", choices=[
@@ -66,10 +110,44 @@ class Report(models.Model):
     ], default=None, null=True, blank=True)
 
     # the actual species confirmed by an expert
-    actual_species = models.ForeignKey("species.Species", null=True, default=None, related_name="reports", on_delete=models.SET_NULL)
+    actual_species = models.ForeignKey(
+        "species.Species", null=True, default=None, related_name="reports",
+        on_delete=models.SET_NULL)
 
     is_archived = models.BooleanField(default=False)
-    is_public = models.BooleanField(default=False, help_text="This report can be viewed by the public")
+    is_public = models.BooleanField(
+        default=False, help_text="This report can be viewed by the public")
+
+    # denormalized full-text document; see update_search_vector()
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # denormalized effective species, category and severity (from the
+    # actual species if set, falling back to what was reported) so they
+    # can be filtered and sorted on without joins; see
+    # set_effective_species() and update_effective_species()
+    effective_species = models.ForeignKey(
+        "species.Species", null=True, default=None, editable=False, related_name="+",
+        on_delete=models.SET_NULL)
+    effective_category = models.ForeignKey(
+        "species.Category", null=True, default=None, editable=False, related_name="+",
+        on_delete=models.SET_NULL, db_index=False)
+    effective_severity = models.ForeignKey(
+        "species.Severity", null=True, default=None, editable=False, related_name="+",
+        on_delete=models.SET_NULL)
+    effective_species_name = models.CharField(
+        max_length=255, null=True, default=None, editable=False)
+    effective_category_name = models.CharField(
+        max_length=255, null=True, default=None, editable=False)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the values as loaded so changes can be detected when
+        # the report is saved; see changed_fields().
+        instance._loaded_values = dict(zip(field_names, values))
+        if instance._loaded_values.get('point') is not None:
+            instance._loaded_values['point'] = instance._loaded_values['point'].clone()
+        return instance
 
     @property
     def title(self):
@@ -125,36 +203,20 @@ class Report(models.Model):
         for the newest image will be returned. Otherwise, the report's
         comments are checked for public images.
 
-        If the thumbnail for the selected image doesn't exist, it will
-        be created as a side effect.
+        Thumbnails are generated in the background when images are
+        saved; until the selected image's thumbnail exists, ``None``
+        will be returned.
 
         If no image is found, ``None`` will be returned.
 
-        """
-        # Try to get a directly-attached image first
-        q = Image.objects.filter(report=self)
-        q = q.filter(visibility=Visibility.PUBLIC).order_by('-created_on')
-        image = q.first()
-
-        if image is None:
-            # Fall back to images attached to this report's comments
-            q = Image.objects.filter(comment__in=self.comment_set.values_list('pk', flat=True))
-            q = q.filter(visibility=Visibility.PUBLIC).order_by('-created_on')
-            image = q.first()
-
-        if image is None:
-            return None
-
-        sub_dir = 'generated_thumbnails'
-        output_dir = os.path.join(settings.MEDIA_ROOT, sub_dir)
-        media_url = posixpath.join(settings.MEDIA_URL, sub_dir)
-
-        file_name = '{image.pk}.png'.format(image=image)
-        output_path = os.path.join(output_dir, file_name)
+        When the URL was already looked up in bulk by
+        :func:`prefetch_image_urls`, that value is used instead.
 
-        if not os.path.exists(output_path):
-            generate_thumbnail(image.image.path, output_path, width=64, height=64)
-        return posixpath.join(media_url, file_name)
+        """
+        try:
+            return self._prefetched_image_url
+        except AttributeError:
+            return get_image_urls([self]).get(self.pk)
 
     @property
     def species(self):
@@ -166,6 +228,18 @@ class Report(models.Model):
         """Return actual category if set; fall back to reported category."""
         return self.actual_species.category if self.actual_species else self.reported_category
 
+    def set_effective_species(self):
+        """Copy the effective species, category and severity to their
+        denormalized fields.
+        """
+        species = self.species
+        category = self.category
+        self.effective_species = species
+        self.effective_severity_id = species.severity_id if species else None
+        self.effective_species_name = species.name if species else None
+        self.effective_category = category
+        self.effective_category_name = category.name
+
     @property
     def is_misidentified(self):
         """Is reported species different from actual species?"""
@@ -180,6 +254,60 @@ class Report(models.Model):
         return 'Report: {0.title}'.format(self)
 
 
+IMAGE_URLS_SQL = """
+    SELECT image_id, has_thumbnail, ranked_report_id
+    FROM (
+        SELECT
+            image.image_id,
+            image.has_thumbnail,
+            COALESCE(image.report_id, comment.report_id) AS ranked_report_id,
+            row_number() OVER (
+                PARTITION BY COALESCE(image.report_id, comment.report_id)
+                ORDER BY image.report_id IS NULL, image.created_on DESC, image.image_id DESC
+            ) AS rank
+        FROM image
+        LEFT OUTER JOIN comment ON comment.comment_id = image.comment_id
+        WHERE
+            image.visibility = %s
+            AND (image.report_id = ANY(%s) OR comment.report_id = ANY(%s))
+    ) AS ranked
+    WHERE rank = 1
+"""
+
+
+def get_image_urls(reports):
+    """Get "first" public image URLs for a batch of ``reports``.
+
+    This does the same thing as :attr:`Report.image_url`, but for any
+    number of reports in a single query. Images attached directly to
+    a report are ranked ahead of images attached to its comments, and
+    newer images ahead of older ones.
+
+    Returns a dict mapping report IDs to thumbnail URLs; reports without
+    a public image aren't included, nor are reports whose first image
+    doesn't have a thumbnail yet.
+
+    """
+    report_ids = [report.pk for report in reports]
+    if not report_ids:
+        return {}
+    images = Image.objects.raw(IMAGE_URLS_SQL, [Visibility.PUBLIC, report_ids, report_ids])
+    return {image.ranked_report_id: image.thumbnail_url for image in images if image.has_thumbnail}
+
+
+def prefetch_image_urls(reports):
+    """Look up image URLs for ``reports`` in bulk.
+
+    The URLs are attached to the reports so that subsequent access of
+    :attr:`Report.image_url` doesn't hit the database.
+
+    """
+    image_urls = get_image_urls(reports)
+    for report in reports:
+        report._prefetched_image_url = image_urls.get(report.pk)
+    return reports
+
+
 @receiver([post_save], sender=Report)
 def receiver__generate_icon(sender, instance, **kwargs):
     """
@@ -188,6 +316,134 @@ def receiver__generate_icon(sender, instance, **kwargs):
     instance.generate_icon()
 
 
+def get_search_vector():
+    """Get the weighted search document for a report.
+
+    Species names and the report ID rank highest, followed by category
+    names and then the county name.
+
+    """
+    return (
+        SearchVector(
+            'report_id',
+            'reported_species__name',
+            'reported_species__scientific_name',
+            'actual_species__name',
+            'actual_species__scientific_name',
+            weight='A') +
+        SearchVector('reported_category__name', 'actual_species__category__name', weight='B') +
+        SearchVector('county__name', weight='C')
+    )
+
+
+def update_search_vector(queryset):
+    """Recompute the stored search vector for the reports in ``queryset``.
+
+    This is done with a single ``UPDATE`` (the joins needed to build the
+    document are done in a correlated subquery), so it's cheap to call
+    for a whole set of reports at once.
+
+    """
+    reports = Report.objects.filter(pk=OuterRef('pk')).order_by()
+    vectors = reports.annotate(vector=get_search_vector()).values('vector')
+    return queryset.update(search_vector=Subquery(vectors))
+
+
+# Maps models that contribute to a report's search document to a
+# function returning a filter for the reports referencing an instance.
+SEARCH_VECTOR_DEPENDENCIES = {
+    Category: lambda category: (
+        Q(reported_category=category) | Q(actual_species__category=category)),
+    County: lambda county: Q(county=county),
+    Species: lambda species: Q(reported_species=species) | Q(actual_species=species),
+}
+
+
+@receiver([post_save], sender=Category)
+@receiver([post_save], sender=County)
+@receiver([post_save], sender=Species)
+def receiver__update_related_search_vectors(sender, instance, created=False, **kwargs):
+    """
+    Update search vectors for reports that reference a changed species,
+    category or county.
+    """
+    if not created:
+        reports = Report.objects.filter(SEARCH_VECTOR_DEPENDENCIES[sender](instance))
+        update_search_vector(reports)
+
+
+@receiver([pre_delete], sender=Category)
+@receiver([pre_delete], sender=County)
+@receiver([pre_delete], sender=Species)
+def receiver__collect_related_reports(sender, instance, **kwargs):
+    """
+    Remember which reports reference an instance that's about to be
+    deleted; the references are cleared in bulk without any signals.
+    """
+    reports = Report.objects.filter(SEARCH_VECTOR_DEPENDENCIES[sender](instance))
+    instance._related_report_ids = list(reports.values_list('pk', flat=True))
+
+
+@receiver([post_delete], sender=Category)
+@receiver([post_delete], sender=County)
+@receiver([post_delete], sender=Species)
+def receiver__update_search_vectors_after_delete(sender, instance, **kwargs):
+    """
+    Update search vectors (and effective species, etc) for reports that
+    referenced a deleted species, category or county.
+    """
+    report_ids = getattr(instance, '_related_report_ids', ())
+    if report_ids:
+        update_search_vector(Report.objects.filter(pk__in=report_ids))
+        if sender is not County:
+            update_effective_species(Report.objects.filter(pk__in=report_ids))
+
+
+@receiver([pre_save], sender=Report)
+def receiver__set_effective_species(sender, instance, **kwargs):
+    """
+    Keep the effective species, category and severity in sync on save.
+    """
+    instance.set_effective_species()
+
+
+def update_effective_species(queryset):
+    """Recompute the effective species, category and severity for the
+    reports in ``queryset``.
+
+    Like :func:`update_search_vector`, this is a single ``UPDATE``, for
+    use when species or categories change out from under reports.
+
+    """
+    reports = Report.objects.filter(pk=OuterRef('pk')).order_by()
+
+    def effective(actual, reported):
+        return Subquery(reports.annotate(value=Coalesce(actual, reported)).values('value'))
+
+    return queryset.update(
+        updated_on=Now(),
+        effective_species=Coalesce('actual_species', 'reported_species'),
+        effective_category=effective('actual_species__category', 'reported_category'),
+        effective_severity=effective('actual_species__severity', 'reported_species__severity'),
+        effective_species_name=effective('actual_species__name', 'reported_species__name'),
+        effective_category_name=effective(
+            'actual_species__category__name', 'reported_category__name'),
+    )
+
+
+@receiver([post_save], sender=Category)
+@receiver([post_save], sender=Species)
+def receiver__update_related_effective_species(sender, instance, created=False, **kwargs):
+    """
+    Update the effective species, category and severity of reports when
+    a species is renamed or reassigned to another category or severity,
+    or when a category is renamed.
+    """
+    if not created:
+        reports = Report.objects.filter(SEARCH_VECTOR_DEPENDENCIES[sender](instance))
+        update_effective_species(reports)
+
+
 class Invite(models.Model):
     """An invitation to review a report.
 
@@ -204,3 +460,292 @@ class Invite(models.Model):
 
     # The invitee
     user = models.ForeignKey('users.User', related_name='invites', on_delete=models.CASCADE)
+
+
+def mark_reports_updated(report_ids):
+    """Bump the ``updated_on`` timestamp of reports.
+
+    This is used when something shown along with a report changes. It's
+    done with ``update()`` so the report's own save receivers (icons,
+    tiles, etc) aren't triggered.
+
+    """
+    report_ids = [report_id for report_id in report_ids if report_id is not None]
+    if report_ids:
+        Report.objects.filter(pk__in=report_ids).update(updated_on=Now())
+        bump_version(REPORT_LIST_NAMESPACE)
+
+
+def get_image_report_ids(image):
+    """Get the IDs of the reports an image is shown with."""
+    report_ids = [image.report_id]
+    if image.comment_id is not None:
+        comments = Comment.objects.filter(pk=image.comment_id)
+        report_ids.extend(comments.values_list('report_id', flat=True))
+    return report_ids
+
+
+@receiver([post_save, post_delete], sender=Comment)
+@receiver([post_save, post_delete], sender=Invite)
+def receiver__mark_report_updated(sender, instance, **kwargs):
+    """
+    Update the timestamp of a report when one of its comments or
+    invites changes.
+    """
+    mark_reports_updated([instance.report_id])
+
+
+@receiver([post_save, post_delete], sender=Image)
+def receiver__mark_image_report_updated(sender, instance, raw=False, **kwargs):
+    """
+    Update the timestamp of the report an image is shown with when the
+    image changes.
+    """
+    if not raw:
+        mark_reports_updated(get_image_report_ids(instance))
+
+
+class ExportJob(models.Model):
+    """An export of reports that's run in the background.
+
+    Large exports are written to a file under ``MEDIA_ROOT`` by a Celery
+    task (see :func:`oregoninvasiveshotline.reports.tasks.run_export_job`)
+    instead of being streamed in a request. The job's progress is
+    recorded as it runs; jobs whose progress hasn't been updated within
+    ``EXPORT_JOB_STALL_TIMEOUT`` seconds are considered stalled (e.g.,
+    when the worker running them was stopped).
+    """
+    class Meta:
+        db_table = 'export_job'
+        ordering = ['-created_on']
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETE = 'complete'
+    FAILED = 'failed'
+
+    export_job_id = models.AutoField(primary_key=True)
+    created_by = models.ForeignKey(
+        'users.User', related_name='export_jobs', on_delete=models.CASCADE)
+    created_on = models.DateTimeField(auto_now_add=True)
+    completed_on = models.DateTimeField(null=True, default=None)
+    # When the job's status or progress was last updated
+    updated_on = models.DateTimeField(auto_now=True)
+
+    format = models.CharField(max_length=3, choices=[
+        ('csv', 'CSV'),
+        ('kml', 'KML'),
+        ('kmz', 'KMZ'),
+    ])
+    query = models.TextField(help_text=(
+        'This is a string for a QueryDict of the GET parameters to pass to the '
+        'ReportSearchForm that match the reports to export.'
+    ))
+    # Identifies the export (format, filters and audience) so that the
+    # file can be reused for identical exports requested soon after
+    signature = models.CharField(max_length=32, db_index=True)
+
+    status = models.CharField(max_length=8, default=PENDING, choices=[
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (COMPLETE, 'Complete'),
+        (FAILED, 'Failed'),
+    ])
+    total = models.IntegerField(null=True, default=None)
+    processed = models.IntegerField(default=0)
+    file = models.FileField(upload_to='exports', blank=True)
+
+    @property
+    def is_finished(self):
+        return self.status in (self.COMPLETE, self.FAILED)
+
+    @property
+    def percent_complete(self):
+        if self.status == self.COMPLETE:
+            return 100
+        if not self.total:
+            return 0
+        return min(100, int(100 * self.processed / self.total))
+
+    @property
+    def file_name(self):
+        return 'reports.{self.format}'.format(self=self)
+
+    def get_absolute_url(self):
+        return reverse('reports-export-job', args=(self.pk,))
+
+    def __str__(self):
+        return 'Export of reports ({self.format}) by {self.created_by}'.format(self=self)
+
+
+def stalled_export_jobs():
+    """Get the export jobs that haven't finished or made progress
+    within ``EXPORT_JOB_STALL_TIMEOUT`` seconds.
+    """
+    cutoff = timezone.now() - datetime.timedelta(seconds=settings.EXPORT_JOB_STALL_TIMEOUT)
+    return ExportJob.objects.filter(
+        status__in=(ExportJob.PENDING, ExportJob.RUNNING),
+        updated_on__lt=cutoff,
+    )
+
+
+# Cache namespaces for data derived from report searches
+REPORT_SEARCH_CACHE_NAMESPACES = ('report-clusters', 'report-counts', REPORT_LIST_NAMESPACE)
+
+
+def invalidate_report_search_caches():
+    """Invalidate cached map clusters, search result counts, and the
+    report list.
+    """
+    for namespace in REPORT_SEARCH_CACHE_NAMESPACES:
+        bump_version(namespace)
+
+
+@receiver([post_save, post_delete], sender=Invite)
+@receiver([post_save, post_delete], sender=Species)
+def receiver__invalidate_report_search_caches(sender, **kwargs):
+    """
+    Invalidate report search caches when the species or invites reports
+    are filtered by change. (Reports themselves are handled by
+    receiver__report_saved() and receiver__report_deleted().)
+    """
+    invalidate_report_search_caches()
+
+
+# Fields whose values are carried by (or determine which) map tiles
+TILE_FIELDS = (
+    'point',
+    'is_archived',
+    'is_public',
+    'actual_species_id',
+    'reported_category_id',
+    'reported_species_id',
+)
+
+
+def changed_fields(instance, names):
+    """Get which of the ``names``d fields of a report have changed since
+    it was loaded (or last saved).
+
+    Fields whose original values aren't known are considered changed.
+
+    """
+    loaded = getattr(instance, '_loaded_values', {})
+    return {
+        name for name in names
+        if name not in loaded or loaded[name] != getattr(instance, name)
+    }
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Severity)
+@receiver([post_save, post_delete], sender=Species)
+def receiver__invalidate_all_tiles(sender, created=False, **kwargs):
+    """
+    Remove all cached map tiles when the categories, colors or icons
+    they're drawn with might have changed.
+    """
+    if not created:
+        invalidate_all_tiles()
+
+
+# Fields of a report that affect how (or whether) it's shown on the home
+# page
+HOME_SNAPSHOT_FIELDS = (
+    'is_archived',
+    'is_public',
+    'actual_species_id',
+    'reported_category_id',
+    'reported_species_id',
+)
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Severity)
+@receiver([post_save, post_delete], sender=Species)
+@receiver([post_delete], sender=Image)
+def receiver__rebuild_home_snapshot_for_related(sender, created=False, **kwargs):
+    """
+    Rebuild the home page's snapshot of reports when the species, etc
+    shown with them change or one of their images is removed. (New and
+    changed images are handled when their thumbnails are generated.)
+    """
+    if not created:
+        queue_home_snapshot_rebuild()
+
+
+# Fields of a report that determine which tabs it's counted in
+TAB_COUNT_FIELDS = (
+    'created_by_id',
+    'claimed_by_id',
+    'is_archived',
+    'is_public',
+)
+
+
+@receiver([post_save, post_delete], sender=Invite)
+def receiver__invalidate_invitee_tab_counts(sender, instance, **kwargs):
+    invalidate_tab_counts(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Invite)
+def receiver__invalidate_invitee_permissions(sender, **kwargs):
+    permissions.invalidate()
+
+
+# Fields of a report whose changes are tracked; see changed_fields()
+TRACKED_FIELDS = tuple(sorted(set(TILE_FIELDS + HOME_SNAPSHOT_FIELDS + TAB_COUNT_FIELDS)))
+
+
+@receiver([post_save], sender=Report)
+def receiver__report_saved(sender, instance, created, **kwargs):
+    """
+    Update what's derived from a report when it's saved:
+
+    - its search vector;
+    - cached searches (see invalidate_report_search_caches());
+    - the map tiles at its old and new locations, when it moved or
+      changed in a way that affects the tiles;
+    - the home page's snapshot, when the report is (or was) public and
+      it was published or unpublished, archived, or its species or
+      category changed;
+    - everyone's tab counts, when it moved between tabs (the count of
+      unclaimed reports is shared by all managers);
+    - permission checks memoized during the current request, since
+      they may depend on its claimant, creator, etc.
+
+    Finally, the values of the report as saved are remembered so that
+    changes can be detected when it's saved again.
+    """
+    loaded = getattr(instance, '_loaded_values', {})
+    changed = set(TRACKED_FIELDS) if created else changed_fields(instance, TRACKED_FIELDS)
+
+    update_search_vector(Report.objects.filter(pk=instance.pk))
+    invalidate_report_search_caches()
+    if changed.intersection(TILE_FIELDS):
+        invalidate_tiles([loaded.get('point'), instance.point])
+    if instance.is_public or loaded.get('is_public'):
+        if changed.intersection(HOME_SNAPSHOT_FIELDS):
+            queue_home_snapshot_rebuild()
+    if changed.intersection(TAB_COUNT_FIELDS):
+        invalidate_tab_counts()
+    permissions.invalidate(instance)
+
+    current = {name: getattr(instance, name) for name in TRACKED_FIELDS}
+    if current['point'] is not None:
+        current['point'] = current['point'].clone()
+    instance._loaded_values = {**loaded, **current}
+
+
+@receiver([post_delete], sender=Report)
+def receiver__report_deleted(sender, instance, **kwargs):
+    """
+    Update what's derived from a report when it's deleted; see
+    receiver__report_saved().
+    """
+    invalidate_report_search_caches()
+    invalidate_tiles([instance.point])
+    if instance.is_public:
+        queue_home_snapshot_rebuild()
+    invalidate_tab_counts()
+    permissions.invalidate(instance)
@@ -1,5 +1,19 @@
 from ..perms import permissions
-from .models import Invite, Report
+from .models import ExportJob, Invite, Report
+
+
+def is_invited(user, report):
+    """Has ``user`` been invited to review ``report``?
+
+    When the report's invites were loaded into its ``invites``
+    attribute (as they are for its detail page), they're checked
+    instead of querying the database.
+
+    """
+    invites = getattr(report, 'invites', None)
+    if invites is not None:
+        return any(invite.user_id == user.pk for invite in invites)
+    return Invite.objects.filter(report=report, user_id=user.pk).exists()
 
 
 @permissions.register(model=Report)
@@ -17,19 +31,19 @@ def can_view_private_report(user, report):
     if user.is_anonymous:
         return False
 
-    if report.created_by == user:
+    if report.created_by_id == user.pk:
         return True
 
     if user.is_active:
         return True
 
-    if Invite.objects.filter(report=report, user_id=user.pk).exists():
+    if is_invited(user, report):
         return True
 
 
 @permissions.register(model=Report)
 def can_adjust_visibility(user, report):
-    return user.is_active or Invite.objects.filter(user=user, report=report).exists()
+    return user.is_active or is_invited(user, report)
 
 
 @permissions.register(model=Report)
@@ -45,3 +59,8 @@ def can_unclaim_report(user, report):
 @permissions.register(model=Report)
 def can_manage_report(user, report):
     return user.is_authenticated and (user.is_staff or report.claimed_by_id == user.pk)
+
+
+@permissions.register(model=ExportJob)
+def can_view_export_job(user, export_job):
+    return user.is_active and (user.is_staff or export_job.created_by_id == user.pk)
@@ -1,14 +1,74 @@
 from django.template.loader import render_to_string
+from django.db.models import Manager, QuerySet
 
 from rest_framework import serializers
 import pytz
 
-from oregoninvasiveshotline.reports.models import Report
+from oregoninvasiveshotline.reports.models import prefetch_image_urls
 
 
-class ReportSerializer(serializers.Serializer):
+class ReportListSerializer(serializers.ListSerializer):
+    """
+    Serializes a batch of reports in a fixed number of queries.
+
+    The related rows used by :class:`ReportSerializer` are joined into
+    the reports query and the image URLs for all of the reports are
+    looked up in bulk, so the number of queries doesn't depend on the
+    number of reports being serialized.
+    """
+
+    related_fields = (
+        'actual_species__category',
+        'actual_species__severity',
+        'county',
+        'reported_category',
+        'reported_species__severity',
+    )
+
+    def to_representation(self, data):
+        reports = data.all() if isinstance(data, Manager) else data
+        if isinstance(reports, QuerySet):
+            reports = reports.select_related(*self.related_fields)
+        reports = prefetch_image_urls(list(reports))
+        return super().to_representation(reports)
+
+
+class ReportMarkerSerializer(serializers.Serializer):
+    """
+    Serializes just what's needed to draw a report's marker on a map.
+
+    The marker's popover is loaded when it's clicked (see
+    :func:`oregoninvasiveshotline.reports.views.popover`).
+    """
+
+    # The related rows used for the title and icon
+    related_fields = (
+        'actual_species__category',
+        'actual_species__severity',
+        'reported_category',
+        'reported_species__severity',
+    )
 
     pk = serializers.IntegerField()
+    icon_url = serializers.CharField(required=False)
+    lat = serializers.SerializerMethodField()
+    lng = serializers.SerializerMethodField()
+    title = serializers.CharField()
+
+    def get_lat(self, instance):
+        point = instance.point
+        return point.y if point else None
+
+    def get_lng(self, instance):
+        point = instance.point
+        return point.x if point else None
+
+
+class ReportSerializer(ReportMarkerSerializer):
+
+    class Meta:
+        list_serializer_class = ReportListSerializer
+
     category = serializers.CharField()
     content = serializers.SerializerMethodField()
     county = serializers.CharField()
@@ -22,12 +82,8 @@ class ReportSerializer(serializers.Serializer):
                                            default_timezone=pytz.utc)
 
     edrr_status = serializers.SerializerMethodField()
-    icon_url = serializers.CharField(required=False)
     image_url = serializers.CharField(required=False)
-    lat = serializers.SerializerMethodField()
-    lng = serializers.SerializerMethodField()
     species = serializers.CharField()
-    title = serializers.CharField()
 
     def get_content(self, instance):
         return render_to_string('reports/_popover.html', {
@@ -37,11 +93,3 @@ class ReportSerializer(serializers.Serializer):
 
     def get_edrr_status(self, instance):
         return instance.get_edrr_status_display()
-
-    def get_lat(self, instance):
-        point = instance.point
-        return point.y if point else None
-
-    def get_lng(self, instance):
-        point = instance.point
-        return point.x if point else None
@@ -1,4 +1,12 @@
+import datetime
+import logging
+import os
+import uuid
+
+from django.conf import settings
+from django.db.models import F
 from django.template.loader import render_to_string
+from django.utils import timezone
 from django.core.management import call_command
 from django.core.mail import send_mail
 from django.urls import reverse
@@ -6,12 +14,16 @@ from django.http import QueryDict
 
 from oregoninvasiveshotline.utils.settings import get_setting
 from oregoninvasiveshotline.utils.urls import build_absolute_url
-from oregoninvasiveshotline.notifications.models import UserNotificationQuery, Notification
-from oregoninvasiveshotline.reports.models import Report, Invite
+from oregoninvasiveshotline.notifications.models import Notification
+from oregoninvasiveshotline.reports.exports import EXPORT_GENERATORS
+from oregoninvasiveshotline.reports.models import ExportJob, Report, Invite, stalled_export_jobs
 from oregoninvasiveshotline.users.models import User
 from oregoninvasiveshotline.celery import app
 
 
+log = logging.getLogger(__name__)
+
+
 @app.task
 def generate_icons():
     call_command('generate_icons', interactive=False)
@@ -43,25 +55,26 @@ def notify_report_subscribers(report_id):
     """
     Notify users subscribed to a query that matches ``report``.
     """
-    from oregoninvasiveshotline.reports.forms import ReportSearchForm  # avoid circular import
+    from oregoninvasiveshotline.notifications.matching import (  # avoid circular import
+        MatchContext,
+        compile_subscription,
+        get_candidate_subscriptions,
+    )
 
     report = Report.objects.get(pk=report_id)
+    context = MatchContext(report)
 
     subject = get_setting('NOTIFICATIONS.notify_new_submission__subject')
     from_email = get_setting('NOTIFICATIONS.from_email')
     excluded_users = Notification.objects.filter(report=report).values_list('user_id', flat=True)
-    queryset = UserNotificationQuery.objects.all().select_related('user')
+    queryset = get_candidate_subscriptions(report).select_related('user')
     queryset = queryset.exclude(user__pk__in=excluded_users)
 
     notified_users = set()
     for user_notification_query in queryset.iterator():
         user = user_notification_query.user
         if user.pk not in notified_users:
-            query = user_notification_query.query
-            form = ReportSearchForm(QueryDict(query), user=user)
-
-            if form.is_valid() and \
-               form.search(Report.objects.all()).filter(pk=report.pk).count():
+            if compile_subscription(user_notification_query)(context):
                 next_url = reverse('reports-detail', args=[report.pk])
 
                 if user.is_active:
@@ -100,3 +113,89 @@ def notify_invited_reviewer(invite_id, message):
         'url': url
     })
     send_mail(subject, body, from_email, [invite.user.email])
+
+
+@app.task
+def run_export_job(export_job_id):
+    """Write the reports for an export job to a file under ``MEDIA_ROOT``.
+
+    The job's progress is updated as the reports are written. When the
+    export is done, the user who requested it is emailed a link to it.
+    """
+    from oregoninvasiveshotline.reports.forms import ReportSearchForm  # avoid circular import
+
+    job = ExportJob.objects.select_related('created_by').get(pk=export_job_id)
+    jobs = ExportJob.objects.filter(pk=job.pk)
+
+    form = ReportSearchForm(QueryDict(job.query), user=job.created_by)
+    reports = Report.objects.all()
+    if form.is_valid():
+        reports = form.search(reports)
+
+    total = reports.count()
+    jobs.update(status=ExportJob.RUNNING, total=total, processed=0, updated_on=timezone.now())
+
+    def progress(processed):
+        jobs.update(processed=processed, updated_on=timezone.now())
+
+    generator = EXPORT_GENERATORS[job.format]
+    name = os.path.join(job.file.field.upload_to, '{0}.{1}'.format(uuid.uuid4().hex, job.format))
+    path = os.path.join(settings.MEDIA_ROOT, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    try:
+        with open(path, 'wb') as fp:
+            for chunk in generator(reports, progress):
+                fp.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+    except Exception:
+        now = timezone.now()
+        jobs.update(status=ExportJob.FAILED, completed_on=now, updated_on=now)
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+    now = timezone.now()
+    jobs.update(
+        status=ExportJob.COMPLETE,
+        completed_on=now,
+        updated_on=now,
+        file=name,
+        processed=F('total'),
+    )
+    notify_export_complete(job.pk)
+
+
+def notify_export_complete(export_job_id):
+    job = ExportJob.objects.select_related('created_by').get(pk=export_job_id)
+    user = job.created_by
+
+    subject = get_setting('NOTIFICATIONS.export_complete__subject')
+    from_email = get_setting('NOTIFICATIONS.from_email')
+
+    body = render_to_string('reports/_export_complete.txt', {
+        'user': user,
+        'job': job,
+        'url': build_absolute_url(reverse('reports-export-job-download', args=[job.pk])),
+    })
+    send_mail(subject, body, from_email, [user.email])
+
+
+@app.task
+def clean_export_jobs():
+    """Remove export jobs (and their files) older than ``EXPORT_JOB_MAX_AGE``.
+
+    Jobs that have stalled are marked as failed so they're no longer
+    shown as running.
+
+    """
+    now = timezone.now()
+    stalled_export_jobs().update(status=ExportJob.FAILED, completed_on=now, updated_on=now)
+
+    cutoff = now - datetime.timedelta(seconds=settings.EXPORT_JOB_MAX_AGE)
+    for job in ExportJob.objects.filter(created_on__lt=cutoff).iterator():
+        if job.file:
+            try:
+                job.file.delete(save=False)
+            except OSError:
+                log.exception('Could not remove export file %s', job.file.name)
+        job.delete()
@@ -1,12 +1,11 @@
 import posixpath
-import tempfile
 import binascii
-import shutil
 import codecs
 import json
 import csv
 import io
 import os
+import zipfile
 from datetime import timedelta
 from unittest.mock import Mock, patch
 
@@ -14,26 +13,34 @@ from django.utils import timezone
 from django.conf import settings
 from django.core import mail
 from django.core.exceptions import NON_FIELD_ERRORS
-from django.core.files.base import File
 from django.core.files.uploadedfile import InMemoryUploadedFile
-from django.contrib.gis.geos import Point
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.core.management import call_command
 from django.db.models.signals import post_save
-from django.db import transaction
+from django.db import connection, transaction
 from django.urls import reverse
-from django.test import TestCase, TransactionTestCase
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 
 from model_mommy.mommy import make, prepare
 
 from oregoninvasiveshotline.utils.test.user import UserMixin
 from oregoninvasiveshotline.comments.forms import CommentForm
 from oregoninvasiveshotline.comments.models import Comment
+from oregoninvasiveshotline.counties.models import County
 from oregoninvasiveshotline.images.models import Image
+from oregoninvasiveshotline.images.tasks import generate_thumbnail
 from oregoninvasiveshotline.species.models import Category, Severity, Species
 from oregoninvasiveshotline.notifications.models import UserNotificationQuery
+from oregoninvasiveshotline.permissions.memo import memoized
 from oregoninvasiveshotline.users.models import User
 
 from .forms import InviteForm, ManagementForm, ReportForm, ReportSearchForm
-from .models import Invite, Report, receiver__generate_icon
+from .models import ExportJob, Invite, Report, receiver__generate_icon
+from .perms import can_view_private_report
+from .serializers import ReportSerializer
+from .tasks import clean_export_jobs, run_export_job
+from .tiles import get_tile_cache, invalidate_all_tiles, tile_cache_key
 from .views import _export
 
 ORIGIN = Point(0, 0)
@@ -78,35 +85,107 @@ class ReportTest(SuppressPostSaveMixin, TestCase):
         reported_species = make(Species)
         actual_species = make(Species)
 
-        self.assertEqual(make(Report, actual_species=None, reported_species=reported_species, point=ORIGIN).species, reported_species)
-        self.assertEqual(make(Report, actual_species=actual_species, reported_species=reported_species, point=ORIGIN).species, actual_species)
-        self.assertEqual(make(Report, actual_species=None, reported_species=None, point=ORIGIN).species, None)
+        report = make(
+            Report, actual_species=None, reported_species=reported_species, point=ORIGIN)
+        self.assertEqual(report.species, reported_species)
+        report = make(
+            Report, actual_species=actual_species, reported_species=reported_species, point=ORIGIN)
+        self.assertEqual(report.species, actual_species)
+        report = make(Report, actual_species=None, reported_species=None, point=ORIGIN)
+        self.assertEqual(report.species, None)
 
     def test_category(self):
         reported_species = make(Species)
         actual_species = make(Species)
 
-        self.assertEqual(
-            make(Report, actual_species=None, reported_species=None, reported_category=reported_species.category, point=ORIGIN).category,
-            reported_species.category
-        )
-        self.assertEqual(make(Report, actual_species=actual_species, reported_species=reported_species, point=ORIGIN).category, actual_species.category)
+        report = make(
+            Report, actual_species=None, reported_species=None,
+            reported_category=reported_species.category, point=ORIGIN)
+        self.assertEqual(report.category, reported_species.category)
+        report = make(
+            Report, actual_species=actual_species, reported_species=reported_species, point=ORIGIN)
+        self.assertEqual(report.category, actual_species.category)
+
+    def test_effective_species_is_stored_on_save(self):
+        reported_species = make(Species)
+        actual_species = make(Species)
+        report = make(Report, actual_species=None, reported_species=reported_species, point=ORIGIN)
+        report.refresh_from_db()
+        self.assertEqual(report.effective_species, reported_species)
+        self.assertEqual(report.effective_species_name, reported_species.name)
+        self.assertEqual(report.effective_category, report.reported_category)
+        self.assertEqual(report.effective_category_name, report.reported_category.name)
+        self.assertEqual(report.effective_severity, reported_species.severity)
+
+        report.actual_species = actual_species
+        report.save()
+        report.refresh_from_db()
+        self.assertEqual(report.effective_species, actual_species)
+        self.assertEqual(report.effective_category, actual_species.category)
+        self.assertEqual(report.effective_category_name, actual_species.category.name)
+        self.assertEqual(report.effective_severity, actual_species.severity)
+
+    def test_effective_species_tracks_changes_to_species(self):
+        species = make(Species, name='Foo')
+        report = make(Report, actual_species=species, point=ORIGIN)
+
+        species.name = 'Bar'
+        species.category = make(Category, name='Baz')
+        species.save()
+        report.refresh_from_db()
+        self.assertEqual(report.effective_species_name, 'Bar')
+        self.assertEqual(report.effective_category, species.category)
+        self.assertEqual(report.effective_category_name, 'Baz')
+
+        species.category.name = 'Quux'
+        species.category.save()
+        report.refresh_from_db()
+        self.assertEqual(report.effective_category_name, 'Quux')
+
+        # Deleting the actual species falls back to what was reported
+        species.delete()
+        report.refresh_from_db()
+        self.assertEqual(report.effective_species, report.reported_species)
+        self.assertEqual(report.effective_category, report.reported_category)
+        self.assertEqual(report.effective_category_name, report.reported_category.name)
+
+    def test_updated_on_tracks_comments_and_images(self):
+        report = make(Report, point=ORIGIN)
+        Report.objects.filter(pk=report.pk).update(updated_on=timezone.now() - timedelta(days=1))
+
+        comment = make(Comment, report=report)
+        report.refresh_from_db()
+        self.assertGreater(report.updated_on, timezone.now() - timedelta(hours=1))
+
+        Report.objects.filter(pk=report.pk).update(updated_on=timezone.now() - timedelta(days=1))
+        make(Image, comment=comment, created_by=comment.created_by)
+        report.refresh_from_db()
+        self.assertGreater(report.updated_on, timezone.now() - timedelta(hours=1))
 
     def test_is_misidentified(self):
         reported_species = make(Species)
         actual_species = make(Species)
 
         # if they didn't identify the species, then it can't be misidentified
-        self.assertEqual(make(Report, actual_species=None, reported_species=None, point=ORIGIN).is_misidentified, False)
+        report = make(Report, actual_species=None, reported_species=None, point=ORIGIN)
+        self.assertEqual(report.is_misidentified, False)
         # if the reported and actual species are the same, it's not misidentified
-        self.assertEqual(make(Report, actual_species=actual_species, reported_species=actual_species, point=ORIGIN).is_misidentified, False)
+        report = make(
+            Report, actual_species=actual_species, reported_species=actual_species, point=ORIGIN)
+        self.assertEqual(report.is_misidentified, False)
         # if the species differ, then it is misidentified
-        self.assertEqual(make(Report, actual_species=actual_species, reported_species=reported_species, point=ORIGIN).is_misidentified, True)
+        report = make(
+            Report, actual_species=actual_species, reported_species=reported_species, point=ORIGIN)
+        self.assertEqual(report.is_misidentified, True)
 
     def test_title(self):
-        report = make(Report, actual_species=None, reported_species=None, reported_category=make(Category, name='Foo'), point=ORIGIN)
+        report = make(
+            Report, actual_species=None, reported_species=None,
+            reported_category=make(Category, name='Foo'), point=ORIGIN)
         self.assertEqual(report.title, 'Foo')
-        report = make(Report, actual_species=None, reported_species=make(Species, name='Bar', scientific_name='Foo'), point=ORIGIN)
+        report = make(
+            Report, actual_species=None,
+            reported_species=make(Species, name='Bar', scientific_name='Foo'), point=ORIGIN)
         self.assertEqual(report.title, 'Bar (Foo)')
 
     def test_image_url(self):
@@ -121,13 +200,17 @@ class ReportTest(SuppressPostSaveMixin, TestCase):
         expected_url = None
         self.assertEqual(report.image_url, expected_url)
 
-        # A report with a public image should have an image URL
+        # A report with a public image should have an image URL once
+        # its thumbnail has been generated in the background
         image = make(
             Image,
             report=report,
             image=self._make_report_image(),
             visibility=Image.PUBLIC
         )
+        self.assertIsNone(report.image_url)
+        generate_thumbnail(image.pk)
+
         file_name = '{image.pk}.png'.format(image=image)
         expected_url = posixpath.join(settings.MEDIA_URL, 'generated_thumbnails', file_name)
         self.assertEqual(report.image_url, expected_url)
@@ -135,6 +218,22 @@ class ReportTest(SuppressPostSaveMixin, TestCase):
         path = os.path.join(settings.MEDIA_ROOT, 'generated_thumbnails', file_name)
         self.assertTrue(os.path.exists(path))
 
+    def test_thumbnails_only_rebuild_home_snapshot_for_public_images_of_public_reports(self):
+        private_report = make(Report, point=ORIGIN, is_public=False)
+        public_report = make(Report, point=ORIGIN, is_public=True)
+        images = [
+            make(Image, report=report, image=self._make_report_image(), visibility=visibility)
+            for (report, visibility) in [
+                (private_report, Image.PUBLIC),
+                (public_report, Image.PRIVATE),
+                (public_report, Image.PUBLIC),
+            ]
+        ]
+        with patch('oregoninvasiveshotline.images.tasks.rebuild_home_snapshot') as rebuild:
+            for image in images:
+                generate_thumbnail(image.pk)
+        rebuild.delay.assert_called_once_with()
+
     def test_image_url_from_comment(self):
         report = make(Report, point=ORIGIN)
 
@@ -147,12 +246,24 @@ class ReportTest(SuppressPostSaveMixin, TestCase):
         expected_url = None
         self.assertEqual(report.image_url, expected_url)
 
+        comment_image = make(
+            Image,
+            comment=make(Comment, report=report),
+            image=self._make_report_image(),
+            visibility=Image.PUBLIC
+        )
+        generate_thumbnail(comment_image.pk)
+        expected_url = comment_image.thumbnail_url
+        self.assertEqual(report.image_url, expected_url)
+
+        # Images attached directly to the report take precedence
         image = make(
             Image,
             report=report,
             image=self._make_report_image(),
             visibility=Image.PUBLIC
         )
+        generate_thumbnail(image.pk)
         file_name = '{image.pk}.png'.format(image=image)
         expected_url = posixpath.join(settings.MEDIA_URL, 'generated_thumbnails', file_name)
         self.assertEqual(report.image_url, expected_url)
@@ -166,13 +277,13 @@ class TestReportIconGeneration(TestCase):
     def _make_category_icon(self):
         content = binascii.unhexlify(
             # Turtle icon encoded as hex
-            b'89504e470d0a1a0a0000000d494844520000002000000025080600000023b7eb47000000d249444154588'
-            b'5ed95410ec42008453f93b9191cbb9ecd59991082561cba980c6fd3a6c6f004a1405114455114bf063377'
-            b'fdfc96d7c9a6de7b9a0445373073bfae0b0020220080d61ae975bb47afa708008095d08c350020a2658cb'
-            b'08027a1453cb14733e0e1952645203b3870d005abe083dde04702d9bcbd8fb69522274a1168add1183622'
-            b'9236f53cdc123073b76d65dfb398a676e7c65ba21db014884a9c04bf15d0121a4f6877f28505acc86afc5'
-            b'a911d19b70b66ec9422f223028219589d74466a066cf08c0115be038327a7e37ff101afa37d185ce02898'
-            b'0000000049454e44ae426082'
+            b'89504e470d0a1a0a0000000d494844520000002000000025080600000023b7eb47000000d24944415458'
+            b'85ed95410ec42008453f93b9191cbb9ecd59991082561cba980c6fd3a6c6f004a1405114455114bf0633'
+            b'77fdfc96d7c9a6de7b9a0445373073bfae0b0020220080d61ae975bb47afa708008095d08c350020a265'
+            b'8cb08027a1453cb14733e0e1952645203b3870d005abe083dde04702d9bcbd8fb69522274a1168add118'
+            b'36229236f53cdc123073b76d65dfb398a676e7c65ba21db014884a9c04bf15d0121a4f6877f28505acc8'
+            b'6afc5a911d19b70b66ec9422f223028219589d74466a066cf08c0115be038327a7e37ff101afa37d185c'
+            b'e028980000000049454e44ae426082'
         )
 
         return InMemoryUploadedFile(
@@ -217,6 +328,46 @@ class TestReportIconGeneration(TestCase):
         os.unlink(report.icon_path)
 
 
+class ReportSerializerTest(SuppressPostSaveMixin, TestCase):
+
+    def _make_reports(self, n):
+        reports = make(
+            Report,
+            point=ORIGIN,
+            actual_species=make(Species),
+            reported_species=make(Species),
+            _quantity=n,
+        )
+        make(Image, report=reports[0], visibility=Image.PUBLIC, has_thumbnail=True)
+        comment = make(Comment, report=reports[-1])
+        make(Image, comment=comment, visibility=Image.PUBLIC, has_thumbnail=True)
+        return reports
+
+    def _serialize(self):
+        with CaptureQueriesContext(connection) as context:
+            data = ReportSerializer(Report.objects.all(), many=True).data
+        return data, len(context.captured_queries)
+
+    def test_query_count_does_not_depend_on_number_of_reports(self):
+        self._make_reports(1)
+        data, one_report_count = self._serialize()
+        self.assertEqual(len(data), 1)
+
+        Report.objects.all().delete()
+        self._make_reports(settings.ITEMS_PER_PAGE)
+        data, page_count = self._serialize()
+        self.assertEqual(len(data), settings.ITEMS_PER_PAGE)
+        self.assertEqual(one_report_count, page_count)
+
+    def test_page_of_reports_is_serialized_in_fixed_number_of_queries(self):
+        self._make_reports(settings.ITEMS_PER_PAGE)
+        # One query for the reports and their related rows and one for
+        # their images.
+        with self.assertNumQueries(2):
+            data = ReportSerializer(Report.objects.all(), many=True).data
+        self.assertEqual(sum(1 for report in data if report['image_url']), 2)
+
+
 class ReportSearchFormTest(TestCase, UserMixin):
 
     def setUp(self):
@@ -383,6 +534,43 @@ class ReportSearchFormTest(TestCase, UserMixin):
 
         self.assertTrue(reports, Report.objects.all().order_by("-created_on"))
 
+    def test_filter_and_order_by_effective_category(self):
+        foo = make(Category, name='Foo')
+        bar = make(Category, name='Bar')
+        reported_foo = make(Report, reported_category=foo, reported_species=None, point=ORIGIN)
+        confirmed_foo = make(
+            Report, reported_category=bar, actual_species=make(Species, category=foo),
+            point=ORIGIN)
+        reported_bar = make(Report, reported_category=bar, reported_species=None, point=ORIGIN)
+
+        form = ReportSearchForm({"categories": [foo.pk]}, user=self.user)
+        self.assertEqual(set(form.search(Report.objects.all())), {reported_foo, confirmed_foo})
+
+        form = ReportSearchForm({"order_by": "category"}, user=self.user)
+        self.assertEqual(list(form.search(Report.objects.all()))[0], reported_bar)
+
+    def test_keyword_search_tracks_changes_to_related_rows(self):
+        species = make(Species, name='Foobarius')
+        report = make(Report, reported_species=species, point=ORIGIN)
+        make(Report, point=ORIGIN)
+
+        form = ReportSearchForm({"q": "foobarius"}, user=self.user)
+        self.assertEqual(list(form.search(Report.objects.all())), [report])
+
+        # Renaming the species should update the stored search vector
+        species.name = 'Bazius'
+        species.save()
+        form = ReportSearchForm({"q": "foobarius"}, user=self.user)
+        self.assertEqual(list(form.search(Report.objects.all())), [])
+        form = ReportSearchForm({"q": "bazius"}, user=self.user)
+        self.assertEqual(list(form.search(Report.objects.all())), [report])
+
+        # As should renaming the report's category
+        report.reported_category.name = 'Quuxius'
+        report.reported_category.save()
+        form = ReportSearchForm({"q": "quuxius"}, user=self.user)
+        self.assertEqual(list(form.search(Report.objects.all())), [report])
+
     def test_inactive_users_only_see_public_fields(self):
         self.user.is_active = False
         self.user.save()
@@ -421,7 +609,8 @@ class CreateViewTest(TestCase):
         response = self.client.get(reverse("reports-create"))
         self.assertEqual(response.status_code, 200)
         # make sure the category_id_to_species_id gets populated
-        self.assertEqual(set(json.loads(response.context['category_id_to_species_id'])[str(c1.pk)]), set([s1.pk, s2.pk]))
+        category_id_to_species_id = json.loads(response.context['category_id_to_species_id'])
+        self.assertEqual(set(category_id_to_species_id[str(c1.pk)]), set([s1.pk, s2.pk]))
 
     def test_post(self):
         data = {
@@ -442,7 +631,8 @@ class CreateViewTest(TestCase):
         }
 
         response = self.client.post(reverse("reports-create"), data)
-        self.assertRedirects(response, reverse("reports-detail", args=[Report.objects.order_by("-pk").first().pk]))
+        report = Report.objects.order_by("-pk").first()
+        self.assertRedirects(response, reverse("reports-detail", args=[report.pk]))
         session = self.client.session
         # make sure the report_ids in the session gets updated
         self.assertIn(Report.objects.order_by("-pk").first().pk, session['report_ids'])
@@ -470,7 +660,8 @@ class DetailViewTest(TestCase, UserMixin):
     def test_anonymous_users_cant_view_non_public_reports_and_is_prompted_to_login(self):
         report = make(Report, is_public=False, point=ORIGIN)
         response = self.client.get(reverse("reports-detail", args=[report.pk]))
-        self.assertRedirects(response, reverse("login") + "?next=" + reverse("reports-detail", args=[report.pk]))
+        self.assertRedirects(
+            response, reverse("login") + "?next=" + reverse("reports-detail", args=[report.pk]))
 
     def test_anonymous_users_with_proper_session_state_can_view_non_public_reports(self):
         report = make(Report, is_public=False, created_by=self.inactive_user, point=ORIGIN)
@@ -480,13 +671,87 @@ class DetailViewTest(TestCase, UserMixin):
         response = self.client.get(reverse("reports-detail", args=[report.pk]))
         self.assertEqual(response.status_code, 200)
 
-    def test_anonymous_users_with_proper_session_state_should_be_prompted_to_login_if_the_report_was_created_by_an_active_user(self):
+    def test_anonymous_users_with_proper_session_state_should_be_prompted_to_login_if_the_report_was_created_by_an_active_user(self):  # noqa: E501
         report = make(Report, is_public=False, created_by=self.user, point=ORIGIN)
         session = self.client.session
         session['report_ids'] = [report.pk]
         session.save()
         response = self.client.get(reverse("reports-detail", args=[report.pk]))
-        self.assertRedirects(response, reverse("login") + "?next=" + reverse("reports-detail", args=[report.pk]))
+        self.assertRedirects(
+            response, reverse("login") + "?next=" + reverse("reports-detail", args=[report.pk]))
+
+    # Upper bounds on the number of queries it takes to render a report's
+    # page. These include the savepoint around the request, the page's
+    # ETag, the report (with its species, etc), its invites, comments
+    # and images, and the species for the species picker. Managers also
+    # need their session and user, and the choices for the management
+    # form.
+    ANONYMOUS_QUERY_BUDGET = 9
+    MANAGER_QUERY_BUDGET = 15
+
+    def _count_detail_queries(self, report):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("reports-detail", args=[report.pk]))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def _make_report_with_related_rows(self, n):
+        report = make(Report, is_public=True, claimed_by=self.user, point=ORIGIN)
+        for comment in make(Comment, report=report, visibility=Comment.PUBLIC, _quantity=n):
+            make(Image, comment=comment, created_by=comment.created_by, visibility=Image.PUBLIC)
+        make(
+            Image, report=report, created_by=report.created_by, visibility=Image.PUBLIC,
+            _quantity=n)
+        make(Invite, report=report, _quantity=n)
+        return report
+
+    def test_query_budget(self):
+        one = self._make_report_with_related_rows(1)
+        many = self._make_report_with_related_rows(5)
+
+        anonymous_queries = self._count_detail_queries(one)
+        self.assertLessEqual(anonymous_queries, self.ANONYMOUS_QUERY_BUDGET)
+        self.assertEqual(self._count_detail_queries(many), anonymous_queries)
+
+        self.client.login(email=self.user.email, password="foo")
+        manager_queries = self._count_detail_queries(one)
+        self.assertLessEqual(manager_queries, self.MANAGER_QUERY_BUDGET)
+        self.assertEqual(self._count_detail_queries(many), manager_queries)
+
+    def test_unchanged_report_is_not_modified(self):
+        report = make(Report, is_public=True, point=ORIGIN)
+        url = reverse("reports-detail", args=[report.pk])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Comments on the report change its page
+        make(Comment, report=report, created_by=self.user, visibility=Comment.PUBLIC)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        # As does who's looking at it
+        etag = response['ETag']
+        self.client.login(email=self.user.email, password="foo")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_report_is_modified_when_csrf_cookie_changes(self):
+        report = make(Report, is_public=True, point=ORIGIN)
+        url = reverse("reports-detail", args=[report.pk])
+        self.client.login(email=self.user.email, password="foo")
+        self.client.get(url)
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # The page's forms have tokens made from the old cookie
+        del self.client.cookies[settings.CSRF_COOKIE_NAME]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
 
     def test_invited_experts_cannot_see_every_report(self):
         report = make(Report, is_public=False, point=ORIGIN)
@@ -509,13 +774,14 @@ class DetailViewTest(TestCase, UserMixin):
 
     def test_comment_form_dependent_on_the_can_create_comment_check(self):
         report = make(Report, is_public=True, point=ORIGIN)
-        with patch("oregoninvasiveshotline.reports.views.can_create_comment", return_value=True) as perm_check:
+        can_create_comment = "oregoninvasiveshotline.reports.views.can_create_comment"
+        with patch(can_create_comment, return_value=True) as perm_check:
             with patch("oregoninvasiveshotline.reports.views.CommentForm"):
                 response = self.client.get(reverse("reports-detail", args=[report.pk]))
         self.assertTrue(perm_check.called)
         self.assertNotEqual(None, response.context['comment_form'])
 
-        with patch("oregoninvasiveshotline.reports.views.can_create_comment", return_value=False) as perm_check:
+        with patch(can_create_comment, return_value=False) as perm_check:
             with patch("oregoninvasiveshotline.reports.views.CommentForm"):
                 response = self.client.get(reverse("reports-detail", args=[report.pk]))
         self.assertTrue(perm_check.called)
@@ -556,7 +822,8 @@ class DetailViewTest(TestCase, UserMixin):
         self.client.logout()
         invited_expert = self.user
         self.client.login(email=invited_expert.email, password="foo")
-        invited_expert.is_active = False  # we just had to set this to True to make self.client.login work
+        # we just had to set this to True to make self.client.login work
+        invited_expert.is_active = False
         invited_expert.save()
         make(Invite, user=invited_expert, report=report)
         response = self.client.get(reverse("reports-detail", args=[report.pk]))
@@ -637,7 +904,9 @@ class DetailViewTest(TestCase, UserMixin):
             self.assertRedirects(response, reverse("reports-detail", args=[report.pk]))
 
         # the InviteForm is slightly more complicated, so we need a special case for that
-        with patch("oregoninvasiveshotline.reports.views.InviteForm", SUBMIT_FLAG="foo", save=Mock(return_value=Mock(already_invited=1))) as m:
+        save = Mock(return_value=Mock(already_invited=1))
+        invite_form = "oregoninvasiveshotline.reports.views.InviteForm"
+        with patch(invite_form, SUBMIT_FLAG="foo", save=save) as m:
             data = {
                 "submit_flag": ["foo"],
             }
@@ -764,7 +1033,8 @@ class ManagementFormTest(SuppressPostSaveMixin, TestCase):
 
     def test_species_and_category_initialized(self):
         species = make(Species)
-        report = make(Report, reported_species=species, reported_category=species.category, point=ORIGIN)
+        report = make(
+            Report, reported_species=species, reported_category=species.category, point=ORIGIN)
         form = ManagementForm(instance=report)
         self.assertEqual(form.initial['category'], species.category)
         self.assertEqual(form.initial['actual_species'], species)
@@ -835,7 +1105,7 @@ class ManagementFormTest(SuppressPostSaveMixin, TestCase):
         # even though the data spoofed the is_public flag as True, it should still be false
         self.assertFalse(report.is_public)
 
-    def test_settings_the_actual_species_to_a_confidential_species_raises_an_error_if_the_report_is_public_too(self):
+    def test_settings_the_actual_species_to_a_confidential_species_raises_an_error_if_the_report_is_public_too(self):  # noqa: E501
         report = make(Report, point=ORIGIN)
         form = ManagementForm(instance=report, data={
             "actual_species": make(Species, is_confidential=True).pk,
@@ -855,7 +1125,9 @@ class InviteFormTest(TestCase, UserMixin):
             "emails": "foo@pdx.edu,bar@pdx.edu  ,  fog@pdx.edu,foo@pdx.edu"
         })
         self.assertTrue(form.is_valid())
-        self.assertEqual(sorted(form.cleaned_data['emails']), sorted(["foo@pdx.edu", "bar@pdx.edu", "fog@pdx.edu"]))
+        self.assertEqual(
+            sorted(form.cleaned_data['emails']),
+            sorted(["foo@pdx.edu", "bar@pdx.edu", "fog@pdx.edu"]))
 
         # test blank
         form = InviteForm({
@@ -935,6 +1207,17 @@ class ClaimViewTest(TestCase, UserMixin):
         self.assertEqual(Report.objects.get(claimed_by=self.user), report)
         self.assertRedirects(response, reverse("reports-detail", args=[report.pk]))
 
+    def test_report_is_fetched_once(self):
+        report = make(Report, claimed_by=self.other_user, point=ORIGIN)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("reports-claim", args=[report.pk]))
+        self.assertEqual(response.status_code, 200)
+        fetches = [
+            q for q in context.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "report"' in q['sql']
+        ]
+        self.assertEqual(len(fetches), 1)
+
 
 class ReportListView(TestCase, UserMixin):
 
@@ -953,6 +1236,278 @@ class ReportListView(TestCase, UserMixin):
         self.assertEqual(response.status_code, 200)
         self.assertIn(reports[0].title, response.content.decode())
 
+    def test_unchanged_list_is_not_modified(self):
+        reports = make(Report, _quantity=3, point=ORIGIN)
+        self.client.login(email=self.user.email, password="foo")
+        response = self.client.get(reverse("reports-list"))
+        etag = response['ETag']
+
+        response = self.client.get(reverse("reports-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        make(Image, report=reports[0], created_by=self.user)
+        response = self.client.get(reverse("reports-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response['ETag']
+        reports[1].delete()
+        response = self.client.get(reverse("reports-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        # The search form's choices are part of the list too
+        etag = response['ETag']
+        make(Category)
+        response = self.client.get(reverse("reports-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_pages(self):
+        reports = make(Report, _quantity=settings.ITEMS_PER_PAGE + 5, point=ORIGIN)
+        reports = sorted(reports, key=lambda r: (r.created_on, r.pk), reverse=True)
+        expected = [report.pk for report in reports]
+        self.client.login(email=self.user.email, password="foo")
+
+        def get_page(**params):
+            page = self.client.get(reverse("reports-list"), params).context['page']
+            return page, [report.pk for report in page]
+
+        page, pks = get_page()
+        self.assertEqual(pks, expected[:settings.ITEMS_PER_PAGE])
+        self.assertFalse(page.has_previous)
+        self.assertIsNotNone(page.paginator.count)
+
+        page, pks = get_page(cursor=page.next_cursor)
+        self.assertEqual(pks, expected[settings.ITEMS_PER_PAGE:])
+        self.assertFalse(page.has_next)
+
+        page, pks = get_page(cursor=page.previous_cursor)
+        self.assertEqual(pks, expected[:settings.ITEMS_PER_PAGE])
+
+        page, pks = get_page(cursor='last')
+        self.assertEqual(pks, expected[-settings.ITEMS_PER_PAGE:])
+
+        # Cursors can't be tampered with or used with another ordering
+        page, pks = get_page(cursor='bogus')
+        self.assertEqual(pks, expected[:settings.ITEMS_PER_PAGE])
+        next_cursor = get_page()[0].next_cursor
+        page, pks = get_page(cursor=next_cursor, order_by='category')
+        self.assertFalse(page.has_previous)
+
+    def test_pages_are_selected_with_a_row_value_comparison(self):
+        make(Report, _quantity=settings.ITEMS_PER_PAGE + 5, point=ORIGIN)
+        self.client.login(email=self.user.email, password="foo")
+        page = self.client.get(reverse("reports-list")).context['page']
+
+        # Compared as one row value, the keys match the index on
+        # (created_on DESC, report_id DESC)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse("reports-list"), {'cursor': page.next_cursor})
+        fetches = [q['sql'] for q in context.captured_queries if 'ORDER BY' in q['sql']]
+        self.assertTrue(any(
+            '("report"."created_on", "report"."report_id") <' in sql for sql in fetches))
+
+    @override_settings(ITEMS_PER_PAGE=3)
+    def test_pages_of_keyword_search(self):
+        # Reports with the same species have the same (real) rank, and
+        # those with the keyword twice rank higher
+        once = make(Species, name='Foobarius', scientific_name='Aus')
+        twice = make(Species, name='Foobarius foobarius', scientific_name='Bus')
+        reports = (
+            make(Report, _quantity=4, point=ORIGIN, reported_species=once) +
+            make(Report, _quantity=4, point=ORIGIN, reported_species=twice) +
+            make(Report, _quantity=2, point=ORIGIN, reported_species=once, actual_species=twice)
+        )
+        self.client.login(email=self.user.email, password="foo")
+
+        pks = []
+        cursor = None
+        for _ in range(len(reports)):
+            params = {'q': 'foobarius'}
+            if cursor:
+                params['cursor'] = cursor
+            page = self.client.get(reverse("reports-list"), params).context['page']
+            pks.extend(report.pk for report in page)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        self.assertIsNone(cursor)
+        self.assertEqual(sorted(pks), sorted(report.pk for report in reports))
+
+
+class ReportMarkersViewTest(SuppressPostSaveMixin, TestCase, UserMixin):
+
+    def _get(self, **params):
+        params.setdefault('bbox', '-1,-1,1,1')
+        response = self.client.get(reverse('reports-markers'), params)
+        return response, json.loads(response.content.decode())
+
+    def test_only_reports_inside_bbox_are_returned(self):
+        inside = make(Report, point=ORIGIN, is_public=True)
+        make(Report, point=Point(10, 10), is_public=True)
+        response, data = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['type'], 'FeatureCollection')
+        self.assertEqual([feature['id'] for feature in data['features']], [inside.pk])
+        self.assertEqual(data['features'][0]['geometry']['coordinates'], [0, 0])
+
+    def test_anonymous_users_only_see_public_reports(self):
+        public = make(Report, point=ORIGIN, is_public=True)
+        private = make(Report, point=ORIGIN, is_public=False)
+        response, data = self._get()
+        self.assertEqual([feature['id'] for feature in data['features']], [public.pk])
+
+        # Unless they submitted the report
+        session = self.client.session
+        session['report_ids'] = [private.pk]
+        session.save()
+        response, data = self._get()
+        self.assertEqual(
+            sorted(feature['id'] for feature in data['features']), sorted([public.pk, private.pk]))
+
+    def test_search_filters_are_applied(self):
+        user = self.create_user(username='foo@example.com', password='foo', is_active=True)
+        self.client.login(email=user.email, password='foo')
+        claimed = make(Report, point=ORIGIN, claimed_by=user)
+        make(Report, point=ORIGIN, claimed_by=None)
+        response, data = self._get(claimed_by='me')
+        self.assertEqual([feature['id'] for feature in data['features']], [claimed.pk])
+
+    def test_markers_are_paged(self):
+        make(Report, point=ORIGIN, is_public=True, _quantity=3)
+        with self.settings(MAP_MARKERS_PER_PAGE=2):
+            response, data = self._get()
+            self.assertEqual(len(data['features']), 2)
+            self.assertIsNotNone(data['next_cursor'])
+            response, data = self._get(cursor=data['next_cursor'])
+            self.assertEqual(len(data['features']), 1)
+            self.assertIsNone(data['next_cursor'])
+            response, data = self._get(cursor='bogus')
+            self.assertEqual(response.status_code, 400)
+
+    def test_markers_dont_include_popovers(self):
+        report = make(Report, point=ORIGIN, is_public=True)
+        response, data = self._get()
+        self.assertEqual(data['features'][0]['properties']['title'], report.title)
+        self.assertNotIn('content', data['features'][0]['properties'])
+
+        response = self.client.get(reverse('reports-popover', args=[report.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(reverse('reports-detail', args=[report.pk]), response.content.decode())
+
+    def test_popovers_of_private_reports_are_hidden(self):
+        report = make(Report, point=ORIGIN, is_public=False)
+        response = self.client.get(reverse('reports-popover', args=[report.pk]))
+        self.assertEqual(response.status_code, 404)
+
+        # Unless they submitted the report
+        session = self.client.session
+        session['report_ids'] = [report.pk]
+        session.save()
+        response = self.client.get(reverse('reports-popover', args=[report.pk]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_reports_are_clustered_when_zoomed_out(self):
+        make(Report, point=ORIGIN, is_public=True, _quantity=2)
+        make(Report, point=Point(10, 10), is_public=True)
+        response, data = self._get(bbox='-20,-20,20,20', zoom=5)
+        self.assertTrue(data['clustered'])
+        counts = sorted(feature['properties']['count'] for feature in data['features'])
+        self.assertEqual(counts, [1, 2])
+
+        # Only clusters inside the bbox are returned
+        response, data = self._get(bbox='-1,-1,1,1', zoom=5)
+        self.assertEqual([feature['properties']['count'] for feature in data['features']], [2])
+
+        # Cached clusters are invalidated when reports change
+        make(Report, point=ORIGIN, is_public=True)
+        response, data = self._get(bbox='-1,-1,1,1', zoom=5)
+        self.assertEqual([feature['properties']['count'] for feature in data['features']], [3])
+
+    def test_reports_are_not_clustered_when_zoomed_in(self):
+        report = make(Report, point=ORIGIN, is_public=True)
+        response, data = self._get(zoom=settings.MAP_CLUSTER_MAX_ZOOM)
+        self.assertFalse(data['clustered'])
+        self.assertEqual([feature['id'] for feature in data['features']], [report.pk])
+
+    def test_invalid_zoom(self):
+        params = {'bbox': '-1,-1,1,1', 'zoom': 'foo'}
+        response = self.client.get(reverse('reports-markers'), params)
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_bbox(self):
+        response = self.client.get(reverse('reports-markers'), {'bbox': 'foo'})
+        self.assertEqual(response.status_code, 400)
+        for bbox in ('nan,-1,1,1', '-inf,-1,inf,1'):
+            response = self.client.get(reverse('reports-markers'), {'bbox': bbox})
+            self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('reports-markers'))
+        self.assertEqual(response.status_code, 400)
+
+
+class ReportTileViewTest(SuppressPostSaveMixin, TestCase, UserMixin):
+
+    def setUp(self):
+        invalidate_all_tiles()
+
+    def _get(self, z=0, x=0, y=0):
+        return self.client.get(reverse('tiles-reports', args=[z, x, y]))
+
+    def test_anonymous_users_only_get_public_reports(self):
+        make(Report, point=ORIGIN, is_public=False)
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/vnd.mapbox-vector-tile')
+        self.assertEqual(response.content, b'')
+
+        user = self.create_user(username='foo@example.com', password='foo', is_active=True)
+        self.client.login(email=user.email, password='foo')
+        response = self._get()
+        self.assertNotEqual(response.content, b'')
+
+    def test_tiles_are_cached(self):
+        make(Report, point=ORIGIN, is_public=True)
+        response = self._get()
+        key = tile_cache_key('public', 0, 0, 0)
+        self.assertEqual(get_tile_cache().get(key), response.content)
+
+    def test_only_affected_tiles_are_invalidated(self):
+        # At zoom level 1, this is in the northwest tile
+        report = make(Report, point=Point(-120, 45), is_public=True)
+        tile_cache = get_tile_cache()
+        affected = tile_cache_key('public', 1, 0, 0)
+        unaffected = tile_cache_key('public', 1, 1, 1)
+        tile_cache.set_many({affected: b'affected', unaffected: b'unaffected'})
+
+        # Changes that don't affect tiles are ignored
+        report = Report.objects.get(pk=report.pk)
+        report.description = 'Changed'
+        report.save()
+        self.assertIsNotNone(tile_cache.get(affected))
+
+        # Moving a report invalidates the tiles at both locations
+        report.point = Point(-100, 40)
+        report.save()
+        self.assertIsNone(tile_cache.get(affected))
+        self.assertIsNotNone(tile_cache.get(unaffected))
+
+        tile_cache.set(affected, b'affected')
+        report.is_public = False
+        report.save()
+        self.assertIsNone(tile_cache.get(affected))
+
+    def test_changing_categories_invalidates_all_tiles(self):
+        category = make(Category)
+        make(Report, point=ORIGIN, is_public=True, reported_category=category)
+        get_tile_cache().set(tile_cache_key('public', 0, 0, 0), b'stale')
+        self.assertEqual(self._get().content, b'stale')
+
+        category.name = 'Changed'
+        category.save()
+        self.assertNotEqual(self._get().content, b'stale')
+
+    def test_tile_out_of_range(self):
+        self.assertEqual(self._get(z=1, x=2, y=0).status_code, 404)
+        self.assertEqual(self._get(z=settings.REPORT_TILES_MAX_ZOOM + 1).status_code, 404)
+
 
 class UnclaimViewTest(TestCase, UserMixin):
 
@@ -982,21 +1537,214 @@ class UnclaimViewTest(TestCase, UserMixin):
         self.assertEqual(None, report.claimed_by)
 
 
+class PermissionsMemoTest(TestCase, UserMixin):
+
+    def setUp(self):
+        self.report = make(Report, point=ORIGIN)
+        self.invitee = self.create_user(username="invitee@example.com", is_active=False)
+        make(Invite, report=self.report, user=self.invitee)
+
+    def test_results_are_memoized_within_scope(self):
+        with memoized():
+            with self.assertNumQueries(1):
+                self.assertTrue(can_view_private_report(self.invitee, self.report))
+                self.assertTrue(can_view_private_report(self.invitee, self.report))
+
+        # Outside of a memoized scope, the invite is checked every time
+        with self.assertNumQueries(2):
+            can_view_private_report(self.invitee, self.report)
+            can_view_private_report(self.invitee, self.report)
+
+    def test_changes_invalidate_memoized_results(self):
+        with memoized():
+            self.assertTrue(can_view_private_report(self.invitee, self.report))
+            Invite.objects.filter(user=self.invitee).delete()
+            self.assertFalse(can_view_private_report(self.invitee, self.report))
+
+
+class ResolveReportCountiesCommandTest(TestCase):
+
+    def setUp(self):
+        square = Polygon(((-1, -1), (-1, 1), (1, 1), (1, -1), (-1, -1)), srid=4326)
+        self.county = County.objects.create(
+            name='Origin', state='Oregon', the_geom=MultiPolygon(square, srid=4326))
+        self.reports = make(Report, point=ORIGIN, county=None, _quantity=3)
+        self.outside = make(Report, point=Point(5, 5, srid=4326), county=self.county)
+        rebuild = patch(
+            'oregoninvasiveshotline.reports.management.commands.resolve_report_counties.'
+            'rebuild_home_snapshot')
+        self.rebuild_home_snapshot = rebuild.start()
+        self.addCleanup(rebuild.stop)
+
+    def test_dry_run_doesnt_change_reports(self):
+        out = io.StringIO()
+        call_command('resolve_report_counties', dry_run=True, stdout=out)
+        self.assertIn('4 reports would change', out.getvalue())
+        resolved = Report.objects.filter(county__isnull=False).exclude(pk=self.outside.pk)
+        self.assertFalse(resolved.exists())
+        self.assertFalse(self.rebuild_home_snapshot.delay.called)
+
+    def test_counties_are_resolved(self):
+        call_command('resolve_report_counties', batch_size=2, stdout=io.StringIO())
+        for report in self.reports:
+            report.refresh_from_db()
+            self.assertEqual(report.county, self.county)
+        self.outside.refresh_from_db()
+        self.assertIsNone(self.outside.county)
+        self.rebuild_home_snapshot.delay.assert_called_once_with()
+
+    def test_missing_only(self):
+        call_command('resolve_report_counties', missing_only=True, stdout=io.StringIO())
+        self.assertEqual(Report.objects.filter(county=self.county).count(), 4)
+
+
 class ExportTest(TestCase):
 
     def test_csv(self):
         reports = make(Report, _quantity=3, point=ORIGIN)
-        response = _export(reports, format="csv")
+        response = _export(Report.objects.order_by('pk'), format="csv")
         reader = csv.DictReader(codecs.iterdecode(response, "utf8"))
         rows = list(reader)
         self.assertEqual(3, len(rows))
         self.assertEqual(rows[2]['Description'], reports[2].description)
 
+    def test_csv_columns_match_report_attributes(self):
+        species = make(Species, name='Foo', scientific_name='Foobar')
+        claimed_by = make(User, first_name='Claimer', last_name='Person')
+        report = make(Report, point=Point(-122, 45), actual_species=species, claimed_by=claimed_by)
+        unclaimed = make(Report, point=ORIGIN, actual_species=None, reported_species=None)
+
+        with self.assertNumQueries(1):
+            response = _export(Report.objects.order_by('pk'), format="csv")
+            rows = list(csv.DictReader(codecs.iterdecode(response, "utf8")))
+
+        self.assertEqual(rows[0]['Report ID'], str(report.pk))
+        self.assertEqual(rows[0]['Category'], str(report.category))
+        self.assertEqual(rows[0]['Common Name'], 'Foo')
+        self.assertEqual(rows[0]['Scientific Name'], 'Foobar')
+        self.assertEqual(rows[0]['Species Confirmed'], 'True')
+        self.assertEqual(rows[0]['Reported By'], str(report.created_by))
+        self.assertEqual(rows[0]['OFPD Trained'], str(report.created_by.has_completed_ofpd))
+        self.assertEqual(rows[0]['Reported On'], str(report.created_on))
+        self.assertEqual(rows[0]['Claimed By'], 'Claimer Person')
+        self.assertEqual(rows[0]['Latitude'], '45.0')
+        self.assertEqual(rows[0]['Longitude'], '-122.0')
+
+        self.assertEqual(rows[1]['Report ID'], str(unclaimed.pk))
+        self.assertEqual(rows[1]['Category'], str(unclaimed.category))
+        self.assertEqual(rows[1]['Common Name'], '')
+        self.assertEqual(rows[1]['Species Confirmed'], 'False')
+        self.assertEqual(rows[1]['Claimed By'], 'None')
+
     def test_kml(self):
         reports = make(Report, _quantity=3, point=ORIGIN)
-        response = _export(reports, format="kml")
+        response = _export(Report.objects.all(), format="kml")
+        self.assertEqual(response['Content-Type'], 'application/vnd.google-earth.kml+xml')
         # this is harder to test without trying to parse the XML
-        self.assertIn(reports[0].description, response.content.decode())
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn(reports[0].description, content)
+        self.assertEqual(content.count('<Placemark>'), 3)
+
+    def test_kmz(self):
+        reports = make(Report, _quantity=3, point=ORIGIN)
+        response = _export(Report.objects.all(), format="kmz")
+        self.assertEqual(response['Content-Type'], 'application/vnd.google-earth.kmz')
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        content = archive.read('doc.kml').decode()
+        self.assertIn(reports[0].description, content)
+
+
+class ExportJobTest(SuppressPostSaveMixin, TestCase, UserMixin):
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(username='foo@example.com', password='foo', is_active=True)
+        self.client.login(email=self.user.email, password='foo')
+
+    def test_large_export_is_run_in_the_background(self):
+        make(Report, _quantity=3, point=ORIGIN)
+        with self.settings(EXPORT_BACKGROUND_THRESHOLD=2):
+            response = self.client.get(reverse('reports-list'), {'export': 'csv', 'q': ''})
+        job = ExportJob.objects.get()
+        self.assertRedirects(response, reverse('reports-export-job', args=[job.pk]))
+        self.assertEqual(job.status, ExportJob.PENDING)
+        self.assertEqual(job.created_by, self.user)
+        self.assertEqual(job.format, 'csv')
+        self.assertNotIn('export', job.query)
+
+    def test_small_export_is_streamed(self):
+        make(Report, _quantity=3, point=ORIGIN)
+        response = self.client.get(reverse('reports-list'), {'export': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertFalse(ExportJob.objects.exists())
+
+    def test_identical_export_reuses_job(self):
+        make(Report, _quantity=3, point=ORIGIN)
+        with self.settings(EXPORT_BACKGROUND_THRESHOLD=2):
+            self.client.get(reverse('reports-list'), {'export': 'csv', 'q': 'foo'})
+            self.client.get(reverse('reports-list'), {'export': 'csv', 'q': 'foo'})
+            self.assertEqual(ExportJob.objects.count(), 1)
+            self.client.get(reverse('reports-list'), {'export': 'kml', 'q': 'foo'})
+            self.client.get(reverse('reports-list'), {'export': 'csv', 'q': 'bar'})
+            self.assertEqual(ExportJob.objects.count(), 3)
+
+    def test_export_job_is_not_reused_after_window(self):
+        make(Report, _quantity=3, point=ORIGIN)
+        with self.settings(EXPORT_BACKGROUND_THRESHOLD=2):
+            self.client.get(reverse('reports-list'), {'export': 'csv'})
+            ExportJob.objects.update(created_on=timezone.now() - timedelta(days=1))
+            self.client.get(reverse('reports-list'), {'export': 'csv'})
+        self.assertEqual(ExportJob.objects.count(), 2)
+
+    def test_stalled_export_job_is_not_reused(self):
+        make(Report, _quantity=3, point=ORIGIN)
+        with self.settings(EXPORT_BACKGROUND_THRESHOLD=2):
+            self.client.get(reverse('reports-list'), {'export': 'csv'})
+            stalled_on = timezone.now() - timedelta(seconds=settings.EXPORT_JOB_STALL_TIMEOUT + 1)
+            ExportJob.objects.update(status=ExportJob.RUNNING, updated_on=stalled_on)
+            self.client.get(reverse('reports-list'), {'export': 'csv'})
+        self.assertEqual(ExportJob.objects.count(), 2)
+
+        clean_export_jobs()
+        statuses = ExportJob.objects.order_by('pk').values_list('status', flat=True)
+        self.assertEqual(list(statuses), [ExportJob.FAILED, ExportJob.PENDING])
+
+    def test_run_export_job(self):
+        reports = make(Report, _quantity=3, point=ORIGIN)
+        job = make(ExportJob, created_by=self.user, format='csv', query='')
+        run_export_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.COMPLETE)
+        self.assertEqual(job.total, 3)
+        self.assertEqual(job.processed, 3)
+        self.assertEqual(job.percent_complete, 100)
+        self.assertIsNotNone(job.completed_on)
+        with job.file.open('rb') as fp:
+            rows = list(csv.DictReader(codecs.iterdecode(fp, 'utf8')))
+        self.assertEqual(
+            {row['Report ID'] for row in rows}, {str(report.pk) for report in reports})
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(reverse('reports-export-job-download', args=[job.pk]), mail.outbox[0].body)
+
+        response = self.client.get(reverse('reports-export-job-download', args=[job.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment; filename="reports.csv"', response['Content-Disposition'])
+
+    def test_download_is_not_found_until_complete(self):
+        job = make(ExportJob, created_by=self.user, format='csv', query='')
+        response = self.client.get(reverse('reports-export-job', args=[job.pk]))
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(reverse('reports-export-job-download', args=[job.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_export_job_is_only_visible_to_its_creator(self):
+        job = make(ExportJob, created_by=make(User, is_active=True), format='csv', query='')
+        response = self.client.get(reverse('reports-export-job', args=[job.pk]))
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get(reverse('reports-export-job-download', args=[job.pk]))
+        self.assertEqual(response.status_code, 403)
 
 
 class DeleteViewTest(TestCase, UserMixin):
@@ -1012,7 +1760,8 @@ class DeleteViewTest(TestCase, UserMixin):
     def test_permissions(self):
         report = make(Report, point=ORIGIN)
         response = self.client.get(reverse("reports-delete", args=[report.pk]))
-        self.assertRedirects(response, reverse("login") + "?next=" + reverse("reports-delete", args=[report.pk]))
+        self.assertRedirects(
+            response, reverse("login") + "?next=" + reverse("reports-delete", args=[report.pk]))
 
         self.client.login(email=self.user.email, password="foo")
         self.user.is_active = False
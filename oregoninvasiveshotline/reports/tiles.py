@@ -0,0 +1,131 @@
+"""Mapbox Vector Tiles for the reports layer.
+
+Tiles are rendered by PostGIS and stored in the ``tiles`` cache, keyed
+by z/x/y and the class of user they were rendered for. When a report
+changes in a way that affects the layer, only the tiles containing its
+old and new locations are removed from the cache. When every tile is
+affected, the version that's part of each key is bumped instead (see
+:func:`oregoninvasiveshotline.utils.cache.get_version`) so that the
+cache doesn't have to be cleared while handling the request; the old
+tiles are left to be evicted or to expire (see ``TIMEOUT`` in the
+``tiles`` cache's settings).
+
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import CharField, F, Func, Value
+from django.db.models.functions import Coalesce, Concat, Lower, NullIf
+
+from oregoninvasiveshotline.utils.cache import bump_version, get_version
+from oregoninvasiveshotline.utils.geo import tile_bbox, tile_bounds, tiles_for_point
+
+
+# Tile geometry is quantized to this many units per side
+TILE_EXTENT = 4096
+
+# Points this many units outside a tile are included so that icons
+# near the edges aren't clipped
+TILE_BUFFER = 256
+
+TILE_MARGIN = TILE_BUFFER / TILE_EXTENT
+
+VISIBILITY_CLASSES = ('manager', 'public')
+
+
+TILE_SQL = """
+    SELECT ST_AsMVT(tile, 'reports', %s, 'geom')
+    FROM (
+        SELECT
+            ST_AsMVTGeom(
+                ST_Transform(reports.point, 3857),
+                ST_MakeEnvelope(%s, %s, %s, %s, 3857),
+                %s,
+                %s
+            ) AS geom,
+            reports.id,
+            reports.category,
+            reports.color,
+            reports.icon,
+            reports.archived
+        FROM ({reports}) AS reports
+    ) AS tile
+"""
+
+
+def get_tile_cache():
+    return caches['tiles']
+
+
+def tile_cache_key(visibility, z, x, y, version=None):
+    if version is None:
+        version = get_version('report-tiles', alias='tiles')
+    return 'reports:{version}:{visibility}:{z}:{x}:{y}'.format(
+        version=version, visibility=visibility, z=z, x=x, y=y)
+
+
+def get_tile_attributes(reports):
+    """Annotate ``reports`` with the attributes carried by tiles.
+
+    The category and severity color are the ones used for the report's
+    icon, and the icon key is the icon's file name as produced by
+    :func:`oregoninvasiveshotline.reports.utils.icon_file_name`.
+
+    """
+    category_icon = F('effective_category__icon')
+    color = Coalesce('effective_severity__color', Value(settings.ICON_DEFAULT_COLOR))
+    # {base name of category icon w/o extension}-{color}.{type}
+    icon_name = Func(
+        category_icon, Value(r'^.*/|\.[^.]*$'), Value(''), Value('g'),
+        function='regexp_replace', output_field=CharField())
+    color_name = Lower(Func(color, Value('#'), function='ltrim', output_field=CharField()))
+    icon_key = Func(
+        Value('-'), NullIf(icon_name, Value('')), color_name,
+        function='concat_ws', output_field=CharField())
+
+    return reports.values(
+        'point',
+        id=F('report_id'),
+        category=F('effective_category_name'),
+        color=color,
+        icon=Concat(icon_key, Value('.' + settings.ICON_TYPE)),
+        archived=F('is_archived'),
+    )
+
+
+def render_tile(reports, z, x, y):
+    """Render the ``z``/``x``/``y`` tile for ``reports``.
+
+    Returns the tile as bytes; tiles without any reports are empty.
+
+    """
+    reports = reports.order_by().filter(point__intersects=tile_bbox(z, x, y, TILE_MARGIN))
+    sql, params = get_tile_attributes(reports).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(TILE_SQL.format(reports=sql), [
+            TILE_EXTENT,
+            *tile_bounds(z, x, y),
+            TILE_EXTENT,
+            TILE_BUFFER,
+            *params,
+        ])
+        tile, = cursor.fetchone()
+    return bytes(tile or b'')
+
+
+def invalidate_tiles(points):
+    """Remove the cached tiles containing any of the ``points``."""
+    zoom_levels = range(settings.REPORT_TILES_MAX_ZOOM + 1)
+    version = get_version('report-tiles', alias='tiles')
+    keys = {
+        tile_cache_key(visibility, z, x, y, version)
+        for point in points if point is not None
+        for z, x, y in tiles_for_point(point, zoom_levels, TILE_MARGIN)
+        for visibility in VISIBILITY_CLASSES
+    }
+    get_tile_cache().delete_many(keys)
+
+
+def invalidate_all_tiles():
+    """Orphan all of the cached tiles."""
+    bump_version('report-tiles', alias='tiles')
@@ -4,6 +4,9 @@ import os
 from itertools import product
 
 from django.conf import settings
+from django.contrib.gis.db.models import Collect, Extent
+from django.contrib.gis.db.models.functions import Centroid, SnapToGrid
+from django.db.models import Count
 
 from PIL import Image, ImageDraw, ImageFilter
 
@@ -22,7 +25,7 @@ def generate_icon(output_path,
                   icon_offset=(0, -10),
                   transparent=(0, 0, 0, 0),
                   outline_color=(10, 10, 10, 255)):
-    """Generate a map-style icon.
+    r"""Generate a map-style icon.
 
     The icons generated by this function are shown on the map to
     indicate report locations, in report lists for reports that don't
@@ -158,18 +161,18 @@ def generate_icons(force=False):
 
     inner_icon_paths = (
         Category.objects
-            .filter(icon__isnull=False)
-            .order_by('icon')
-            .distinct()
-            .values_list('icon', flat=True)
+        .filter(icon__isnull=False)
+        .order_by('icon')
+        .distinct()
+        .values_list('icon', flat=True)
     )
     inner_icon_paths = (os.path.join(media_root, p) for p in inner_icon_paths)
 
     colors = (
         Severity.objects
-            .order_by('color')
-            .distinct()
-            .values_list('color', flat=True)
+        .order_by('color')
+        .distinct()
+        .values_list('color', flat=True)
     )
 
     # Icons for all (category icon, severity color) pairs
@@ -204,3 +207,36 @@ def clean_icons():
         else:
             removed_icons.append(icon_path)
     return removed_icons
+
+
+def cluster_cell_size(zoom):
+    """Get the size, in degrees, of the cluster grid cells for ``zoom``.
+
+    Cells are ``MAP_CLUSTER_CELL_SIZE`` pixels wide on a web map at the
+    given zoom level (where the world is 256 * 2^zoom pixels wide).
+
+    """
+    return 360 * settings.MAP_CLUSTER_CELL_SIZE / (256 * 2 ** zoom)
+
+
+def cluster_reports(reports, zoom):
+    """Group ``reports`` into grid cells for a map ``zoom`` level.
+
+    The grouping is done in the database by snapping each report's
+    point to a grid. A list of clusters is returned, each with the
+    number of reports in the cell, the centroid of those reports, and
+    their extent as ``(west, south, east, north)``.
+
+    """
+    cells = reports.order_by().annotate(cell=SnapToGrid('point', cluster_cell_size(zoom)))
+    cells = cells.values('cell').annotate(
+        count=Count('pk'), center=Centroid(Collect('point')), extent=Extent('point'))
+    return [
+        {
+            'count': cell['count'],
+            'lng': cell['center'].x,
+            'lat': cell['center'].y,
+            'bbox': list(cell['extent']),
+        }
+        for cell in cells
+    ]
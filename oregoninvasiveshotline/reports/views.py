@@ -1,37 +1,80 @@
 from collections import OrderedDict
+import datetime
 import functools
+import hashlib
 import itertools
 import posixpath
-import csv
 
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.urls import reverse
-from django.db.models import Q
-from django.http import HttpResponse
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, QueryDict,
+    StreamingHttpResponse)
 from django.shortcuts import get_object_or_404, redirect, render
-from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
 
+from oregoninvasiveshotline.utils.cache import (
+    REFERENCE_DATA_NAMESPACE, REPORT_LIST_NAMESPACE, get_version, make_key)
+from oregoninvasiveshotline.utils.http import has_pending_messages, make_etag
 from oregoninvasiveshotline.utils.urls import safe_redirect
 from oregoninvasiveshotline.utils.db import will_be_deleted_with
+from oregoninvasiveshotline.utils.geo import parse_bbox
+from oregoninvasiveshotline.utils.pagination import CursorPaginator, InvalidCursor, estimate_count
 from oregoninvasiveshotline.comments.forms import CommentForm
 from oregoninvasiveshotline.comments.models import Comment
 from oregoninvasiveshotline.comments.perms import can_create_comment
 from oregoninvasiveshotline.images.forms import get_image_formset
 from oregoninvasiveshotline.images.models import Image
-from oregoninvasiveshotline.species.models import Category, Severity, category_id_to_species_id_json
+from oregoninvasiveshotline.species.models import (
+    Category, Severity, category_id_to_species_id_json)
 from oregoninvasiveshotline.users.utils import get_tab_counts
 
+from .exports import generate_csv, generate_kml, generate_kmz
 from .forms import InviteForm, ManagementForm, ReportForm, ReportSearchForm
-from .models import Invite, Report
-from .perms import can_manage_report, can_view_private_report, can_claim_report, permissions
-from .serializers import ReportSerializer
-from .utils import icon_file_name
+from .models import ExportJob, Invite, Report, prefetch_image_urls, stalled_export_jobs
+from .perms import (
+    can_manage_report, can_view_private_report, can_claim_report, is_invited, permissions)
+from .serializers import ReportListSerializer, ReportMarkerSerializer, ReportSerializer
+from .tasks import run_export_job
+from . import tiles
+from .utils import cluster_reports, icon_file_name
 
 
+def _list_etag(request):
+    """Get an ETag for the reports list.
+
+    The list changes when any report is added, changed, or deleted (or
+    anything shown with one changes; see :func:`.models.mark_reports_updated`),
+    when anyone's tab counts change, and when the species, categories,
+    or counties offered by the search form change. All of these bump
+    the version of ``REPORT_LIST_NAMESPACE``, so checking the ETag
+    doesn't take any queries.
+
+    The list has no forms that are posted, so unlike the detail page,
+    it doesn't depend on the CSRF token.
+
+    """
+    if 'export' in request.GET or has_pending_messages(request):
+        return None
+    user = request.user
+    return make_etag(
+        get_version(REPORT_LIST_NAMESPACE),
+        user.pk,
+        user.is_active,
+        user.is_staff,
+        sorted(request.session.get('report_ids', [])),
+    )
+
+
+@condition(etag_func=_list_etag)
 def list_(request):
     params = request.GET
     user = request.user
@@ -45,19 +88,24 @@ def list_(request):
     # Handle the case where they want to export the reports
     # XXX: Why isn't this a separate view?
     export_format = params.get('export')
-    if user.is_active and export_format in ('kml', 'csv'):
+    if user.is_active and export_format in ('kml', 'kmz', 'csv'):
+        if _count_reports(request, form, reports) > settings.EXPORT_BACKGROUND_THRESHOLD:
+            job = _start_export_job(request, form, export_format)
+            return redirect(job.get_absolute_url())
         return _export(reports=reports, format=export_format)
 
-    # Paginate the results
-    paginator = Paginator(reports, settings.ITEMS_PER_PAGE)
-    active_page = request.GET.get('page')
-
+    # Paginate the results. Keyset pagination is used so that deep
+    # pages cost the same as the first one.
+    reports = reports.select_related(*ReportListSerializer.related_fields)
+    count = functools.partial(_count_reports, request, form, reports)
+    paginator = CursorPaginator(reports, settings.ITEMS_PER_PAGE, count=count)
     try:
-        page = paginator.page(active_page)
-    except PageNotAnInteger:
-        page = paginator.page(1)
-    except EmptyPage:
-        page = paginator.page(paginator.num_pages)
+        page = paginator.page(params.get('cursor'))
+    except InvalidCursor:
+        page = paginator.page()
+    if not page.object_list and params.get('cursor'):
+        # The reports around the cursor are gone; start over
+        page = paginator.page()
 
     # Serialize and render report data to JSON
     serializer = ReportSerializer(page.object_list, many=True)
@@ -70,7 +118,9 @@ def list_(request):
     tab_context = get_tab_counts(user, report_ids)
 
     subscription_url = reverse('notifications-create')
-    subscription_params = request.GET.urlencode()
+    subscription_params = request.GET.copy()
+    subscription_params.pop('cursor', None)
+    subscription_params = subscription_params.urlencode()
     if subscription_params:
         subscription_url = '?'.join((subscription_url, subscription_params))
     else:
@@ -88,6 +138,202 @@ def list_(request):
     return render(request, template, context)
 
 
+def markers(request):
+    """Get GeoJSON markers for the reports inside a bounding box.
+
+    The ``bbox`` parameter specifies the visible extent of the map as
+    ``west,south,east,north``. The rest of the query string is handled
+    the same way as in :func:`list_`, so markers match the filters and
+    permissions of the report list.
+
+    Markers are returned newest first, ``MAP_MARKERS_PER_PAGE`` at a
+    time. When there are more, ``next_cursor`` will be set to the value
+    to pass as the ``cursor`` parameter to get them. Markers only carry
+    what's needed to draw them; their popovers are loaded separately
+    (see :func:`popover`).
+
+    When the map's ``zoom`` level is passed and it's below
+    ``MAP_CLUSTER_MAX_ZOOM``, clusters of reports are returned instead
+    of individual reports (see :func:`_marker_clusters`).
+
+    """
+    params = request.GET
+    user = request.user
+    report_ids = request.session.get('report_ids', [])
+
+    try:
+        bbox = parse_bbox(params.get('bbox'))
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    zoom = params.get('zoom')
+    if zoom is not None:
+        try:
+            zoom = int(zoom)
+            if not 0 <= zoom <= 22:
+                raise ValueError
+        except ValueError:
+            return HttpResponseBadRequest('Invalid zoom level: {0!r}'.format(zoom))
+
+    form = ReportSearchForm(params, user=user, report_ids=report_ids)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    if zoom is not None and zoom < settings.MAP_CLUSTER_MAX_ZOOM:
+        return _marker_clusters(request, form, bbox, zoom)
+
+    # The intersects lookup is satisfied by the spatial index on point
+    reports = form.search(Report.objects.all())
+    reports = reports.filter(point__intersects=bbox).order_by('-created_on')
+    reports = reports.select_related(*ReportMarkerSerializer.related_fields)
+    paginator = CursorPaginator(reports, settings.MAP_MARKERS_PER_PAGE)
+    try:
+        page = paginator.page(params.get('cursor'))
+    except InvalidCursor:
+        return HttpResponseBadRequest('Invalid cursor')
+
+    features = []
+    for report in ReportMarkerSerializer(page.object_list, many=True).data:
+        lat, lng = report.pop('lat'), report.pop('lng')
+        features.append({
+            'type': 'Feature',
+            'id': report['pk'],
+            'geometry': {'type': 'Point', 'coordinates': [lng, lat]},
+            'properties': report,
+        })
+
+    return JsonResponse({
+        'type': 'FeatureCollection',
+        'features': features,
+        'clustered': False,
+        'next_cursor': page.next_cursor,
+    }, content_type='application/geo+json')
+
+
+def popover(request, report_id):
+    """Get the HTML for the popover of a report's map marker."""
+    reports = Report.objects.select_related(*ReportListSerializer.related_fields)
+    report = get_object_or_404(reports, pk=report_id)
+    if not (report.is_public or
+            report.pk in request.session.get('report_ids', []) or
+            can_view_private_report(request.user, report)):
+        raise Http404('No such report: {0}'.format(report_id))
+    prefetch_image_urls([report])
+    return render(request, 'reports/_popover.html', {
+        'report': report,
+        'image_url': report.image_url,
+    })
+
+
+def _search_cache_parts(request, form):
+    """Get the parts of a cache key for a report search.
+
+    The key has to cover the search parameters and who's searching,
+    since the results depend on the user's permissions and, for some
+    filters, on the user.
+
+    """
+    params = sorted(
+        (name, value) for name, values in request.GET.lists() for value in values
+        if name not in ('bbox', 'cursor', 'export', 'page', 'tabs', 'zoom'))
+    if form.user.is_active:
+        # Some filters (claimed by me, etc) depend on the user
+        audience = ('user', form.user.pk)
+    else:
+        audience = ('public', sorted(form.report_ids))
+    return audience, params
+
+
+def _count_reports(request, form, reports):
+    """Get the (approximate) number of reports in a search.
+
+    Counts are cached until reports change so that paging through a
+    search doesn't count the results over and over.
+
+    """
+    key = make_key('report-counts', *_search_cache_parts(request, form))
+    count = cache.get(key)
+    if count is None:
+        count = estimate_count(reports)
+        cache.set(key, count, settings.REPORT_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def _marker_clusters(request, form, bbox, zoom):
+    """Get GeoJSON clusters of the reports matching ``form``.
+
+    Clusters for all of the matching reports are computed at once and
+    cached, so panning around the map at the same zoom level only has
+    to pick out the clusters inside the new ``bbox``. The cache is
+    invalidated whenever reports change.
+
+    """
+    key = make_key('report-clusters', zoom, *_search_cache_parts(request, form))
+
+    clusters = cache.get(key)
+    if clusters is None:
+        clusters = cluster_reports(form.search(Report.objects.all()), zoom)
+        cache.set(key, clusters, settings.MAP_CLUSTER_CACHE_TIMEOUT)
+
+    west, south, east, north = bbox.extent
+    features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [cluster['lng'], cluster['lat']]},
+            'properties': {'count': cluster['count'], 'bbox': cluster['bbox']},
+        }
+        for cluster in clusters
+        if west <= cluster['lng'] <= east and south <= cluster['lat'] <= north
+    ]
+
+    return JsonResponse({
+        'type': 'FeatureCollection',
+        'features': features,
+        'clustered': True,
+        'cluster_max_zoom': settings.MAP_CLUSTER_MAX_ZOOM,
+        'next_cursor': None,
+    }, content_type='application/geo+json')
+
+
+def tile(request, z, x, y):
+    """Get a Mapbox Vector Tile for the reports layer.
+
+    Tiles contain a point for every report the user can see (the same
+    visibility rules are applied as in :class:`ReportSearchForm`); the
+    search filters aren't applied. Each point carries the report's ID,
+    category, severity color, icon key, and whether it's archived.
+
+    Tiles are cached separately for managers and for the public. Tiles
+    for anonymous users who submitted non-public reports in the current
+    session are rendered on demand.
+
+    """
+    z, x, y = int(z), int(x), int(y)
+    if z > settings.REPORT_TILES_MAX_ZOOM or x >= 2 ** z or y >= 2 ** z:
+        raise Http404('No such tile: {z}/{x}/{y}'.format(z=z, x=x, y=y))
+
+    user = request.user
+    report_ids = request.session.get('report_ids', [])
+    visibility = 'manager' if user.is_active else 'public'
+    cacheable = user.is_active or not report_ids
+
+    tile_cache = tiles.get_tile_cache()
+    key = tiles.tile_cache_key(visibility, z, x, y)
+    data = tile_cache.get(key) if cacheable else None
+    if data is None:
+        form = ReportSearchForm(QueryDict(), user=user, report_ids=report_ids)
+        data = tiles.render_tile(form.search(Report.objects.all()), z, x, y)
+        if cacheable:
+            tile_cache.set(key, data)
+
+    response = HttpResponse(data, content_type='application/vnd.mapbox-vector-tile')
+    if visibility == 'public' and cacheable:
+        patch_cache_control(response, public=True, max_age=settings.REPORT_TILES_MAX_AGE)
+    else:
+        patch_cache_control(response, private=True, max_age=settings.REPORT_TILES_MAX_AGE)
+    return response
+
+
 def help(request):
     categories = OrderedDict()
     base_icon_url = posixpath.join(settings.MEDIA_URL, settings.ICON_DIR)
@@ -106,40 +352,19 @@ def help(request):
 
 def _export(reports, format):
     """
-    Returns an HttpResponse containing all the reports in the specified format
+    Returns a response containing all the reports in the specified format
+
+    Exports are streamed from a single query, so reports of any number
+    can be exported.
     """
     if format == "csv":
-        response = HttpResponse("", content_type="text/csv")
-        # maps a field name, to a function that gets the data for the field,
-        # given a Report object
-        fields = OrderedDict([
-            ("Report ID", lambda report: report.pk),
-            ("Category", lambda report: str(report.category)),
-            ("Common Name", lambda report: report.species.name if report.species else ""),
-            ("Scientific Name", lambda report: report.species.scientific_name if report.species else ""),
-            ("Species Confirmed", lambda report: bool(report.actual_species)),
-            ("Reported By", lambda report: str(report.created_by)),
-            ("OFPD Trained", lambda report: str(report.created_by.has_completed_ofpd)),
-            ("Reported On", lambda report: str(report.created_on)),
-            ("Claimed By", lambda report: str(report.claimed_by)),
-            ("Description", lambda report: report.description),
-            ("Latitude", lambda report: report.point.y),
-            ("Longitude", lambda report: report.point.x),
-            ("EDRR Status", lambda report: report.edrr_status),
-            ("Is Public", lambda report: report.is_public),
-            ("Is Archived", lambda report: report.is_archived),
-        ])
-        writer = csv.DictWriter(response, fields.keys())
-        writer.writeheader()
-        for report in reports:
-            row = {}
-            for key, accessor in fields.items():
-                row[key] = accessor(report)
-            writer.writerow(row)
+        response = StreamingHttpResponse(generate_csv(reports), content_type="text/csv")
     elif format == "kml":
-        response = HttpResponse(render_to_string("reports/export.kml", {
-            "reports": reports
-        }), content_type="text/csv")
+        response = StreamingHttpResponse(
+            generate_kml(reports), content_type="application/vnd.google-earth.kml+xml")
+    elif format == "kmz":
+        response = StreamingHttpResponse(
+            generate_kmz(reports), content_type="application/vnd.google-earth.kmz")
     else:
         raise ValueError("%s in not a valid format" % format)
 
@@ -147,6 +372,55 @@ def _export(reports, format):
     return response
 
 
+def _start_export_job(request, form, format):
+    """Start exporting the reports matching ``form`` in the background.
+
+    If the same export (same format, filters and user) was started
+    within the last ``EXPORT_JOB_REUSE_WINDOW`` seconds, its job is
+    returned instead of starting another one, unless it failed or has
+    stalled.
+
+    """
+    parts = (format,) + _search_cache_parts(request, form)
+    signature = hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+    since = timezone.now() - datetime.timedelta(seconds=settings.EXPORT_JOB_REUSE_WINDOW)
+    job = (
+        ExportJob.objects
+        .filter(signature=signature, created_by=request.user, created_on__gte=since)
+        .exclude(status=ExportJob.FAILED)
+        .exclude(pk__in=stalled_export_jobs().values('pk'))
+        .first()
+    )
+    if job is None:
+        query = request.GET.copy()
+        query.pop('export', None)
+        job = ExportJob.objects.create(
+            created_by=request.user,
+            format=format,
+            query=query.urlencode(),
+            signature=signature,
+        )
+        transaction.on_commit(lambda: run_export_job.delay(job.pk))
+    return job
+
+
+@permissions.can_view_export_job
+def export_job(request, export_job_id):
+    """Show the progress of an export job and link to its file."""
+    job = permissions.get_instance(request, ExportJob, pk=export_job_id)
+    return render(request, 'reports/export_job.html', {
+        'job': job,
+    })
+
+
+@permissions.can_view_export_job
+def export_job_download(request, export_job_id):
+    job = permissions.get_instance(request, ExportJob, pk=export_job_id)
+    if job.status != ExportJob.COMPLETE or not job.file:
+        raise Http404('This export is not ready')
+    return FileResponse(job.file.open('rb'), as_attachment=True, filename=job.file_name)
+
+
 def create(request):
     """
     Render the public form for submitting reports
@@ -180,6 +454,88 @@ def create(request):
     })
 
 
+def _detail_etag(request, report_id):
+    """Get an ETag for a report's detail page.
+
+    This depends on when the report (or anything shown with it) was
+    last updated and on who's looking at it. Managers are also shown
+    forms listing species, etc, so their pages change with those.
+
+    The page's forms are posted with a CSRF token made from the secret
+    in the user's CSRF cookie, so a cached page can only be reused while
+    the cookie stays the same.
+
+    """
+    if has_pending_messages(request):
+        return None
+    updated_on = Report.objects.filter(pk=report_id).values_list('updated_on', flat=True).first()
+    if updated_on is None:
+        return None
+    user = request.user
+    parts = [
+        updated_on,
+        user.pk,
+        user.is_active,
+        user.is_staff,
+        int(report_id) in request.session.get('report_ids', []),
+        request.META.get('CSRF_COOKIE'),
+    ]
+    if user.is_active:
+        parts.append(get_version(REFERENCE_DATA_NAMESPACE))
+    return make_etag(*parts)
+
+
+# Related rows loaded along with a report for its detail page
+DETAIL_RELATED_FIELDS = (
+    'actual_species__category',
+    'actual_species__severity',
+    'claimed_by',
+    'county',
+    'created_by',
+    'reported_category',
+    'reported_species__severity',
+)
+
+
+def _load_report(report_id):
+    """Load a report for its detail page.
+
+    The report is loaded with the rows shown with it (see
+    ``DETAIL_RELATED_FIELDS``) in one query, and its invites, with the
+    invited users, in another; they're stored in the report's
+    ``invites`` attribute, which permission checks use to find out
+    whether the viewer was invited (see :func:`.perms.is_invited`).
+
+    """
+    invites = Prefetch(
+        'invite_set', queryset=Invite.objects.select_related('user'), to_attr='invites')
+    reports = Report.objects.select_related(*DETAIL_RELATED_FIELDS).prefetch_related(invites)
+    return get_object_or_404(reports, pk=report_id)
+
+
+def _load_comments_and_images(report, user):
+    """Get the comments and images on ``report`` that ``user`` can see.
+
+    This takes one query for the comments (with their authors) and one
+    for the images attached to the report or its comments.
+
+    """
+    comments = Comment.objects.filter(report=report).select_related('created_by')
+    images = Image.objects.filter(Q(report=report) | Q(comment__report=report))
+    if user.is_anonymous:
+        comments = comments.filter(visibility=Comment.PUBLIC)
+        images = images.filter(visibility=Image.PUBLIC)
+    elif user.is_active or is_invited(user, report):
+        # no need to filter for these folks
+        pass
+    else:
+        # the logged in user is the person who reported
+        comments = comments.filter(Q(visibility=Comment.PUBLIC) | Q(visibility=Comment.PROTECTED))
+        images = images.filter(Q(visibility=Image.PUBLIC) | Q(visibility=Image.PROTECTED))
+    return list(comments), list(images)
+
+
+@condition(etag_func=_detail_etag)
 def detail(request, report_id):
     """
     This is a complex view that handles displaying all the information about a
@@ -187,8 +543,12 @@ def detail(request, report_id):
     determine whether to display the comment form, and which comments to
     display, etc. It also handles the management of the report by the expert
     who claimed it
+
+    Rendering the page for a GET takes a fixed number of queries no
+    matter how many comments, images and invites there are; see
+    DetailViewTest.test_query_budget.
     """
-    report = get_object_or_404(Report, pk=report_id)
+    report = _load_report(report_id)
 
     if (report.pk in request.session.get("report_ids", []) and
             report.created_by.is_active and
@@ -208,7 +568,10 @@ def detail(request, report_id):
 
     if not report.is_public:
         if request.user.is_anonymous:
-            messages.info(request, "If this is your report, please use the login system below to authenticate yourself.")
+            messages.info(
+                request,
+                "If this is your report, please use the login system below to authenticate "
+                "yourself.")
             return login_required(lambda request: None)(request)
         elif not can_view_private_report(request.user, report):
             raise PermissionDenied()
@@ -228,7 +591,8 @@ def detail(request, report_id):
         PartialCommentForm = functools.partial(CommentForm, user=request.user, report=report)
 
         if request.POST and submit_flag == CommentForm.SUBMIT_FLAG:
-            image_formset = ImageFormSet(request.POST, request.FILES, queryset=Image.objects.none())
+            image_formset = ImageFormSet(
+                request.POST, request.FILES, queryset=Image.objects.none())
             comment_form = PartialCommentForm(request.POST, request.FILES)
             if comment_form.is_valid() and image_formset.is_valid():
                 comment = comment_form.save()
@@ -271,25 +635,13 @@ def detail(request, report_id):
             invite_form = InviteForm()
 
     # filter down the comments based on the user's permissions
-    comments = Comment.objects.filter(report=report)
-    images = Image.objects.filter(Q(report=report) | Q(comment__report=report))
-    if request.user.is_anonymous:
-        comments = comments.filter(visibility=Comment.PUBLIC)
-        images = images.filter(visibility=Image.PUBLIC)
-    elif request.user.is_active or Invite.objects.filter(user=request.user, report=report).exists():
-        # no need to filter for these folks
-        pass
-    else:
-        # the logged in user is the person who reported
-        comments = comments.filter(Q(visibility=Comment.PUBLIC) | Q(visibility=Comment.PROTECTED))
-        images = images.filter(Q(visibility=Image.PUBLIC) | Q(visibility=Image.PROTECTED))
-
-    invites = list(i.user.email for i in Invite.objects.filter(report=report).select_related("user"))
+    comments, images = _load_comments_and_images(report, request.user)
+    invites = [invite.user.email for invite in report.invites]
 
     return render(request, "reports/detail.html", {
         "report": report,
         "comments": comments,
-        "images": list(images),
+        "images": images,
         "category_id_to_species_id": category_id_to_species_id_json(),
         "invites": invites,
         # all the forms
@@ -302,7 +654,7 @@ def detail(request, report_id):
 
 @permissions.can_claim_report
 def claim(request, report_id):
-    report = get_object_or_404(Report, pk=report_id)
+    report = permissions.get_instance(request, Report, pk=report_id)
     if request.method == "POST" and (report.claimed_by is None or "steal" in request.POST):
         report.claimed_by = request.user
         report.save()
@@ -315,7 +667,7 @@ def claim(request, report_id):
 
 @permissions.can_unclaim_report
 def unclaim(request, report_id):
-    report = get_object_or_404(Report, pk=report_id)
+    report = permissions.get_instance(request, Report, pk=report_id)
     if request.method == "POST":
         report.claimed_by = None
         report.save()
@@ -328,7 +680,7 @@ def unclaim(request, report_id):
 
 @permissions.can_delete_report
 def delete(request, report_id):
-    report = get_object_or_404(Report, pk=report_id)
+    report = permissions.get_instance(request, Report, pk=report_id)
     if request.method == "POST":
         report.delete()
         messages.success(request, "Report deleted!")
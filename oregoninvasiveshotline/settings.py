@@ -1,8 +1,6 @@
 # -*- coding: utf-8 -*-
 import os.path
 
-from django.utils.translation import ugettext_lazy as _
-from django.urls import reverse_lazy
 from celery.schedules import crontab
 
 from emcee.runner.config import YAMLCommandConfiguration
@@ -165,6 +163,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "oregoninvasiveshotline.permissions.middleware.PermissionsMemoMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django.middleware.http.ConditionalGetMiddleware"
@@ -180,6 +179,38 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    # Shared by the web and worker processes so that invalidating a
+    # namespace (see utils.cache) takes effect in all of them. Errors
+    # are treated as misses so the site keeps working without it.
+    'default': {
+        'BACKEND': "django.core.cache.backends.memcached.PyMemcacheCache",
+        'LOCATION': '127.0.0.1:11211',
+        'OPTIONS': {
+            'ignore_exc': True,
+        },
+    },
+    # Map tiles; see reports.tiles. Memcached evicts the least recently
+    # used tiles when it's full, so tiles orphaned by bumping their
+    # version don't pile up (and they expire after a day regardless).
+    'tiles': {
+        'BACKEND': "django.core.cache.backends.memcached.PyMemcacheCache",
+        'LOCATION': '127.0.0.1:11211',
+        'KEY_PREFIX': 'tiles',
+        'TIMEOUT': 24 * 60 * 60,
+        'OPTIONS': {
+            'ignore_exc': True,
+        },
+    },
+    # Prerendered page data that's rebuilt in the background, so it has
+    # to be shared between web and worker processes; see views.HomeView
+    'snapshots': {
+        'BACKEND': "django.core.cache.backends.filebased.FileBasedCache",
+        'LOCATION': os.path.join(FILE_ROOT, 'cache', 'snapshots'),
+        'TIMEOUT': None,
+    },
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         "rest_framework.authentication.SessionAuthentication"
@@ -199,32 +230,63 @@ CELERY_SEND_TASK_ERROR_EMAILS = True
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
-## Celeryd settings
+# Celeryd settings
 CELERY_WORKER_CONCURRENCY = 1
-## Result store settings
+# Result store settings
 CELERY_TASK_IGNORE_RESULT = True
-## Celerybeat settings
+# Celerybeat settings
 CELERY_BEAT_SCHEDULER = 'celery.beat.PersistentScheduler'
 
 CELERY_BEAT_SCHEDULE = {
-    ## Clears expired sessions
-    ## 3:00 a.m.
+    # Clears expired sessions
+    # 3:00 a.m.
     "clear_expired_sessions": {
         "task": "oregoninvasiveshotline.tasks.clear_expired_sessions",
         "schedule": crontab(hour=3, minute=0),
     },
 
-    ## Regenerates icons
-    ## 3:15 a.m.
+    # Regenerates icons
+    # 3:15 a.m.
     "regenerate_icons": {
         "task": "oregoninvasiveshotline.reports.tasks.generate_icons",
         "schedule": crontab(hour=3, minute=15),
     },
+
+    # Removes old report exports
+    # 3:30 a.m.
+    "clean_export_jobs": {
+        "task": "oregoninvasiveshotline.reports.tasks.clean_export_jobs",
+        "schedule": crontab(hour=3, minute=30),
+    },
 }
 
 # Application-specific configuration
 CONTACT_EMAIL = "imapinvasivesoregon@gmail.com"
 ITEMS_PER_PAGE = 25
+REPORT_COUNT_CACHE_TIMEOUT = 60 * 60
+TAB_COUNTS_CACHE_TIMEOUT = 60 * 60
+# Species, category, and county lookups used by the report forms. These
+# are invalidated in every process when they change (the default cache
+# is shared), so the timeout only bounds how long unused entries stay.
+REFERENCE_DATA_CACHE_TIMEOUT = 60 * 60 * 24
+# Number of reports read from the database at a time when exporting
+EXPORT_CHUNK_SIZE = 2000
+# Exports of more reports than this are run in the background and
+# written to a file; identical exports requested within the reuse window
+# share the file. Exported files are removed after EXPORT_JOB_MAX_AGE.
+# Jobs that make no progress for EXPORT_JOB_STALL_TIMEOUT are failed.
+EXPORT_BACKGROUND_THRESHOLD = 10000
+EXPORT_JOB_REUSE_WINDOW = 60 * 15
+EXPORT_JOB_MAX_AGE = 60 * 60 * 24 * 7
+EXPORT_JOB_STALL_TIMEOUT = 60 * 10
+MAP_MARKERS_PER_PAGE = 250
+# Below this zoom level, report markers are grouped into clusters of
+# reports falling into the same grid cell (sized in pixels).
+MAP_CLUSTER_MAX_ZOOM = 12
+MAP_CLUSTER_CELL_SIZE = 64
+MAP_CLUSTER_CACHE_TIMEOUT = 60 * 60
+REPORT_TILES_MAX_ZOOM = 20
+REPORT_TILES_MAX_AGE = 5 * 60
 ICON_DEFAULT_COLOR = "#999999"
 ICON_DIR = "generated_icons"
 ICON_TYPE = "png"
@@ -236,10 +298,12 @@ NOTIFICATIONS = {
     'from_email': "webmaster@localhost",
     'login_link__subject': "Oregon Invasives Hotline - Login Link",
     'new_report__subject': "Oregon Invasives Hotline - Thank you for your report",
-    'notify_new_owner__subject': "A subscription has been assigned to you on Oregon Invasives Hotline",
+    'notify_new_owner__subject': (
+        "A subscription has been assigned to you on Oregon Invasives Hotline"),
     'notify_new_submission__subject': "New Oregon Invasives Hotline submission for review",
     'notify_new_comment__subject': "Oregon Invasives Hotline - New Comment on Report",
-    'invite_reviewer__subject': "Oregon Invasives Hotline - Submission Review Request"
+    'invite_reviewer__subject': "Oregon Invasives Hotline - Submission Review Request",
+    'export_complete__subject': "Oregon Invasives Hotline - Your export is ready"
 }
 
 # Configure environment-specific configuration
@@ -3,14 +3,23 @@ from collections import defaultdict
 
 from django.core.validators import RegexValidator
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from oregoninvasiveshotline.utils.cache import (
+    REFERENCE_DATA_NAMESPACE, REPORT_LIST_NAMESPACE, bump_version, get_reference_data)
 
 
 def category_id_to_species_id_json():
+    return get_reference_data('category-id-to-species-id', _category_id_to_species_id_json)
+
+
+def _category_id_to_species_id_json():
     species = (
         Species.objects
-            .select_related('category')
-            .order_by('category__pk')
-            .values_list('category__pk', 'pk')
+        .select_related('category')
+        .order_by('category__pk')
+        .values_list('category__pk', 'pk')
     )
     category_id_to_species_id = defaultdict(list)
     for category_id, species_id in species:
@@ -91,3 +100,10 @@ class Species(models.Model):
 
     def __str__(self):
         return self.title
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Species)
+def receiver__invalidate_reference_data(sender, **kwargs):
+    bump_version(REFERENCE_DATA_NAMESPACE)
+    bump_version(REPORT_LIST_NAMESPACE)
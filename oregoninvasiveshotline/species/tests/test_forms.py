@@ -12,7 +12,8 @@ class SpeciesSearchFormTest(TestCase):
     def setUp(self):
         super().setUp()
         make(Species, name='stuff')
-        self.user = User(first_name='foo', last_name='bar', email='foobar@example.com', is_staff=True)
+        self.user = User(
+            first_name='foo', last_name='bar', email='foobar@example.com', is_staff=True)
         self.user.set_password('foobar')
         self.user.save()
         self.client.login(username='foobar@example.com', password='foobar')
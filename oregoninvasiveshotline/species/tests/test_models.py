@@ -0,0 +1,26 @@
+import json
+
+from django.test import TestCase
+from model_mommy.mommy import make
+
+from ..models import Category, Species, category_id_to_species_id_json
+
+
+class CategoryIdToSpeciesIdTest(TestCase):
+
+    def test_map_is_cached_until_species_change(self):
+        category = make(Category)
+        species = make(Species, category=category)
+        species_ids = json.loads(category_id_to_species_id_json())
+        self.assertEqual(species_ids, {str(category.pk): [species.pk]})
+
+        with self.assertNumQueries(0):
+            category_id_to_species_id_json()
+
+        other_species = make(Species, category=category)
+        species_ids = json.loads(category_id_to_species_id_json())[str(category.pk)]
+        self.assertEqual(sorted(species_ids), [species.pk, other_species.pk])
+
+        species.delete()
+        species_ids = json.loads(category_id_to_species_id_json())
+        self.assertEqual(species_ids, {str(category.pk): [other_species.pk]})
@@ -50,7 +50,10 @@ def list_(request):
 
 class SpeciesCreateView(SuccessMessageMixin, CreateView):
     model = Species
-    fields = ['name', 'scientific_name', 'remedy', 'resources', 'is_confidential', 'category', 'severity']
+    fields = [
+        'name', 'scientific_name', 'remedy', 'resources', 'is_confidential', 'category',
+        'severity',
+    ]
     success_message = "Species created successfully."
     template_name_suffix = '_detail_form'
 
@@ -60,7 +63,10 @@ class SpeciesCreateView(SuccessMessageMixin, CreateView):
 
 class SpeciesDetailView(SuccessMessageMixin, UpdateView):
     model = Species
-    fields = ['name', 'scientific_name', 'remedy', 'resources', 'is_confidential', 'category', 'severity']
+    fields = [
+        'name', 'scientific_name', 'remedy', 'resources', 'is_confidential', 'category',
+        'severity',
+    ]
     success_message = "Species updated successfully."
     template_name_suffix = '_detail_form'
 
@@ -1,4 +1,5 @@
 from django.core.management import call_command
+from django.db import transaction
 
 from oregoninvasiveshotline.celery import app
 
@@ -6,3 +7,19 @@ from oregoninvasiveshotline.celery import app
 @app.task
 def clear_expired_sessions():
     call_command('clearsessions')
+
+
+@app.task
+def rebuild_home_snapshot():
+    from .views import HomeView  # avoid circular import
+    HomeView().build_snapshot()
+
+
+def queue_home_snapshot_rebuild():
+    """Rebuild the home page's snapshot of reports in the background.
+
+    The rebuild is queued once the current transaction commits so the
+    worker sees the changes that prompted it.
+
+    """
+    transaction.on_commit(rebuild_home_snapshot.delay)
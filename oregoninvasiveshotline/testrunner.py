@@ -1,6 +1,7 @@
 import tempfile
 import shutil
 import os
+import uuid
 
 from django.test.runner import DiscoverRunner
 from django.conf import settings
@@ -16,9 +17,17 @@ class TestRunner(DiscoverRunner):
         os.mkdir(os.path.join(media_root, 'generated_icons'))
         os.mkdir(os.path.join(media_root, 'generated_thumbnails'))
 
+        # Tests use the configured cache; entries are namespaced by run
+        # so they can't be read by another run (or the site)
+        key_prefix = 'test-{0}'.format(uuid.uuid4().hex)
+        settings.CACHES['default']['KEY_PREFIX'] = key_prefix
+        settings.CACHES['tiles']['KEY_PREFIX'] = key_prefix + '-tiles'
+        settings.CACHES['snapshots']['LOCATION'] = tempfile.mkdtemp()
+
         super().setup_test_environment(**kwargs)
 
     def teardown_test_environment(self, **kwargs):
         shutil.rmtree(settings.MEDIA_ROOT)
+        shutil.rmtree(settings.CACHES['snapshots']['LOCATION'])
 
         super().teardown_test_environment(**kwargs)
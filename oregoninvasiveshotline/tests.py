@@ -1,7 +1,20 @@
+from unittest.mock import patch
+
+from django.contrib.gis.geos import Point
+from django.core.cache import caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from model_mommy.mommy import make
 
+from oregoninvasiveshotline.reports.models import Report
+from oregoninvasiveshotline.utils.cache import bump_version, get_version
 from oregoninvasiveshotline.utils.test.user import UserMixin
 
+from .tasks import rebuild_home_snapshot
+
 
 class RubyPasswordHasherTest(TestCase, UserMixin):
     def test_verify(self):
@@ -18,3 +31,78 @@ class RubyPasswordHasherTest(TestCase, UserMixin):
             # RubyPasswordHasher didn't implement all the methods (because it
             # isn't the first password hasher)
             user.set_password("foobar2")
+
+
+class CacheVersionTest(TestCase):
+
+    def test_namespace_is_invalidated_again_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            version = bump_version('report-counts')
+            self.assertEqual(get_version('report-counts'), version)
+        self.assertNotEqual(get_version('report-counts'), version)
+
+
+class HomeViewTest(TestCase):
+
+    def setUp(self):
+        caches['snapshots'].clear()
+
+    def test_reports_are_served_from_snapshot(self):
+        report = make(Report, is_public=True, point=Point(0, 0))
+        make(Report, is_public=False, point=Point(0, 0))
+
+        response = self.client.get(reverse('home'))
+        self.assertEqual([r['pk'] for r in response.context['reports']], [report.pk])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('home'))
+        self.assertFalse([q for q in queries if '"report"' in q['sql']])
+        self.assertEqual([r['pk'] for r in response.context['reports']], [report.pk])
+
+    @patch('oregoninvasiveshotline.tasks.rebuild_home_snapshot.delay')
+    def test_snapshot_is_rebuilt_when_public_reports_change(self, delay):
+        report = make(Report, is_public=False, point=Point(0, 0))
+        with self.captureOnCommitCallbacks(execute=True):
+            report.description = 'Not shown on the home page'
+            report.save()
+        self.assertFalse(delay.called)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            report.is_public = True
+            report.save()
+        self.assertEqual(delay.call_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            report.edrr_status = 1
+            report.save()
+        self.assertEqual(delay.call_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            report.is_archived = True
+            report.save()
+        self.assertEqual(delay.call_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            report.is_public = False
+            report.save()
+        self.assertEqual(delay.call_count, 3)
+
+    def test_unchanged_home_page_is_not_modified(self):
+        # The first visit creates the page's (default) content blocks
+        self.client.get(reverse('home'))
+        response = self.client.get(reverse('home'))
+        etag = response['ETag']
+        response = self.client.get(reverse('home'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        make(Report, is_public=True, point=Point(0, 0))
+        rebuild_home_snapshot()
+        response = self.client.get(reverse('home'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_rebuild_replaces_snapshot(self):
+        self.client.get(reverse('home'))
+        report = make(Report, is_public=True, point=Point(0, 0))
+        rebuild_home_snapshot()
+        response = self.client.get(reverse('home'))
+        self.assertEqual([r['pk'] for r in response.context['reports']], [report.pk])
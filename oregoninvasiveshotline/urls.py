@@ -15,7 +15,8 @@ from .views import HomeView, AdminPanelView
 
 urlpatterns = [
     # Redirects for the old site
-    url(r'^reports/(?P<report_id>\d+)/?$', lambda request, report_id: redirect('reports-detail', report_id)),
+    url(r'^reports/(?P<report_id>\d+)/?$',
+        lambda request, report_id: redirect('reports-detail', report_id)),
     url(r'^reports/new/?$', lambda request: redirect('reports-create')),
     url(r'^home/search.*$', lambda request: redirect('reports-list')),
 
@@ -24,38 +25,66 @@ urlpatterns = [
     url(r'^admin/', admin.site.urls),
     url(r'^adminpanel/?$', AdminPanelView.as_view(), name='admin-panel'),
 
-    url(r'^categories/create/?$', permissions.is_staff(species.CategoryCreateView.as_view()), name='categories-create'),
-    url(r'^categories/delete/(?P<pk>\d+)/?$', permissions.is_staff(species.CategoryDeleteView.as_view()), name='categories-delete'),
-    url(r'^categories/detail/(?P<pk>\d+)/?$', permissions.is_staff(species.CategoryDetailView.as_view()), name='categories-detail'),
-    url(r'^categories/list/?$', permissions.is_staff(species.CategoryList.as_view()), name='categories-list'),
+    url(r'^categories/create/?$', permissions.is_staff(species.CategoryCreateView.as_view()),
+        name='categories-create'),
+    url(r'^categories/delete/(?P<pk>\d+)/?$',
+        permissions.is_staff(species.CategoryDeleteView.as_view()),
+        name='categories-delete'),
+    url(r'^categories/detail/(?P<pk>\d+)/?$',
+        permissions.is_staff(species.CategoryDetailView.as_view()),
+        name='categories-detail'),
+    url(r'^categories/list/?$', permissions.is_staff(species.CategoryList.as_view()),
+        name='categories-list'),
 
     url(r'^comments/delete/(?P<comment_id>\d+)/?$', comments.delete, name='comments-delete'),
     url(r'^comments/edit/(?P<comment_id>\d+)/?$', comments.edit, name='comments-edit'),
 
     url(r'^notifications/all/?$', notifications.admin_list, name='notifications-admin-list'),
     url(r'^notifications/create/?$', notifications.create, name='notifications-create'),
-    url(r'^notifications/delete/(?P<subscription_id>\d+)/?$', notifications.delete, name='notifications-delete'),
-    url(r'^notifications/edit/(?P<subscription_id>\d+)/?$', notifications.edit, name='notifications-edit'),
+    url(r'^notifications/delete/(?P<subscription_id>\d+)/?$', notifications.delete,
+        name='notifications-delete'),
+    url(r'^notifications/edit/(?P<subscription_id>\d+)/?$', notifications.edit,
+        name='notifications-edit'),
     url(r'^notifications/list/?$', notifications.list_, name='notifications-list'),
 
     url(r'^reports/claim/(?P<report_id>\d+)/?$', reports.claim, name='reports-claim'),
     url(r'^reports/create/?$', reports.create, name='reports-create'),
     url(r'^reports/delete/(?P<report_id>\d+)/?$', reports.delete, name='reports-delete'),
     url(r'^reports/detail/(?P<report_id>\d+)/?$', reports.detail, name='reports-detail'),
+    url(r'^reports/exports/(?P<export_job_id>\d+)/?$', reports.export_job,
+        name='reports-export-job'),
+    url(r'^reports/exports/(?P<export_job_id>\d+)/download/?$', reports.export_job_download,
+        name='reports-export-job-download'),
     url(r'^reports/help/?$', reports.help, name='reports-help'),
     url(r'^reports/list/?$', reports.list_, name='reports-list'),
+    url(r'^reports/markers/?$', reports.markers, name='reports-markers'),
+    url(r'^reports/popover/(?P<report_id>\d+)/?$', reports.popover, name='reports-popover'),
     url(r'^reports/unclaim/(?P<report_id>\d+)/?$', reports.unclaim, name='reports-unclaim'),
 
-    url(r'^severities/create/?$', permissions.is_staff(species.SeverityCreateView.as_view()), name='severities-create'),
-    url(r'^severities/delete/(?P<pk>\d+)/?$', permissions.is_staff(species.SeverityDeleteView.as_view()), name='severities-delete'),
-    url(r'^severities/detail/(?P<pk>\d+)/?$', permissions.is_staff(species.SeverityDetailView.as_view()), name='severities-detail'),
-    url(r'^severities/list/?$', permissions.is_staff(species.SeverityList.as_view()), name='severities-list'),
-
-    url(r'^species/create/?$', permissions.is_active(species.SpeciesCreateView.as_view()), name='species-create'),
-    url(r'^species/delete/(?P<pk>\d+)/?$', permissions.is_active(species.SpeciesDeleteView.as_view()), name='species-delete'),
-    url(r'^species/detail/(?P<pk>\d+)/?$', permissions.is_active(species.SpeciesDetailView.as_view()), name='species-detail'),
+    url(r'^severities/create/?$', permissions.is_staff(species.SeverityCreateView.as_view()),
+        name='severities-create'),
+    url(r'^severities/delete/(?P<pk>\d+)/?$',
+        permissions.is_staff(species.SeverityDeleteView.as_view()),
+        name='severities-delete'),
+    url(r'^severities/detail/(?P<pk>\d+)/?$',
+        permissions.is_staff(species.SeverityDetailView.as_view()),
+        name='severities-detail'),
+    url(r'^severities/list/?$', permissions.is_staff(species.SeverityList.as_view()),
+        name='severities-list'),
+
+    url(r'^species/create/?$', permissions.is_active(species.SpeciesCreateView.as_view()),
+        name='species-create'),
+    url(r'^species/delete/(?P<pk>\d+)/?$',
+        permissions.is_active(species.SpeciesDeleteView.as_view()),
+        name='species-delete'),
+    url(r'^species/detail/(?P<pk>\d+)/?$',
+        permissions.is_active(species.SpeciesDetailView.as_view()),
+        name='species-detail'),
     url(r'^species/list/?$', species.list_, name='species-list'),
 
+    url(r'^tiles/reports/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)\.mvt$', reports.tile,
+        name='tiles-reports'),
+
     url(r'^users/authenticate/?$', users.authenticate, name='users-authenticate'),
     url(r'^users/avatar/(?P<user_id>\d+)/?$', users.avatar, name='users-avatar'),
     url(r'^users/create/?$', users.create, name='users-create'),
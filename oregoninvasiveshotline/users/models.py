@@ -1,14 +1,12 @@
-import base64
 import binascii
-from datetime import datetime, timedelta
 from urllib import parse
 
 from django.contrib.auth.models import AbstractBaseUser, UserManager
-from django.contrib.sites.models import Site
 from django.core.signing import TimestampSigner, SignatureExpired
 from django.urls import reverse
 from django.db import models
 
+from oregoninvasiveshotline.utils.cache import REPORT_LIST_NAMESPACE, bump_version
 from oregoninvasiveshotline.utils.urls import build_absolute_url
 
 
@@ -30,8 +28,10 @@ class User(AbstractBaseUser):
     prefix = models.CharField(max_length=255)
     suffix = models.CharField(max_length=255)
     date_joined = models.DateTimeField(auto_now_add=True)
-    is_active = models.BooleanField(default=True, blank=True, verbose_name="Is Manager (can login and manage reports)")
-    is_staff = models.BooleanField(default=False, blank=True, verbose_name="Is Admin (can do anything)")
+    is_active = models.BooleanField(
+        default=True, blank=True, verbose_name="Is Manager (can login and manage reports)")
+    is_staff = models.BooleanField(
+        default=False, blank=True, verbose_name="Is Admin (can do anything)")
     affiliations = models.TextField(blank=True)
     biography = models.TextField(blank=True)
     photo = models.ImageField(upload_to="images", blank=True)
@@ -107,3 +107,25 @@ class User(AbstractBaseUser):
 
     def __str__(self):
         return self.get_full_name()
+
+
+def tab_counts_namespace(user_id=None):
+    """Get the cache namespace for a user's tab counts.
+
+    See :func:`oregoninvasiveshotline.users.utils.get_tab_counts`.
+    Without a ``user_id``, this is the namespace for everyone's counts.
+
+    """
+    if user_id is None:
+        return 'tab-counts'
+    return 'tab-counts:{user_id}'.format(user_id=user_id)
+
+
+def invalidate_tab_counts(user_id=None):
+    """Invalidate the cached tab counts of one user or of everyone.
+
+    The counts are shown on the report list, so it's invalidated too.
+
+    """
+    bump_version(tab_counts_namespace(user_id))
+    bump_version(REPORT_LIST_NAMESPACE)
@@ -1,5 +1,5 @@
 import urllib.parse
-from unittest.mock import Mock, patch
+from unittest.mock import patch
 
 from django.conf import settings
 from django.core import mail
@@ -15,7 +15,7 @@ from oregoninvasiveshotline.utils.test.user import UserMixin
 from oregoninvasiveshotline.notifications.models import UserNotificationQuery
 from oregoninvasiveshotline.reports.models import Invite, Report
 
-from .forms import PublicLoginForm, UserForm, UserSearchForm
+from .forms import UserForm, UserSearchForm
 from .utils import get_tab_counts
 from .models import User
 
@@ -82,6 +82,35 @@ class GetTabCountsTest(TestCase, UserMixin):
         context = get_tab_counts(other_user, [])
         self.assertEqual(context['unclaimed_reports'], 1)
 
+    def test_counts_are_fetched_in_one_query_and_cached(self):
+        with self.assertNumQueries(1):
+            get_tab_counts(self.user, [])
+        with self.assertNumQueries(0):
+            get_tab_counts(self.user, [])
+
+    def test_cached_counts_are_invalidated(self):
+        context = get_tab_counts(self.user, [])
+        self.assertEqual(context['subscribed'], 0)
+        self.assertEqual(context['invited_to'], 0)
+        self.assertEqual(context['claimed_by_me'], 0)
+
+        make(UserNotificationQuery, user=self.user)
+        self.assertEqual(get_tab_counts(self.user, [])['subscribed'], 1)
+
+        report = make(Report, point=ORIGIN)
+        make(Invite, user=self.user, report=report)
+        self.assertEqual(get_tab_counts(self.user, [])['invited_to'], 1)
+
+        report.claimed_by = self.user
+        report.save()
+        self.assertEqual(get_tab_counts(self.user, [])['claimed_by_me'], 1)
+
+        # Changes that don't move a report between tabs keep the counts
+        report.description = 'Changed'
+        report.save()
+        with self.assertNumQueries(0):
+            get_tab_counts(self.user, [])
+
 
 class DetailViewTest(TestCase, UserMixin):
 
@@ -1,21 +1,65 @@
-from django.db.models import Q
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
 
+from oregoninvasiveshotline.utils.cache import get_version, make_key
+from oregoninvasiveshotline.utils.db import SubqueryCount
 from oregoninvasiveshotline.notifications.models import UserNotificationQuery
 from oregoninvasiveshotline.reports.models import Report, Invite
 
+from .models import tab_counts_namespace
+
 
 def get_tab_counts(user, report_ids):
-    return {
-        "subscribed": UserNotificationQuery.objects.filter(user_id=user.pk).count(),
-        "invited_to": Invite.objects.filter(user_id=user.pk).count(),
-        "reported": Report.objects.filter(Q(pk__in=report_ids) | Q(created_by_id=user.pk)).count(),
-        "open_and_claimed": 0 if user.is_anonymous else
-        Report.objects.filter(claimed_by_id=user.pk, is_public=False, is_archived=False).count(),
-        "claimed_by_me": 0 if user.is_anonymous else
-        Report.objects.filter(claimed_by_id=user.pk).count(),
-        "unclaimed_reports": Report.objects.filter(
-            claimed_by=None,
-            is_public=False,
-            is_archived=False
-        ).count() if user.is_authenticated and user.is_active else 0,
+    """Get the counts shown on the tabs of the report list, etc.
+
+    The counts are cached per user (and, for anonymous users, per set
+    of reports they submitted) until reports change or the user's
+    invites or subscriptions change.
+
+    """
+    report_ids = sorted(report_ids)
+    user_version = get_version(tab_counts_namespace(user.pk))
+    key = make_key(tab_counts_namespace(), user.pk, user_version, user.is_active, report_ids)
+    counts = cache.get(key)
+    if counts is None:
+        counts = _get_tab_counts(user, report_ids)
+        cache.set(key, counts, settings.TAB_COUNTS_CACHE_TIMEOUT)
+    return counts
+
+
+def _get_tab_counts(user, report_ids):
+    """Get the tab counts in a single query.
+
+    Only the reports that count toward at least one tab are aggregated,
+    so the query can combine the indexes for each tab instead of
+    scanning every report.
+
+    """
+    reported = Q(created_by_id=user.pk)
+    if report_ids:
+        reported |= Q(pk__in=report_ids)
+    tabs = reported
+    subscriptions = UserNotificationQuery.objects.filter(user_id=user.pk)
+    counts = {
+        "subscribed": SubqueryCount(subscriptions.values('pk')),
+        "invited_to": SubqueryCount(Invite.objects.filter(user_id=user.pk).values('pk')),
+        "reported": Count('pk', filter=reported),
     }
+    if not user.is_anonymous:
+        claimed_by_me = Q(claimed_by_id=user.pk)
+        counts.update({
+            "open_and_claimed": Count(
+                'pk', filter=claimed_by_me & Q(is_public=False, is_archived=False)),
+            "claimed_by_me": Count('pk', filter=claimed_by_me),
+        })
+        tabs |= claimed_by_me
+    if user.is_authenticated and user.is_active:
+        unclaimed = Q(claimed_by=None, is_public=False, is_archived=False)
+        counts["unclaimed_reports"] = Count('pk', filter=unclaimed)
+        tabs |= unclaimed
+
+    counts = Report.objects.filter(tabs).aggregate(**counts)
+    for name in ("open_and_claimed", "claimed_by_me", "unclaimed_reports"):
+        counts.setdefault(name, 0)
+    return counts
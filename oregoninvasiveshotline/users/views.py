@@ -3,7 +3,6 @@ import random
 
 from django.shortcuts import get_object_or_404, redirect, render
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.core.exceptions import ValidationError
 from django.core.signing import BadSignature
 from django.views.generic import DetailView
 from django.contrib.auth import login as django_login
@@ -178,7 +177,7 @@ def list_(request):
 
 @permissions.can_delete_user
 def delete(request, user_id):
-    user = get_object_or_404(User, pk=user_id)
+    user = permissions.get_instance(request, User, pk=user_id)
     if request.method == "POST":
         user.delete()
         messages.success(request, "User deleted!")
@@ -208,7 +207,7 @@ def edit(request, user_id):
     """
     Edit an existing user.
     """
-    user = get_object_or_404(User, pk=user_id)
+    user = permissions.get_instance(request, User, pk=user_id)
     return _edit(request, user)
 
 
@@ -0,0 +1,94 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.db import connection, transaction
+
+
+# Namespace for lookup maps and form choices built from species,
+# categories, and counties; see get_reference_data()
+REFERENCE_DATA_NAMESPACE = 'reference-data'
+
+# Namespace whose version changes whenever anything shown on the report
+# list changes; nothing is stored in it, but its version is used in the
+# list's ETag
+REPORT_LIST_NAMESPACE = 'report-list'
+
+
+def _version_key(namespace):
+    return 'version:{namespace}'.format(namespace=namespace)
+
+
+def _initial_version():
+    # Versions start from the current time so that a namespace whose
+    # version was evicted can't reuse a version that was used before.
+    return int(time.time() * 1000)
+
+
+def get_version(namespace, alias=DEFAULT_CACHE_ALIAS):
+    """Get the current version of a cache ``namespace``.
+
+    Versions are used to invalidate every entry in a namespace at once
+    without having to know which keys are in use: the version is part
+    of each key (see :func:`make_key`), so bumping it orphans all of
+    the existing entries, which then expire on their own.
+
+    The version is stored in the cache ``alias``, which should be the
+    cache the namespace's entries are stored in.
+
+    """
+    return caches[alias].get_or_set(_version_key(namespace), _initial_version, timeout=None)
+
+
+def bump_version(namespace, alias=DEFAULT_CACHE_ALIAS):
+    """Invalidate all entries in a cache ``namespace``.
+
+    When this is called in a transaction, the namespace is invalidated
+    again once the transaction is committed. Until then, other processes
+    don't see the changes being made and may cache entries built from
+    the old data under the new version.
+
+    """
+    version = _bump_version(namespace, alias)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _bump_version(namespace, alias))
+    return version
+
+
+def _bump_version(namespace, alias):
+    key = _version_key(namespace)
+    try:
+        return caches[alias].incr(key)
+    except ValueError:
+        version = _initial_version()
+        caches[alias].set(key, version, timeout=None)
+        return version
+
+
+def make_key(namespace, *parts):
+    """Make a key for ``parts`` in the current version of ``namespace``.
+
+    Parts are hashed so arbitrary strings (e.g., query strings) can be
+    used without running into the key restrictions of some backends.
+
+    """
+    digest = hashlib.md5('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return '{namespace}:{version}:{digest}'.format(
+        namespace=namespace, version=get_version(namespace), digest=digest)
+
+
+def get_reference_data(name, build):
+    """Get the reference data ``name``, calling ``build`` to make it
+    if it isn't cached.
+
+    Reference data is cached until species, categories, or counties
+    change (or the cache times out).
+
+    """
+    key = make_key(REFERENCE_DATA_NAMESPACE, name)
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, settings.REFERENCE_DATA_CACHE_TIMEOUT)
+    return data
@@ -1,5 +1,7 @@
 from enum import Enum
 
+from django.db.models import IntegerField, Subquery
+
 
 def dictfetchall(cursor):
     """Return all rows from cursor as a list of dicts."""
@@ -10,6 +12,25 @@ def dictfetchall(cursor):
     ]
 
 
+class SubqueryCount(Subquery):
+
+    """Count the rows returned by a queryset in a subquery.
+
+    Unlike ``Subquery``, this can be used in ``aggregate()`` alongside
+    aggregates over the outer query, so counts over several tables can
+    be fetched in a single query::
+
+        Report.objects.aggregate(
+            claimed=Count('pk', filter=Q(claimed_by=user)),
+            invited=SubqueryCount(Invite.objects.filter(user=user)))
+
+    """
+
+    template = '(SELECT COUNT(*) FROM (%(subquery)s) _count)'
+    output_field = IntegerField()
+    contains_aggregate = True
+
+
 def will_be_deleted_with(instance):
     """Get items that would be deleted along with model ``instance``.
 
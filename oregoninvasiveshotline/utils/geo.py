@@ -0,0 +1,85 @@
+import math
+
+from django.contrib.gis.geos import Polygon
+
+
+def parse_bbox(value, srid=4326):
+    """Parse a ``west,south,east,north`` string into a polygon.
+
+    This is the format used by map clients to describe the visible
+    extent of a map (in degrees by default). A ``ValueError`` will be
+    raised if the string isn't a valid bounding box.
+
+    """
+    try:
+        west, south, east, north = (float(v) for v in value.split(','))
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError('Expected bounding box as west,south,east,north: {0!r}'.format(value))
+    if not all(math.isfinite(v) for v in (west, south, east, north)):
+        raise ValueError('Bounding box must be finite: {0!r}'.format(value))
+    if west > east or south > north:
+        raise ValueError('Bounding box is inverted: {0!r}'.format(value))
+    bbox = Polygon.from_bbox((west, south, east, north))
+    bbox.srid = srid
+    return bbox
+
+
+# Half the width of the world in Web Mercator (EPSG:3857) meters
+WEB_MERCATOR_EXTENT = 20037508.342789244
+
+
+def tile_bounds(z, x, y, margin=0):
+    """Get the Web Mercator bounds of the ``z``/``x``/``y`` map tile.
+
+    Bounds are returned as ``(xmin, ymin, xmax, ymax)``. ``margin`` is
+    a fraction of the tile's size to extend the bounds by on all sides.
+
+    """
+    size = 2 * WEB_MERCATOR_EXTENT / 2 ** z
+    xmin = -WEB_MERCATOR_EXTENT + (x - margin) * size
+    ymax = WEB_MERCATOR_EXTENT - (y - margin) * size
+    return xmin, ymax - (1 + 2 * margin) * size, xmin + (1 + 2 * margin) * size, ymax
+
+
+def tile_bbox(z, x, y, margin=0):
+    """Get the bounds of a map tile as a lat/lng polygon.
+
+    See :func:`tile_bounds` for the arguments.
+
+    """
+    xmin, ymin, xmax, ymax = tile_bounds(z, x, y, margin)
+    west, south = mercator_to_lnglat(xmin, ymin)
+    east, north = mercator_to_lnglat(xmax, ymax)
+    bbox = Polygon.from_bbox((west, south, east, north))
+    bbox.srid = 4326
+    return bbox
+
+
+def mercator_to_lnglat(x, y):
+    lng = x / WEB_MERCATOR_EXTENT * 180
+    lat = math.degrees(math.atan(math.sinh(y / WEB_MERCATOR_EXTENT * math.pi)))
+    return lng, lat
+
+
+def tiles_for_point(point, zoom_levels, margin=0):
+    """Get the map tiles that contain a lat/lng ``point``.
+
+    Yields ``(z, x, y)`` for each of the ``zoom_levels``. With a
+    ``margin`` (see :func:`tile_bounds`), tiles whose extended bounds
+    contain the point are included too, so there can be up to four
+    tiles per zoom level.
+
+    """
+    lat = max(min(point.y, 85.0511), -85.0511)
+    sin_lat = math.sin(math.radians(lat))
+    # Fractional tile coordinates at zoom level 0
+    fx = (point.x + 180) / 360
+    fy = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    for z in zoom_levels:
+        n = 2 ** z
+        xs = {int(math.floor(fx * n + d)) for d in (-margin, margin)}
+        ys = {int(math.floor(fy * n + d)) for d in (-margin, margin)}
+        for x in xs:
+            for y in ys:
+                if 0 <= x < n and 0 <= y < n:
+                    yield z, x, y
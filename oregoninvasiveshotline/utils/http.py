@@ -0,0 +1,19 @@
+import hashlib
+
+from django.contrib import messages
+
+
+def make_etag(*parts):
+    """Make an ETag from ``parts`` describing a response's content."""
+    return hashlib.md5('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def has_pending_messages(request):
+    """Are there flash messages waiting to be shown to the user?
+
+    Responses that show messages can't be cached, so views shouldn't
+    send ETags, etc when there are any. Checking doesn't mark the
+    messages as shown.
+
+    """
+    return bool(len(messages.get_messages(request)))
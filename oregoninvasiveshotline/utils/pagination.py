@@ -0,0 +1,320 @@
+import datetime
+
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import BooleanField, DecimalField, Expression, F, FloatField, Func, Q, Value
+
+
+class InvalidCursor(Exception):
+
+    pass
+
+
+class CursorPage:
+
+    """A page of objects from a :class:`CursorPaginator`.
+
+    Instead of page numbers, pages have opaque cursors pointing to the
+    pages before and after them (when there are such pages).
+
+    """
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class CursorPaginator:
+
+    """Keyset paginator.
+
+    Rather than counting rows and skipping over the rows on preceding
+    pages with ``OFFSET``, each page is selected by comparing against
+    the sort keys of the last (or first) row of the adjacent page, so
+    that any page costs about the same as the first one.
+
+    The sort keys are taken from the ordering of ``queryset``. The
+    primary key is added as a tiebreaker if it's not already included.
+    Null sort keys are ordered the way PostgreSQL orders them: last when
+    ascending and first when descending.
+
+    ``count`` is an optional function that returns the (possibly
+    approximate) total number of objects; it's only called when
+    :attr:`count` is accessed.
+
+    Cursors are signed, so they can't be tampered with, and they're
+    tied to the ordering they were created for: a cursor used with a
+    different ordering is rejected.
+
+    Where consecutive sort keys go in the same direction, the rows after
+    a cursor are selected with a single row value comparison, like
+    ``(created_on, report_id) < (%s, %s)``, which PostgreSQL can answer
+    by scanning an index on those keys starting at the cursor.
+
+    Floating point sort keys (e.g., search ranks, which are ``real``)
+    don't round trip exactly through a cursor, so they're sorted and
+    compared as ``numeric`` instead.
+
+    """
+
+    salt = 'oregoninvasiveshotline.utils.pagination.CursorPaginator'
+
+    # Special cursor pointing to the last page
+    last = 'last'
+
+    def __init__(self, queryset, per_page, count=None):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not all(isinstance(key, str) for key in ordering):
+            raise TypeError(
+                'Only field and annotation names are supported: {0!r}'.format(ordering))
+        pk_name = queryset.model._meta.pk.name
+        names = [key.lstrip('-') for key in ordering]
+        if not {'pk', pk_name}.intersection(names):
+            descending = ordering[-1].startswith('-') if ordering else False
+            ordering.append('-pk' if descending else 'pk')
+        self.ordering = ordering
+
+        # Annotate the sort keys so their values can be read from the
+        # objects on each page and compared against.
+        self.keys = [
+            ('_cursor_{0}'.format(i), key.startswith('-')) for i, key in enumerate(ordering)
+        ]
+        self.queryset = queryset.annotate(**{
+            name: self._sort_key(queryset, key.lstrip('-'))
+            for (name, _), key in zip(self.keys, ordering)
+        })
+        self.nullable = [self._is_nullable(queryset, key.lstrip('-')) for key in ordering]
+        self.per_page = per_page
+        self._count = count
+
+    @property
+    def count(self):
+        return None if self._count is None else self._count()
+
+    def _sort_key(self, queryset, name):
+        meta = queryset.model._meta
+        if name in queryset.query.annotations:
+            output_field = queryset.query.annotations[name].output_field
+        elif name == 'pk':
+            output_field = meta.pk
+        else:
+            try:
+                output_field = meta.get_field(name)
+            except FieldDoesNotExist:
+                output_field = None
+        if isinstance(output_field, FloatField):
+            return Func(
+                F(name), template='(%(expressions)s)::numeric', output_field=DecimalField())
+        return F(name)
+
+    def _is_nullable(self, queryset, name):
+        if name == 'pk':
+            return False
+        if name in queryset.query.annotations:
+            # Annotations could be anything, so assume the worst
+            return True
+        try:
+            return queryset.model._meta.get_field(name).null
+        except FieldDoesNotExist:
+            return True
+
+    def page(self, cursor=None):
+        """Get the page of objects pointed to by ``cursor``.
+
+        Without a cursor, the first page is returned. An invalid cursor
+        raises :class:`InvalidCursor`.
+
+        """
+        if cursor == self.last:
+            direction, values = 'previous', None
+        elif cursor:
+            direction, values = self.decode_cursor(cursor)
+        else:
+            direction, values = 'next', None
+
+        reverse = direction == 'previous'
+        queryset = self.queryset.order_by(*self._order_by(reverse))
+        if values is not None:
+            queryset = queryset.filter(self._after(values, reverse))
+
+        # Fetch one extra object to find out if there's another page
+        objects = list(queryset[:self.per_page + 1])
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if reverse:
+            objects.reverse()
+
+        if not objects:
+            return CursorPage(objects, self)
+
+        first, last = objects[0], objects[-1]
+        if reverse:
+            has_next, has_previous = values is not None, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        return CursorPage(
+            objects,
+            self,
+            next_cursor=self.encode_cursor('next', last) if has_next else None,
+            previous_cursor=self.encode_cursor('previous', first) if has_previous else None,
+        )
+
+    def encode_cursor(self, direction, obj):
+        values = [getattr(obj, name) for name, _ in self.keys]
+        data = {'d': direction, 'o': self.ordering, 'v': values}
+        return signing.dumps(data, salt=self.salt, compress=True, serializer=CursorSerializer)
+
+    def decode_cursor(self, cursor):
+        try:
+            data = signing.loads(cursor, salt=self.salt, serializer=CursorSerializer)
+        except signing.BadSignature:
+            raise InvalidCursor(cursor)
+        if data.get('o') != self.ordering or data.get('d') not in ('next', 'previous'):
+            raise InvalidCursor(cursor)
+        if len(data.get('v', ())) != len(self.keys):
+            raise InvalidCursor(cursor)
+        return data['d'], data['v']
+
+    def _order_by(self, reverse):
+        order_by = []
+        for name, descending in self.keys:
+            descending = descending != reverse
+            order_by.append('-' + name if descending else name)
+        return order_by
+
+    def _after(self, values, reverse):
+        """Filter for rows after the row with the sort key ``values``."""
+        keys = [
+            (name, descending != reverse, nullable)
+            for (name, descending), nullable in zip(self.keys, self.nullable)
+        ]
+        return self._after_keys(keys, values)
+
+    def _after_keys(self, keys, values):
+        """Filter for rows after ``values`` on ``keys``.
+
+        The leading keys that are sorted in the same direction as the
+        first one, and that can't be null, are compared together as a
+        row value; for keys (k1, k2, ..., kn) sorted in descending
+        order that's just::
+
+            (k1, k2, ..., kn) < (v1, v2, ..., vn)
+
+        The remaining keys, if any, are compared the same way, but only
+        for rows whose leading keys are equal to the cursor's.
+
+        """
+        if not keys:
+            return Q(pk__in=[])
+
+        name, descending, nullable = keys[0]
+        if values[0] is None:
+            # Nulls are last when ascending and first when descending
+            condition = Q(**{name + '__isnull': True}) & self._after_keys(keys[1:], values[1:])
+            if descending:
+                condition |= Q(**{name + '__isnull': False})
+            return condition
+
+        n = 1
+        while n < len(keys) and keys[n][1:] == (descending, False) and values[n] is not None:
+            n += 1
+        names = [key[0] for key in keys[:n]]
+        condition = Q(RowComparison(names, '<' if descending else '>', values[:n]))
+        if nullable and not descending:
+            condition |= Q(**{name + '__isnull': True})
+        if n < len(keys):
+            same = Q(**dict(zip(names, values[:n])))
+            condition |= same & self._after_keys(keys[n:], values[n:])
+        return condition
+
+
+class RowComparison(Expression):
+
+    """Compare fields (or annotations) to values as row values.
+
+    For example, ``RowComparison(['a', 'b'], '<', [1, 2])`` is
+    ``(a, b) < (1, 2)``, which is true when ``a < 1``, or when
+    ``a = 1 AND b < 2``. Unlike the equivalent ``OR``, PostgreSQL
+    can use a multicolumn index on ``(a, b)`` to find the rows.
+
+    """
+
+    conditional = True
+
+    def __init__(self, names, operator, values):
+        super().__init__(output_field=BooleanField())
+        self.expressions = [F(name) for name in names]
+        self.operator = operator
+        self.values = list(values)
+
+    def get_source_expressions(self):
+        return self.expressions
+
+    def set_source_expressions(self, exprs):
+        self.expressions = exprs
+
+    def as_sql(self, compiler, connection):
+        lhs, rhs, lhs_params, rhs_params = [], [], [], []
+        for expression, value in zip(self.expressions, self.values):
+            sql, params = compiler.compile(expression)
+            lhs.append(sql)
+            lhs_params.extend(params)
+            sql, params = compiler.compile(Value(value, output_field=expression.output_field))
+            rhs.append(sql)
+            rhs_params.extend(params)
+        sql = '({lhs}) {operator} ({rhs})'.format(
+            lhs=', '.join(lhs), operator=self.operator, rhs=', '.join(rhs))
+        return sql, lhs_params + rhs_params
+
+
+class CursorEncoder(DjangoJSONEncoder):
+
+    def default(self, o):
+        # Unlike DjangoJSONEncoder, keep microseconds since sort keys
+        # have to round trip exactly.
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class CursorSerializer(signing.JSONSerializer):
+
+    def dumps(self, obj):
+        return CursorEncoder(separators=(',', ':')).encode(obj).encode('latin-1')
+
+
+def estimate_count(queryset):
+    """Estimate the number of rows in ``queryset``.
+
+    When the query isn't filtered, the planner's estimate of the number
+    of rows in the table is used, which is available without scanning
+    the table. Otherwise, the rows are counted.
+
+    """
+    if not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        if row is not None and row[0] > 0:
+            return row[0]
+    return queryset.count()
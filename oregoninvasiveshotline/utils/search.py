@@ -1,6 +1,7 @@
 import logging
 
 from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F
 from django import forms
 
 logger = logging.getLogger(__name__)
@@ -16,6 +17,11 @@ class SearchForm(forms.Form):
         }),
     )
 
+    # The name of a stored (and indexed) SearchVectorField to search
+    # against. When this isn't set, a search vector is built on the fly
+    # from the fields returned by get_search_fields().
+    search_vector_field = None
+
     def get_search_fields(self):
         raise NotImplementedError
 
@@ -25,11 +31,15 @@ class SearchForm(forms.Form):
             return queryset
 
         query = self.cleaned_data.get('q')
-        search_vector = SearchVector(*self.get_search_fields())
         search_query = SearchQuery(query, search_type='phrase')
-        queryset = queryset.annotate(
-            search=search_vector
-        ).filter(search=query)
+        if self.search_vector_field is not None:
+            search_vector = F(self.search_vector_field)
+            queryset = queryset.filter(**{self.search_vector_field: query})
+        else:
+            search_vector = SearchVector(*self.get_search_fields())
+            queryset = queryset.annotate(
+                search=search_vector
+            ).filter(search=query)
 
         return queryset.annotate(
             rank=SearchRank(search_vector, search_query)
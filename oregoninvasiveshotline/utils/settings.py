@@ -18,10 +18,8 @@ import base64
 import inspect
 import ipaddress
 import os
-from datetime import datetime, timedelta
-from pkg_resources import get_distribution
+from datetime import timedelta
 
-from django import VERSION as DJANGO_VERSION
 from django.conf import settings as django_settings
 from django.utils import timezone
 
@@ -1,12 +1,41 @@
+import uuid
+
+from django.contrib.flatpages.models import FlatPage
+from django.core.cache import caches
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
 from rest_framework.permissions import IsAdminUser
 from rest_framework.renderers import TemplateHTMLRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .pages import HIDDEN_PAGE_PREFIX
 from .reports.models import Report
 from .reports.serializers import ReportSerializer
+from .utils.http import has_pending_messages, make_etag
+
+
+def home_etag(request):
+    """Get an ETag for the home page.
+
+    The page changes when the snapshot of reports is rebuilt or when
+    the content of the page's blocks is edited.
+
+    """
+    if has_pending_messages(request):
+        return None
+    snapshot = HomeView().get_snapshot()
+    pages = FlatPage.objects.filter(url__startswith=HIDDEN_PAGE_PREFIX).order_by('url')
+    return make_etag(
+        snapshot['version'],
+        list(pages.values_list('url', 'content')),
+        request.user.pk,
+        request.user.is_staff,
+    )
 
 
+@method_decorator(condition(etag_func=home_etag), name='get')
 class HomeView(APIView):
 
     renderer_classes = [TemplateHTMLRenderer]
@@ -22,13 +51,38 @@ class HomeView(APIView):
         'is_public': True,
     }
 
+    # The serialized reports are cached under this key. The snapshot is
+    # rebuilt in the background when the reports it shows may have
+    # changed (see tasks.queue_home_snapshot_rebuild()), so only the
+    # first visit after the cache is cleared has to build it.
+    snapshot_key = 'home:reports'
+
     def get(self, request):
-        reports = self.get_reports()
-        serializer = ReportSerializer(reports, many=True)
         return Response({
-            'reports': serializer.data,
+            'reports': self.get_snapshot()['reports'],
         })
 
+    def get_snapshot(self):
+        snapshot = caches['snapshots'].get(self.snapshot_key)
+        if snapshot is None:
+            snapshot = self.build_snapshot()
+        return snapshot
+
+    def build_snapshot(self):
+        """Serialize the reports shown on the home page and cache them.
+
+        Each snapshot gets a new version, which is used in the page's
+        ETag.
+
+        """
+        serializer = ReportSerializer(self.get_reports(), many=True)
+        snapshot = {
+            'reports': list(serializer.data),
+            'version': uuid.uuid4().hex,
+        }
+        caches['snapshots'].set(self.snapshot_key, snapshot, None)
+        return snapshot
+
     def get_reports(self):
         """Get reports to show on home page.
 
@@ -5,6 +5,8 @@ class Visibility:
 
     choices = [
         (PRIVATE, "Private - only managers and invited experts can see"),
-        (PROTECTED, "Protected - only managers, invited experts and the report submitter can see"),  # private + the person reporting it can see
-        (PUBLIC, "Public - everyone can see (when this report is made public)"),  # the public can see (on a public report)
+        # private + the person reporting it can see
+        (PROTECTED, "Protected - only managers, invited experts and the report submitter can see"),
+        # the public can see (on a public report)
+        (PUBLIC, "Public - everyone can see (when this report is made public)"),
     ]
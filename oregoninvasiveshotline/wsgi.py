@@ -11,5 +11,5 @@ import os
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "oregoninvasiveshotline.settings")
 
-from django.core.wsgi import get_wsgi_application
+from django.core.wsgi import get_wsgi_application  # noqa: E402
 application = get_wsgi_application()